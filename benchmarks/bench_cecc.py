@@ -0,0 +1,55 @@
+"""
+Benchmarks for the libsecp256k1 backend.
+
+Needs libsecp256k1 and the compiled buidl/_libsec module. Run from the
+repository root:
+
+    python -m benchmarks.bench_cecc
+"""
+from random import randint
+
+from buidl.cecc import G, N, PrivateKey, sign_many, verify_many
+from buidl.hd import HDPrivateKey
+
+from benchmarks.bench_pecc import bench
+
+
+def bench_hd_derivation(size=1000):
+    pub = HDPrivateKey.from_seed(b"buidl benchmark seed").pub
+    bench(f"HDPublicKey.child x{size}", lambda: [pub.child(i) for i in range(size)], 1)
+
+
+def bench_tweaks(number=2000):
+    point = PrivateKey(randint(1, N - 1)).point
+    coef = randint(1, N - 1)
+    bench("k*P (tweak_mul)", lambda: coef * point, number)
+    bench("P + t*G (tweak_add)", lambda: point + coef, number)
+    bench("S256Point.tweaked_key", lambda: point.tweaked_key(), number)
+    bench("S256Point.xonly", lambda: point.xonly(), number)
+    bench("S256Point.combine", lambda: G.combine([point, G, point]), number)
+
+
+def bench_threads(size=2000, thread_counts=(1, 2, 4, 8)):
+    private_keys = [PrivateKey(randint(1, N - 1)) for _ in range(16)]
+    sign_items = [(private_keys[i % 16], randint(1, N - 1)) for i in range(size)]
+    sigs = sign_many(sign_items)
+    verify_items = [(pk.point, z, sig) for (pk, z), sig in zip(sign_items, sigs)]
+    for threads in thread_counts:
+        elapsed = bench(
+            f"sign_many x{size} ({threads} threads)",
+            lambda: sign_many(sign_items, max_workers=threads),
+            1,
+        )
+        print(f"{'  signatures/s':<40} {size / elapsed:>10.0f}")
+        elapsed = bench(
+            f"verify_many x{size} ({threads} threads)",
+            lambda: verify_many(verify_items, max_workers=threads),
+            1,
+        )
+        print(f"{'  verifications/s':<40} {size / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    bench_hd_derivation()
+    bench_tweaks()
+    bench_threads()
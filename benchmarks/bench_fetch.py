@@ -0,0 +1,118 @@
+"""
+Benchmarks for fetching transactions from a block explorer or a node.
+
+Stand-in servers on this machine, a block explorer and a bitcoind,
+answer from the test cache after a fixed delay per request, which plays
+the part of the network round-trip.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fetch
+"""
+import json
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os.path import join
+from socketserver import ThreadingMixIn
+from threading import Thread
+from time import sleep
+from unittest.mock import patch
+
+from benchmarks.bench_pecc import bench
+from buidl.rpc import BitcoinRPC
+from buidl.tx import URL, TxFetcher
+
+CACHE_FILE = join("buidl", "test", "tx.cache")
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def stand_in_server(raw_txs, delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            sleep(delay)
+            body = raw_txs[self.path.split("/")[-2]].encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = Server(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stand_in_node(raw_txs, delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            sleep(delay)
+            requests = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            body = json.dumps(
+                [
+                    {"result": raw_txs[r["params"][0]], "error": None, "id": r["id"]}
+                    for r in requests
+                ]
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = Server(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_fetch(delay=0.02):
+    with open(CACHE_FILE) as f:
+        raw_txs = json.load(f)
+    tx_ids = sorted(raw_txs)
+    server = stand_in_server(raw_txs, delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    try:
+        with patch.dict(URL, {"mainnet": url}):
+            serial = bench(
+                f"fetch x{len(tx_ids)}, {delay * 1000:.0f}ms latency",
+                lambda: [TxFetcher.fetch(tx_id, fresh=True) for tx_id in tx_ids],
+                1,
+            )
+            concurrent = bench(
+                f"fetch_many x{len(tx_ids)}, {delay * 1000:.0f}ms latency",
+                lambda: TxFetcher.fetch_many(tx_ids, fresh=True),
+                1,
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"{'speedup':<40} {serial / concurrent:>10.1f} x")
+    server = stand_in_node(raw_txs, delay)
+    TxFetcher.rpc["mainnet"] = BitcoinRPC(
+        f"http://127.0.0.1:{server.server_address[1]}/"
+    )
+    try:
+        batched = bench(
+            f"fetch_many x{len(tx_ids)} over rpc",
+            lambda: TxFetcher.fetch_many(tx_ids, fresh=True),
+            1,
+        )
+    finally:
+        TxFetcher.rpc.pop("mainnet").close()
+        server.shutdown()
+        server.server_close()
+    print(f"{'speedup over fetch':<40} {serial / batched:>10.1f} x")
+
+
+if __name__ == "__main__":
+    bench_fetch()
@@ -0,0 +1,46 @@
+"""
+Benchmarks for the tagged hash functions of every installed hash backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_hash
+"""
+from hashlib import sha256
+
+from buidl.backend import available_backends, load_backend
+
+from benchmarks.bench_pecc import bench
+
+
+def naive_tagged_hash(tag, msg):
+    return sha256(sha256(tag).digest() * 2 + msg).digest()
+
+
+def bench_tagged_hash(hash_module, size=1000, number=20):
+    tagged_hash = hash_module.tagged_hash
+    tagged_hash_many = hash_module.tagged_hash_many
+    tag = b"TapSighash"
+    msgs = [i.to_bytes(4, "big") * 50 for i in range(size)]
+    naive = bench(
+        f"sha256(prefix + msg) x{size}",
+        lambda: [naive_tagged_hash(tag, msg) for msg in msgs],
+        number,
+    )
+    single = bench(
+        f"tagged_hash x{size}",
+        lambda: [tagged_hash(tag, msg) for msg in msgs],
+        number,
+    )
+    many = bench(
+        f"tagged_hash_many x{size}", lambda: tagged_hash_many(tag, msgs), number
+    )
+    print(f"{'speedup (tagged_hash)':<40} {naive / single:>10.1f} x")
+    print(f"{'speedup (tagged_hash_many)':<40} {naive / many:>10.1f} x")
+
+
+if __name__ == "__main__":
+    # several backends share buidl.phash, so keep each module once
+    hash_modules = {load_backend(name)[1]: None for name in available_backends()}
+    for hash_module in hash_modules:
+        print(hash_module.__name__)
+        bench_tagged_hash(hash_module)
@@ -0,0 +1,199 @@
+"""
+Benchmarks for the pure-python secp256k1 backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pecc
+"""
+import sys
+import tracemalloc
+
+from random import randint
+from timeit import timeit
+
+from buidl import pecc
+from buidl.hd import HDPrivateKey
+from buidl.pecc import G, N, Point, PrivateKey, S256Point
+
+
+def bench(label, func, number):
+    elapsed = timeit(func, number=number)
+    print(f"{label:<40} {elapsed / number * 1000:>10.3f} ms")
+    return elapsed / number
+
+
+def bench_generator_table():
+    pecc._GENERATOR_TABLE = None
+    bench("generator table build (once)", pecc._generator_table, 1)
+
+
+def bench_scalar_multiplication(number=20):
+    coefficients = [randint(1, N - 1) for _ in range(number)]
+    point = randint(1, N - 1) * G
+    it = iter(coefficients * 2)
+    affine = bench(
+        "k*G (affine double-and-add)", lambda: Point.__rmul__(G, next(it)), number
+    )
+    jacobian = bench("k*G (S256Point.__rmul__)", lambda: next(it) * G, number)
+    print(f"{'speedup':<40} {affine / jacobian:>10.1f} x")
+    it = iter(coefficients * 2)
+    affine = bench(
+        "k*P (affine double-and-add)", lambda: Point.__rmul__(point, next(it)), number
+    )
+    jacobian = bench("k*P (S256Point.__rmul__)", lambda: next(it) * point, number)
+    print(f"{'speedup':<40} {affine / jacobian:>10.1f} x")
+
+
+def bench_multi_multiplication(number=20):
+    point = randint(1, N - 1) * G
+    u, v = randint(1, N - 1), randint(1, N - 1)
+    separate = bench("u*G + v*P (separate)", lambda: u * G + v * point, number)
+    combined = bench(
+        "u*G + v*P (Strauss-Shamir)",
+        lambda: pecc._from_jacobian(pecc._multi_multiply([(u, G), (v, point)])),
+        number,
+    )
+    print(f"{'speedup':<40} {separate / combined:>10.1f} x")
+
+
+def bench_glv(number=20):
+    point = randint(1, N - 1) * G
+    coefficients = [randint(1, N - 1) for _ in range(number)]
+    it = iter(coefficients * 2)
+    plain = bench(
+        "k*P (wNAF, no GLV)",
+        lambda: pecc._multi_multiply([(next(it), point)], glv=False),
+        number,
+    )
+    split = bench(
+        "k*P (wNAF, GLV)",
+        lambda: pecc._multi_multiply([(next(it), point)], glv=True),
+        number,
+    )
+    print(f"{'speedup':<40} {plain / split:>10.1f} x")
+
+
+def bench_schnorr_batch(size=50, number=3):
+    items = []
+    for _ in range(size):
+        private_key = PrivateKey(randint(1, N - 1))
+        msg = randint(1, N - 1).to_bytes(32, "big")
+        items.append((private_key.point, msg, private_key.sign_schnorr(msg)))
+    single = bench(
+        f"verify_schnorr x{size}",
+        lambda: [point.verify_schnorr(msg, sig) for point, msg, sig in items],
+        number,
+    )
+    batch = bench(
+        f"verify_schnorr_batch x{size}",
+        lambda: pecc.verify_schnorr_batch(items),
+        number,
+    )
+    print(f"{'speedup':<40} {single / batch:>10.1f} x")
+
+
+def bench_bulk_derivation(size=1000):
+    pub = HDPrivateKey.from_seed(b"buidl benchmark seed").pub
+    loop = bench(
+        f"HDPublicKey.child x{size}",
+        lambda: [pub.child(i) for i in range(size)],
+        1,
+    )
+    batch = bench(f"HDPublicKey.children x{size}", lambda: pub.children(range(size)), 1)
+    print(f"{'speedup':<40} {loop / batch:>10.1f} x")
+
+
+def bench_point_cache(number=200):
+    secs = [(randint(1, N - 1) * G).sec() for _ in range(5)]
+    uncached = bench(
+        "parse_sec x5 (no cache)",
+        lambda: [S256Point.parse(sec) for sec in secs],
+        number,
+    )
+    pecc.enable_point_cache()
+    cached = bench(
+        "parse_sec x5 (point cache)",
+        lambda: [S256Point.parse(sec) for sec in secs],
+        number,
+    )
+    pecc.disable_point_cache()
+    print(f"{'speedup':<40} {uncached / cached:>10.1f} x")
+
+
+def bench_signing(number=20):
+    private_key = PrivateKey(randint(1, N - 1))
+    z = randint(1, N - 1)
+    sig = private_key.sign(z)
+    msg = z.to_bytes(32, "big")
+    schnorr_sig = private_key.sign_schnorr(msg)
+    bench("PrivateKey.sign", lambda: private_key.sign(z), number)
+    bench("S256Point.verify", lambda: private_key.point.verify(z, sig), number)
+    bench("PrivateKey.sign_schnorr", lambda: private_key.sign_schnorr(msg), number)
+    bench(
+        "S256Point.verify_schnorr",
+        lambda: private_key.point.verify_schnorr(msg, schnorr_sig),
+        number,
+    )
+
+
+def object_size(obj):
+    """size of an instance including its __dict__, if it has one"""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def bench_memory():
+    private_key = PrivateKey(randint(1, N - 1))
+    z = randint(1, N - 1)
+    point = private_key.point
+    sig = private_key.sign(z)
+    print(f"{'S256Field size':<40} {object_size(point.x):>10} B")
+    print(f"{'S256Point size':<40} {object_size(point):>10} B")
+    print(f"{'Signature size':<40} {object_size(sig):>10} B")
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    point.verify(z, private_key.sign(z))
+    blocks = sys.getallocatedblocks() - blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'sign + verify peak traced memory':<40} {peak:>10} B")
+    print(f"{'sign + verify retained blocks':<40} {blocks:>10}")
+    # count the field elements and points constructed during the cycle
+    counts = {}
+    patched = []
+    for cls in (pecc.S256Field, pecc.S256Point):
+        for name in ("__init__", "_new"):
+            original = cls.__dict__.get(name)
+            if original is None:
+                continue
+            patched.append((cls, name, original))
+            func = getattr(original, "__func__", original)
+
+            def counting(*args, _func=func, _name=cls.__name__, **kwargs):
+                counts[_name] = counts.get(_name, 0) + 1
+                return _func(*args, **kwargs)
+
+            if isinstance(original, classmethod):
+                counting = classmethod(counting)
+            setattr(cls, name, counting)
+    try:
+        point.verify(z, private_key.sign(z))
+    finally:
+        for cls, name, original in patched:
+            setattr(cls, name, original)
+    for name, count in sorted(counts.items()):
+        print(f"{name + ' objects per sign + verify':<40} {count:>10}")
+
+
+if __name__ == "__main__":
+    bench_generator_table()
+    bench_scalar_multiplication()
+    bench_multi_multiplication()
+    bench_glv()
+    bench_schnorr_batch()
+    bench_bulk_derivation()
+    bench_point_cache()
+    bench_signing()
+    bench_memory()
@@ -0,0 +1,74 @@
+"""
+Benchmarks for PSBT serialization.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_psbt
+"""
+from io import BytesIO
+from os import urandom
+from random import randint
+
+from benchmarks.bench_pecc import bench
+from buidl.ecc import N, PrivateKey
+from buidl.helper import encode_varstr
+from buidl.psbt import (
+    PSBT,
+    PSBT_IN_BIP32_DERIVATION,
+    NamedPublicKey,
+    PSBTIn,
+    PSBTOut,
+    serialize_binary_path,
+)
+from buidl.script import P2WSHScriptPubKey, WitnessScript
+from buidl.tx import Tx, TxIn, TxOut
+
+
+def multisig_psbt(size=1000):
+    """an unsigned PSBT spending size 2-of-3 p2wsh inputs"""
+    points = [PrivateKey(randint(1, N - 1)).point for _ in range(3)]
+    named_pubs = {}
+    for i, point in enumerate(points):
+        raw_path = urandom(4) + serialize_binary_path(f"m/48'/0'/0'/2'/0/{i}")
+        named_pub = NamedPublicKey.parse(
+            PSBT_IN_BIP32_DERIVATION + point.sec(), BytesIO(encode_varstr(raw_path))
+        )
+        named_pubs[point.sec()] = named_pub
+    witness_script = WitnessScript([0x52] + list(named_pubs) + [0x53, 0xAE])
+    script_pubkey = P2WSHScriptPubKey(witness_script.sha256())
+    tx_ins = [TxIn(urandom(32), randint(0, 3)) for _ in range(size)]
+    tx_outs = [TxOut(100000, script_pubkey) for _ in range(2)]
+    tx_obj = Tx(2, tx_ins, tx_outs)
+    psbt_ins = [
+        PSBTIn(
+            tx_in,
+            prev_out=TxOut(200000, script_pubkey),
+            witness_script=witness_script,
+            named_pubs=named_pubs,
+        )
+        for tx_in in tx_ins
+    ]
+    psbt_outs = [PSBTOut(tx_out) for tx_out in tx_outs]
+    return PSBT(tx_obj, psbt_ins, psbt_outs)
+
+
+def bench_serialize(size=1000, number=5):
+    psbt_obj = multisig_psbt(size)
+    raw = psbt_obj.serialize()
+    print(f"{f'PSBT with {size} inputs':<40} {len(raw):>10} B")
+
+    def serialize():
+        psbt_obj.tx_obj.invalidate()
+        return psbt_obj.serialize()
+
+    def write():
+        psbt_obj.tx_obj.invalidate()
+        psbt_obj.write(BytesIO())
+
+    bench(f"PSBT.serialize x{size} inputs", serialize, number)
+    bench(f"PSBT.write x{size} inputs", write, number)
+    bench(f"PSBT.parse x{size} inputs", lambda: PSBT.parse(BytesIO(raw)), 1)
+
+
+if __name__ == "__main__":
+    bench_serialize()
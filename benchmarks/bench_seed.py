@@ -0,0 +1,49 @@
+"""
+Benchmarks for BIP39 seed derivation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_seed
+"""
+from unittest.mock import patch
+
+from benchmarks.bench_pecc import bench
+from buidl import helper
+from buidl.mnemonic import mnemonic_to_seed, mnemonic_to_seeds
+
+MNEMONIC = "abandon " * 11 + "about"
+
+
+def bench_kdf(number=3):
+    with patch.object(helper, "_pbkdf2_hmac", None):
+        pure = bench(
+            "mnemonic_to_seed (pure PBKDF2)",
+            lambda: mnemonic_to_seed(MNEMONIC, b"TREZOR"),
+            number,
+        )
+    fast = bench(
+        "mnemonic_to_seed (hashlib)",
+        lambda: mnemonic_to_seed(MNEMONIC, b"TREZOR"),
+        number * 10,
+    )
+    print(f"{'speedup':<40} {pure / fast:>10.1f} x")
+
+
+def bench_batch(size=64, number=1):
+    passwords = [str(i).encode() for i in range(size)]
+    serial = bench(
+        f"mnemonic_to_seeds x{size} (serial)",
+        lambda: mnemonic_to_seeds(MNEMONIC, passwords, max_workers=1),
+        number,
+    )
+    pool = bench(
+        f"mnemonic_to_seeds x{size} (process pool)",
+        lambda: mnemonic_to_seeds(MNEMONIC, passwords),
+        number,
+    )
+    print(f"{'speedup':<40} {serial / pool:>10.1f} x")
+
+
+if __name__ == "__main__":
+    bench_kdf()
+    bench_batch()
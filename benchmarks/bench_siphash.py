@@ -0,0 +1,43 @@
+"""
+Benchmarks for the SipHash-2-4 implementations used by compact filters.
+
+Run from the repository root, with csiphash and/or numpy installed to
+see their tiers:
+
+    python -m benchmarks.bench_siphash
+"""
+from os import urandom
+from random import randint
+
+from buidl import siphash
+
+from benchmarks.bench_pecc import bench
+
+
+def bench_siphash(size=2000, number=3):
+    key = urandom(16)
+    # roughly the scriptPubKey sizes found in a block
+    items = [urandom(randint(22, 34)) for _ in range(size)]
+    pure = bench(
+        f"SipHash_2_4 x{size}",
+        lambda: [siphash.SipHash_2_4(key, item).hash() for item in items],
+        number,
+    )
+    if siphash.numpy is not None:
+        vectorized = bench(
+            f"NumPy batch x{size}",
+            lambda: siphash._siphash_numpy(key, items),
+            number,
+        )
+        print(f"{'speedup':<40} {pure / vectorized:>10.1f} x")
+    if siphash._c_siphash24 is not None:
+        native = bench(
+            f"csiphash x{size}",
+            lambda: [siphash.siphash(key, item) for item in items],
+            number,
+        )
+        print(f"{'speedup':<40} {pure / native:>10.1f} x")
+
+
+if __name__ == "__main__":
+    bench_siphash()
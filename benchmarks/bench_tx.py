@@ -0,0 +1,192 @@
+"""
+Benchmarks for transaction parsing and serialization.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tx
+"""
+import json
+import tracemalloc
+
+from io import BytesIO
+from os import urandom
+from os.path import join
+from random import randint
+
+from benchmarks.bench_pecc import bench
+from buidl.ecc import N, PrivateKey
+from buidl.helper import SIGHASH_ALL, SIGHASH_NONE
+from buidl.script import P2WPKHScriptPubKey, RedeemScript, Script
+from buidl.tx import LazyTx, Tx, TxIn, TxOut, verify_txs
+
+CACHE_FILE = join("buidl", "test", "tx.cache")
+
+
+def block_of_txs(size=1000000):
+    """back to back raw transactions from the test cache, about size bytes"""
+    with open(CACHE_FILE) as f:
+        raws = [bytes.fromhex(raw_hex) for raw_hex in json.load(f).values()]
+    txs, total = [], 0
+    while total < size:
+        for raw in raws:
+            txs.append(raw)
+            total += len(raw)
+    return len(txs), b"".join(txs)
+
+
+def bench_parse(number=3):
+    num_txs, raw_block = block_of_txs()
+
+    def parse_stream():
+        s = BytesIO(raw_block)
+        return [Tx.parse(s) for _ in range(num_txs)]
+
+    def parse_offsets(b):
+        offset, txs = 0, []
+        for _ in range(num_txs):
+            tx_obj, offset = Tx.parse_at(b, offset)
+            txs.append(tx_obj)
+        return txs
+
+    print(f"block of {num_txs} txs, {len(raw_block) // 1000} kB")
+    stream = bench("Tx.parse (BytesIO)", parse_stream, number)
+    offsets = bench("Tx.parse_at (bytes)", lambda: parse_offsets(raw_block), number)
+    print(f"{'speedup':<40} {stream / offsets:>10.1f} x")
+    view = memoryview(raw_block)
+    offsets = bench("Tx.parse_at (memoryview)", lambda: parse_offsets(view), number)
+    print(f"{'speedup':<40} {stream / offsets:>10.1f} x")
+
+
+def bench_lazy(number=3):
+    num_txs, raw_block = block_of_txs()
+    print(f"block of {num_txs} txs, {len(raw_block) // 1000} kB")
+
+    def scan(parse, inspect):
+        offset, results = 0, []
+        for _ in range(num_txs):
+            tx_obj, offset = parse(raw_block, offset)
+            results.append(inspect(tx_obj))
+        return results
+
+    def outputs(tx_obj):
+        return [tx_out.amount for tx_out in tx_obj.tx_outs]
+
+    for label, inspect in (("txids", Tx.hash), ("output amounts", outputs)):
+        eager = bench(
+            f"{label} (Tx.parse_at)", lambda: scan(Tx.parse_at, inspect), number
+        )
+        lazy = bench(
+            f"{label} (LazyTx.parse_at)",
+            lambda: scan(LazyTx.parse_at, inspect),
+            number,
+        )
+        print(f"{'speedup':<40} {eager / lazy:>10.1f} x")
+    for label, parse in (
+        ("Tx.parse_at", Tx.parse_at),
+        ("LazyTx.parse_at", LazyTx.parse_at),
+    ):
+        tracemalloc.start()
+        txs = scan(parse, lambda tx_obj: tx_obj)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del txs
+        print(f"{'memory held, ' + label:<40} {size // 1000:>10} kB")
+
+
+def bench_hash_cache(number=10):
+    num_txs, raw_block = block_of_txs()
+    offset, txs = 0, []
+    for _ in range(num_txs):
+        tx_obj, offset = Tx.parse_at(raw_block, offset)
+        txs.append(tx_obj)
+    first = bench(
+        f"Tx.hash x{num_txs} (first call)", lambda: [tx_obj.hash() for tx_obj in txs], 1
+    )
+    cached = bench(
+        f"Tx.hash x{num_txs} (cached)",
+        lambda: [tx_obj.hash() for tx_obj in txs],
+        number,
+    )
+    print(f"{'speedup':<40} {first / cached:>10.1f} x")
+
+
+def bench_sig_hash_legacy(sizes=(100, 400)):
+    for size in sizes:
+        tx_ins = [TxIn(urandom(32), 0) for _ in range(size)]
+        tx_outs = [TxOut(1000, Script([0x00, urandom(20)])) for _ in range(2)]
+        tx_obj = Tx(1, tx_ins, tx_outs)
+        redeem_script = RedeemScript([0x52, urandom(33), urandom(33), 0x52, 0xAE])
+        for label, hash_type in (("ALL", SIGHASH_ALL), ("NONE", SIGHASH_NONE)):
+            bench(
+                f"sig_hash_legacy {label} x{size} inputs",
+                lambda: [
+                    tx_obj.sig_hash_legacy(i, redeem_script, hash_type)
+                    for i in range(size)
+                ],
+                1,
+            )
+
+
+def bench_sighash_context(size=100, signatures=3):
+    redeem_script = RedeemScript([0x52, urandom(33), urandom(33), 0x52, 0xAE])
+    tx_ins = []
+    for _ in range(size):
+        tx_in = TxIn(urandom(32), 0)
+        tx_in.script_sig = Script([0, urandom(72), redeem_script.raw_serialize()])
+        tx_in._script_pubkey = redeem_script.script_pubkey()
+        tx_ins.append(tx_in)
+    tx_outs = [TxOut(1000, Script([0x00, urandom(20)])) for _ in range(2)]
+    tx_obj = Tx(1, tx_ins, tx_outs)
+
+    def without_context():
+        # what checking every signature of every input used to cost
+        for i in range(size):
+            tx_in = tx_obj.tx_ins[i]
+            for _ in range(signatures):
+                RedeemScript.convert(tx_in.script_sig.commands[-1])
+                tx_in.script_pubkey().is_p2sh()
+                tx_obj.sig_hash_legacy(i, redeem_script, SIGHASH_ALL)
+
+    def with_context():
+        tx_obj.invalidate()
+        context = tx_obj.sighash_context()
+        for i in range(size):
+            for _ in range(signatures):
+                context.sig_hash(i, SIGHASH_ALL)
+
+    label = f"{signatures} sigs x{size} inputs"
+    plain = bench(f"{label} (no context)", without_context, 3)
+    memo = bench(f"{label} (SighashContext)", with_context, 3)
+    print(f"{'speedup':<40} {plain / memo:>10.1f} x")
+
+
+def bench_verify(size=200, workers=(1, 2, 4)):
+    private_key = PrivateKey(randint(1, N - 1))
+    script_pubkey = P2WPKHScriptPubKey(private_key.point.hash160())
+    tx_ins = []
+    prevout_view = {}
+    for _ in range(size):
+        tx_in = TxIn(urandom(32), 0)
+        tx_in._value = 10000
+        tx_in._script_pubkey = script_pubkey
+        prevout_view[(tx_in.prev_tx, tx_in.prev_index)] = TxOut(10000, script_pubkey)
+        tx_ins.append(tx_in)
+    tx_obj = Tx(1, tx_ins, [TxOut(1000, script_pubkey)], segwit=True)
+    for i in range(size):
+        tx_obj.sign_p2wpkh(i, private_key)
+    bench(f"Tx.verify x{size} inputs", tx_obj.verify, 1)
+    for num_workers in workers:
+        bench(
+            f"verify_txs x{size} inputs, {num_workers} workers",
+            lambda: verify_txs([tx_obj], prevout_view, workers=num_workers),
+            1,
+        )
+
+
+if __name__ == "__main__":
+    bench_parse()
+    bench_lazy()
+    bench_hash_cache()
+    bench_sig_hash_legacy()
+    bench_sighash_context()
+    bench_verify()
@@ -0,0 +1,56 @@
+"""
+Benchmarks for the TxFetcher caches.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_txcache
+"""
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from benchmarks.bench_pecc import bench
+from buidl.tx import TxFetcher
+from buidl.txcache import BinaryTxStore, SqliteTxStore, TxCache, migrate_json_cache
+
+CACHE_FILE = join("buidl", "test", "tx.cache")
+
+
+def bench_startup(number=20, lookups=5):
+    with TemporaryDirectory() as tmp:
+        stores = {
+            "binary": BinaryTxStore(join(tmp, "txs.bin")),
+            "sqlite": SqliteTxStore(join(tmp, "txs.db")),
+        }
+        for store in stores.values():
+            migrate_json_cache(CACHE_FILE, store)
+            store.close()
+        tx_ids = sorted(stores["binary"])[:lookups]
+
+        def json_cache():
+            TxFetcher.cache = {}
+            TxFetcher.load_cache(CACHE_FILE)
+            return [TxFetcher.cache[tx_id] for tx_id in tx_ids]
+
+        def open_store(store_class, filename):
+            cache = TxCache(max_items=100, store=store_class(filename))
+            txs = [cache[tx_id] for tx_id in tx_ids]
+            cache.store.close()
+            return txs
+
+        json = bench(f"load_cache + {lookups} lookups", json_cache, number)
+        for name, store_class, filename in (
+            ("binary", BinaryTxStore, "txs.bin"),
+            ("sqlite", SqliteTxStore, "txs.db"),
+        ):
+            path = join(tmp, filename)
+            store = bench(
+                f"open {name} store + {lookups} lookups",
+                lambda: open_store(store_class, path),
+                number,
+            )
+            print(f"{'speedup':<40} {json / store:>10.1f} x")
+    TxFetcher.cache = {}
+
+
+if __name__ == "__main__":
+    bench_startup()
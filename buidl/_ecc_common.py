@@ -0,0 +1,59 @@
+"""
+The parts of the secp256k1 backends that don't depend on how the
+arithmetic is done. Each backend makes its own PointCache and its own
+sign_many/verify_many with batch_functions, so switching backends never
+mixes their objects.
+"""
+from buidl.helper import LRUCache
+
+
+class PointCache(LRUCache):
+    """parse_sec/parse_xonly cache, keyed by the serialized bytes. It is off
+    by default; enable it when the same keys get parsed over and over."""
+
+    def enable(self, maxsize=1024):
+        """Caches up to maxsize parsed public keys"""
+        self.resize(maxsize)
+
+    def disable(self):
+        self.resize(0)
+        self.clear()
+
+
+def _sign_item(item):
+    private_key, z = item
+    return private_key.sign(z)
+
+
+def _verify_item(item):
+    point, z, sig = item
+    # a Schnorr signature signs a 32 byte message, ECDSA the integer z
+    if isinstance(z, bytes):
+        return bool(point.verify_schnorr(z, sig))
+    return bool(point.verify(z, sig))
+
+
+def serial_map(func, items, max_workers=None):
+    """[func(item) for item in items] on the calling thread, for backends
+    whose arithmetic holds the GIL. max_workers is ignored."""
+    return [func(item) for item in items]
+
+
+def batch_functions(map_items):
+    """Returns sign_many and verify_many for a backend, spreading the work
+    with map_items: helper.thread_map when the backend releases the GIL,
+    serial_map otherwise."""
+
+    def sign_many(items, max_workers=None):
+        """Signs a list of (private_key, z) tuples with ECDSA and returns
+        the signatures in the same order. The work is split over up to
+        max_workers threads if the backend releases the GIL."""
+        return map_items(_sign_item, items, max_workers)
+
+    def verify_many(items, max_workers=None):
+        """Verifies a list of (point, z, sig) tuples and returns a list of
+        booleans in the same order. For SchnorrSignatures z is the 32 byte
+        message. Threads are used as in sign_many."""
+        return map_items(_verify_item, items, max_workers)
+
+    return sign_many, verify_many
@@ -0,0 +1,208 @@
+"""
+Registry of the secp256k1 and hashing backends.
+
+buidl.ecc and buidl.hash re-export whatever the active backend provides:
+
+    libsec  libsecp256k1 through cffi (buidl.cecc and buidl.chash)
+    gmpy2   the pure python code running on gmpy2 integers (buidl.gecc)
+    python  pure python (buidl.pecc and buidl.phash)
+
+By default the first one that can be imported wins. Set the BUIDL_BACKEND
+environment variable to one of the names above to pick one explicitly, or
+call select_backend at runtime. Switching at runtime rebinds the names
+that buidl's library modules imported from the old backend and rebuilds
+their subclasses of backend classes, like psbt.NamedPublicKey, on top of
+the new one. Keys and points created before the switch keep using the
+backend that made them.
+"""
+import importlib
+import sys
+
+from os import getenv
+from types import FunctionType, ModuleType
+
+
+ENV_VAR = "BUIDL_BACKEND"
+
+# name: (dependency to probe, ecc module, hash module), fastest first
+BACKENDS = {
+    "libsec": ("buidl._libsec", "buidl.cecc", "buidl.chash"),
+    "gmpy2": ("gmpy2", "buidl.gecc", "buidl.phash"),
+    "python": (None, "buidl.pecc", "buidl.phash"),
+}
+
+_ACTIVE = None
+
+
+def _check_name(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}, pick one of: {', '.join(BACKENDS)}")
+
+
+def is_backend_available(name):
+    _check_name(name)
+    dependency = BACKENDS[name][0]
+    if dependency is None:
+        return True
+    try:
+        module = importlib.import_module(dependency)
+    except ModuleNotFoundError:
+        return False
+    if name == "gmpy2":
+        # serializing needs mpz.to_bytes, new in gmpy2 2.2
+        return hasattr(module.mpz(1), "to_bytes")
+    return True
+
+
+def available_backends():
+    """returns the names of the backends that can be used, fastest first"""
+    return [name for name in BACKENDS if is_backend_available(name)]
+
+
+def load_backend(name):
+    """returns the (ecc, hash) modules of a backend"""
+    _check_name(name)
+    if not is_backend_available(name):
+        raise ModuleNotFoundError(f"Backend {name} is not installed")
+    _, ecc_name, hash_name = BACKENDS[name]
+    return importlib.import_module(ecc_name), importlib.import_module(hash_name)
+
+
+def active_backend():
+    """returns the name of the backend buidl.ecc and buidl.hash use"""
+    global _ACTIVE
+    if _ACTIVE is None:
+        name = getenv(ENV_VAR)
+        if name:
+            _check_name(name)
+            if not is_backend_available(name):
+                raise ModuleNotFoundError(
+                    f"Backend {name} from {ENV_VAR} is not installed"
+                )
+        else:
+            name = available_backends()[0]
+        _ACTIVE = name
+    return _ACTIVE
+
+
+def public_names(module):
+    """the names a star import of module would bring in"""
+    return {
+        key: value for key, value in vars(module).items() if not key.startswith("_")
+    }
+
+
+def _new_cell():
+    cell = None
+    return (lambda: cell).__closure__[0]
+
+
+def _copy_function(func, class_cell):
+    """a copy of func whose zero-argument super() uses class_cell"""
+    code = func.__code__
+    if "__class__" not in code.co_freevars:
+        return func
+    closure = tuple(
+        class_cell if free_name == "__class__" else cell
+        for free_name, cell in zip(code.co_freevars, func.__closure__)
+    )
+    copy = FunctionType(
+        code, func.__globals__, func.__name__, func.__defaults__, closure
+    )
+    copy.__kwdefaults__ = func.__kwdefaults__
+    copy.__qualname__ = func.__qualname__
+    copy.__doc__ = func.__doc__
+    copy.__dict__.update(func.__dict__)
+    return copy
+
+
+def rebase_class(cls, bases):
+    """returns a copy of cls that derives from bases instead"""
+    class_cell = _new_cell()
+    slots = cls.__dict__.get("__slots__", ())
+    if isinstance(slots, str):
+        slots = (slots,)
+    namespace = {}
+    for key, value in vars(cls).items():
+        if key in ("__dict__", "__weakref__") or key in slots:
+            continue
+        if isinstance(value, FunctionType):
+            value = _copy_function(value, class_cell)
+        elif isinstance(value, (classmethod, staticmethod)):
+            value = type(value)(_copy_function(value.__func__, class_cell))
+        elif isinstance(value, property):
+            value = property(
+                *(
+                    None if f is None else _copy_function(f, class_cell)
+                    for f in (value.fget, value.fset, value.fdel)
+                ),
+                value.__doc__,
+            )
+        namespace[key] = value
+    new_cls = type(cls)(cls.__name__, bases, namespace)
+    new_cls.__qualname__ = cls.__qualname__
+    class_cell.cell_contents = new_cls
+    return new_cls
+
+
+def _library_modules(backend_modules):
+    for module_name, module in list(sys.modules.items()):
+        if module is None or module_name in backend_modules:
+            continue
+        if module_name != "buidl" and not module_name.startswith("buidl."):
+            continue
+        # tests import specific backends on purpose
+        if module_name == "buidl.test" or module_name.startswith("buidl.test."):
+            continue
+        yield module_name, module
+
+
+def select_backend(name):
+    """Switches buidl.ecc and buidl.hash to another backend and rebinds
+    the names other buidl modules imported from them"""
+    global _ACTIVE
+    new_modules = load_backend(name)
+    old_modules = load_backend(active_backend())
+    backend_modules = {
+        module_name
+        for _, ecc_name, hash_name in BACKENDS.values()
+        for module_name in (ecc_name, hash_name)
+    }
+    # map every class, function and constant point the old backends
+    # exported to its replacement. Plain values like N are the same in
+    # every backend and small ones are shared objects, so leave them be.
+    replacements = {}
+    for old_module, new_module in zip(old_modules, new_modules):
+        new_names = public_names(new_module)
+        for key, value in public_names(old_module).items():
+            if key not in new_names:
+                continue
+            if isinstance(value, (int, float, str, bytes, ModuleType)):
+                continue
+            replacements[id(value)] = (value, new_names[key])
+    # classes the library derived from backend classes, bases first, so
+    # that objects they make match the rest of the new backend
+    subclasses = [
+        value
+        for module_name, module in _library_modules(backend_modules)
+        for value in vars(module).values()
+        if isinstance(value, type) and value.__module__ == module_name
+    ]
+    for cls in sorted(subclasses, key=lambda cls: len(cls.__mro__)):
+        if not any(id(base) in replacements for base in cls.__bases__):
+            continue
+        bases = tuple(
+            replacements[id(base)][1] if id(base) in replacements else base
+            for base in cls.__bases__
+        )
+        replacements[id(cls)] = (cls, rebase_class(cls, bases))
+    for module_name, module in _library_modules(backend_modules):
+        namespace = vars(module)
+        for key, value in list(namespace.items()):
+            replacement = replacements.get(id(value))
+            if replacement is not None and replacement[0] is value:
+                namespace[key] = replacement[1]
+    for module_name, new_module in zip(("buidl.ecc", "buidl.hash"), new_modules):
+        if module_name in sys.modules:
+            vars(sys.modules[module_name]).update(public_names(new_module))
+    _ACTIVE = name
@@ -1,7 +1,9 @@
 import hashlib
 import hmac
 import secrets
+import threading
 
+from buidl._ecc_common import PointCache, batch_functions
 from buidl.hash import hash_taptweak
 from buidl.helper import (
     big_endian_to_int,
@@ -10,32 +12,77 @@ from buidl.helper import (
     hash256,
     int_to_big_endian,
     raw_decode_base58,
+    thread_map,
 )
 from buidl._libsec import ffi, lib
 
 
+# libsecp256k1 functions that take a const context are safe to call from
+# any thread, so parsing, tweaking and verification share GLOBAL_CTX.
+# Randomizing a context mutates it, so GLOBAL_CTX is randomized once here,
+# before any thread can use it. That blinds the generator multiplications
+# done with it, like the ones in tweak_add when deriving child keys.
+# Signing re-randomizes every time, so it uses a context per thread.
+# The bindings are compiled in cffi's API mode, which releases the GIL for
+# the duration of every lib call.
 GLOBAL_CTX = ffi.gc(
     lib.secp256k1_context_create(
         lib.SECP256K1_CONTEXT_SIGN | lib.SECP256K1_CONTEXT_VERIFY
     ),
     lib.secp256k1_context_destroy,
 )
+if not lib.secp256k1_context_randomize(GLOBAL_CTX, secrets.token_bytes(32)):
+    raise RuntimeError("libsecp256k1 context randomization error")
+_THREAD_STATE = threading.local()
 P = 2**256 - 2**32 - 977
 N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
 
 
+POINT_CACHE = PointCache()
+enable_point_cache = POINT_CACHE.enable
+disable_point_cache = POINT_CACHE.disable
+clear_point_cache = POINT_CACHE.clear
+point_cache_info = POINT_CACHE.info
+
+
+def signing_context():
+    """Returns the calling thread's signing context, freshly randomized.
+    Per libsecp256k1 documentation, randomizing before signing helps
+    against side-channel attacks."""
+    ctx = getattr(_THREAD_STATE, "ctx", None)
+    if ctx is None:
+        ctx = ffi.gc(
+            lib.secp256k1_context_create(
+                lib.SECP256K1_CONTEXT_SIGN | lib.SECP256K1_CONTEXT_VERIFY
+            ),
+            lib.secp256k1_context_destroy,
+        )
+        _THREAD_STATE.ctx = ctx
+    if not lib.secp256k1_context_randomize(ctx, secrets.token_bytes(32)):
+        raise RuntimeError("libsecp256k1 context randomization error")
+    return ctx
+
+
+_POINT_ATTRIBUTES = {"c", "csec", "usec", "_parity", "_xonly", "_xonly_c"}
+
+
 class S256Point:
-    def __init__(self, csec=None, usec=None):
+    def __init__(self, csec=None, usec=None, c=None):
+        """Points keep their parsed secp256k1_pubkey in self.c and reuse it
+        for every operation. SEC and x-only serializations are computed
+        lazily and cached."""
+        self.csec = csec
+        self.usec = usec
+        self._parity = None
+        self._xonly = None
+        self._xonly_c = None
+        if c is not None:
+            self.c = c
+            return
         if usec:
-            self.usec = usec
-            self.csec = None
             sec_cache = usec
-            self.parity = usec[-1] & 1
         elif csec:
-            self.csec = csec
-            self.usec = None
             sec_cache = csec
-            self.parity = csec[0] - 2
         else:
             raise RuntimeError("need a serialization")
         self.c = ffi.new("secp256k1_pubkey *")
@@ -44,48 +91,57 @@ class S256Point:
         ):
             raise ValueError("libsecp256k1 produced error")
 
+    def __reduce__(self):
+        # the native struct can't be pickled, so send the compressed SEC.
+        # Subclasses like NamedPublicKey keep their extra attributes.
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in _POINT_ATTRIBUTES
+        }
+        return (self.__class__.parse_sec, (self.sec(),), state or None)
+
+    @property
+    def parity(self):
+        if self._parity is None:
+            if self.usec:
+                self._parity = self.usec[-1] & 1
+            else:
+                self._parity = self.sec()[0] - 2
+        return self._parity
+
     def __eq__(self, other):
         return self.sec() == other.sec()
 
     def __repr__(self):
         return f"S256Point({self.sec().hex()})"
 
+    def _copy_c(self):
+        """returns a fresh copy of the native pubkey that can be tweaked"""
+        return ffi.new("secp256k1_pubkey *", self.c[0])
+
     def __rmul__(self, coefficient):
         coef = coefficient % N
-        new_key = ffi.new("secp256k1_pubkey *")
-        s = self.sec(compressed=False)
-        if not lib.secp256k1_ec_pubkey_parse(GLOBAL_CTX, new_key, s, len(s)):
-            raise RuntimeError("libsecp256k1 parse error")
+        new_key = self._copy_c()
         if not lib.secp256k1_ec_pubkey_tweak_mul(
             GLOBAL_CTX, new_key, int_to_big_endian(coef, 32)
         ):
             raise RuntimeError("libsecp256k1 multiplication error")
-        serialized = ffi.new("unsigned char [65]")
-        output_len = ffi.new("size_t *", 65)
-        if not lib.secp256k1_ec_pubkey_serialize(
-            GLOBAL_CTX, serialized, output_len, new_key, lib.SECP256K1_EC_UNCOMPRESSED
-        ):
-            raise RuntimeError("libsecp256k1 serialization error")
-        return self.__class__(usec=bytes(serialized))
+        return self.__class__(c=new_key)
 
     def __add__(self, scalar):
         """Multiplies scalar by generator, adds result to current point"""
         coef = scalar % N
-        new_key = ffi.new("secp256k1_pubkey *")
-        s = self.sec(compressed=False)
-        if not lib.secp256k1_ec_pubkey_parse(GLOBAL_CTX, new_key, s, len(s)):
-            raise RuntimeError("libsecp256k1 parse error")
+        new_key = self._copy_c()
         if not lib.secp256k1_ec_pubkey_tweak_add(
             GLOBAL_CTX, new_key, int_to_big_endian(coef, 32)
         ):
             raise RuntimeError("libsecp256k1 add error")
-        serialized = ffi.new("unsigned char [65]")
-        output_len = ffi.new("size_t *", 65)
-        if not lib.secp256k1_ec_pubkey_serialize(
-            GLOBAL_CTX, serialized, output_len, new_key, lib.SECP256K1_EC_UNCOMPRESSED
-        ):
-            raise RuntimeError("libsecp256k1 serialize error")
-        return self.__class__(usec=bytes(serialized))
+        return self.__class__(c=new_key)
+
+    def add_many(self, scalars):
+        """Returns [self + scalar for scalar in scalars]"""
+        return [self + scalar for scalar in scalars]
 
     def even_point(self):
         if self.parity:
@@ -99,13 +155,8 @@ class S256Point:
         return lib.secp256k1_ecdsa_verify(GLOBAL_CTX, sig_data, msg, self.c)
 
     def verify_schnorr(self, msg, sig):
-        xonly_key = ffi.new("secp256k1_xonly_pubkey *")
-        if not lib.secp256k1_xonly_pubkey_from_pubkey(
-            GLOBAL_CTX, xonly_key, ffi.NULL, self.c
-        ):
-            raise RuntimeError("libsecp256k1 xonly pubkey error")
         return lib.secp256k1_schnorrsig_verify(
-            GLOBAL_CTX, sig.raw, msg, len(msg), xonly_key
+            GLOBAL_CTX, sig.raw, msg, len(msg), self.xonly_c()
         )
 
     def sec(self, compressed=True):
@@ -141,17 +192,29 @@ class S256Point:
                 self.usec = bytes(ffi.buffer(serialized, 65))
             return self.usec
 
+    def xonly_c(self):
+        """returns the native secp256k1_xonly_pubkey, computed once"""
+        if self._xonly_c is None:
+            xonly_key = ffi.new("secp256k1_xonly_pubkey *")
+            parity = ffi.new("int *")
+            if not lib.secp256k1_xonly_pubkey_from_pubkey(
+                GLOBAL_CTX, xonly_key, parity, self.c
+            ):
+                raise RuntimeError("libsecp256k1 xonly pubkey error")
+            self._xonly_c = xonly_key
+            self._parity = parity[0]
+        return self._xonly_c
+
     def xonly(self):
         # returns the binary version of XONLY pubkey
-        xonly_key = ffi.new("secp256k1_xonly_pubkey *")
-        if not lib.secp256k1_xonly_pubkey_from_pubkey(
-            GLOBAL_CTX, xonly_key, ffi.NULL, self.c
-        ):
-            raise RuntimeError("libsecp256k1 xonly pubkey error")
-        output32 = ffi.new("unsigned char [32]")
-        if not lib.secp256k1_xonly_pubkey_serialize(GLOBAL_CTX, output32, xonly_key):
-            raise RuntimeError("libsecp256k1 xonly serialize error")
-        return bytes(ffi.buffer(output32, 32))
+        if self._xonly is None:
+            output32 = ffi.new("unsigned char [32]")
+            if not lib.secp256k1_xonly_pubkey_serialize(
+                GLOBAL_CTX, output32, self.xonly_c()
+            ):
+                raise RuntimeError("libsecp256k1 xonly serialize error")
+            self._xonly = bytes(ffi.buffer(output32, 32))
+        return self._xonly
 
     def tweak(self, merkle_root=b""):
         """returns the tweak for use in p2tr"""
@@ -251,41 +314,32 @@ class S256Point:
     @classmethod
     def parse_sec(cls, sec_bin):
         """returns a Point object from a SEC binary (not hex)"""
+        key = bytes(sec_bin)
+        cached = POINT_CACHE.get(key)
         if sec_bin[0] == 4:
-            return cls(usec=sec_bin)
+            kwargs = {"usec": key}
         else:
-            return cls(csec=sec_bin)
+            kwargs = {"csec": key}
+        if cached is not None:
+            return cls(c=ffi.new("secp256k1_pubkey *", cached[0]), **kwargs)
+        point = cls(**kwargs)
+        POINT_CACHE.put(key, point.c)
+        return point
 
     @classmethod
     def parse_xonly(cls, binary):
         sec_bin = b"\x02" + binary
-        return cls(csec=sec_bin)
+        return cls.parse_sec(sec_bin)
 
     @classmethod
     def combine(cls, points):
-        c_pubkeys = []
-        for point in points:
-            new_key = ffi.new("secp256k1_pubkey *")
-            s = point.sec(compressed=False)
-            if not lib.secp256k1_ec_pubkey_parse(GLOBAL_CTX, new_key, s, len(s)):
-                raise RuntimeError("libsecp256k1 parse error")
-            c_pubkeys.append(new_key)
+        c_pubkeys = [point.c for point in points]
         sum_pub_key = ffi.new("secp256k1_pubkey *")
         if not lib.secp256k1_ec_pubkey_combine(
             GLOBAL_CTX, sum_pub_key, c_pubkeys, len(c_pubkeys)
         ):
             raise RuntimeError("libsecp256k1 combine error")
-        serialized = ffi.new("unsigned char [65]")
-        output_len = ffi.new("size_t *", 65)
-        if not lib.secp256k1_ec_pubkey_serialize(
-            GLOBAL_CTX,
-            serialized,
-            output_len,
-            sum_pub_key,
-            lib.SECP256K1_EC_UNCOMPRESSED,
-        ):
-            raise RuntimeError("libsecp256k1 serialization error")
-        return cls(usec=bytes(serialized))
+        return cls(c=sum_pub_key)
 
 
 G = S256Point(
@@ -313,6 +367,12 @@ class Signature:
     def __eq__(self, other):
         return self.der() == other.der()
 
+    def __hash__(self):
+        return hash(self.der())
+
+    def __reduce__(self):
+        return (self.__class__.parse, (self.der(),))
+
     def __repr__(self):
         return f"Signature{self.der().hex()}"
 
@@ -356,6 +416,9 @@ class SchnorrSignature:
     def __eq__(self, other):
         return self.raw == other.raw
 
+    def __reduce__(self):
+        return (self.__class__.parse, (self.raw,))
+
     def serialize(self):
         return self.raw
 
@@ -364,6 +427,18 @@ class SchnorrSignature:
         return cls(raw)
 
 
+def verify_schnorr_batch(items):
+    """Verifies a list of (point, msg, schnorr_sig) tuples.
+    Returns a list of booleans with the same meaning as verify_schnorr.
+    libsecp256k1 doesn't expose batch verification and building the
+    random linear combination out of tweak_mul calls would cost more than
+    the individual checks, so every signature is checked natively."""
+    return [bool(point.verify_schnorr(msg, sig)) for point, msg, sig in items]
+
+
+sign_many, verify_many = batch_functions(thread_map)
+
+
 class PrivateKey:
     def __init__(self, secret, network="mainnet", compressed=True):
         self.secret = secret
@@ -381,18 +456,11 @@ class PrivateKey:
             return self.secret
 
     def sign(self, z):
-        # per libsecp256k1 documentation, this helps against side-channel attacks
-        if not lib.secp256k1_context_randomize(
-            GLOBAL_CTX,
-            secrets.token_bytes(32),
-        ):
-            raise RuntimeError("libsecp256k1 context randomization error")
+        ctx = signing_context()
         secret = int_to_big_endian(self.secret, 32)
         msg = int_to_big_endian(z, 32)
         csig = ffi.new("secp256k1_ecdsa_signature *")
-        if not lib.secp256k1_ecdsa_sign(
-            GLOBAL_CTX, csig, msg, secret, ffi.NULL, ffi.NULL
-        ):
+        if not lib.secp256k1_ecdsa_sign(ctx, csig, msg, secret, ffi.NULL, ffi.NULL):
             raise RuntimeError("libsecp256k1 ecdsa signing problem")
         sig = Signature(c=csig)
         if not self.point.verify(z, sig):
@@ -404,19 +472,14 @@ class PrivateKey:
             raise ValueError("msg needs to be 32 bytes")
         if len(aux) != 32:
             raise ValueError("aux needs to be 32 bytes")
-        # per libsecp256k1 documentation, this helps against side-channel attacks
-        if not lib.secp256k1_context_randomize(
-            GLOBAL_CTX,
-            secrets.token_bytes(32),
-        ):
-            raise RuntimeError("libsecp256k1 context randomization error")
+        ctx = signing_context()
         keypair = ffi.new("secp256k1_keypair *")
         if not lib.secp256k1_keypair_create(
-            GLOBAL_CTX, keypair, int_to_big_endian(self.secret, 32)
+            ctx, keypair, int_to_big_endian(self.secret, 32)
         ):
             raise RuntimeError("libsecp256k1 keypair creation problem")
         raw_sig = ffi.new("unsigned char [64]")
-        if not lib.secp256k1_schnorrsig_sign(GLOBAL_CTX, raw_sig, msg, keypair, aux):
+        if not lib.secp256k1_schnorrsig_sign(ctx, raw_sig, msg, keypair, aux):
             raise RuntimeError("libsecp256k1 schnorr signing problem")
         return SchnorrSignature(bytes(ffi.buffer(raw_sig, 64)))
 
@@ -25,6 +25,25 @@ def tagged_hash(tag, msg):
     return bytes(ffi.buffer(result, 32))
 
 
+def tagged_hash_many(tag, msgs):
+    """returns [tagged_hash(tag, msg) for msg in msgs]"""
+    result = ffi.new("unsigned char [32]")
+    tag_length = len(tag)
+    digests = []
+    for msg in msgs:
+        if not lib.secp256k1_tagged_sha256(
+            GLOBAL_CTX,
+            result,
+            tag,
+            tag_length,
+            msg,
+            len(msg),
+        ):
+            raise RuntimeError("libsecp256k1 tagged hash problem")
+        digests.append(bytes(ffi.buffer(result, 32)))
+    return digests
+
+
 def hash_aux(msg):
     return tagged_hash(b"BIP0340/aux", msg)
 
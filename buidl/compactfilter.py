@@ -7,7 +7,7 @@ from buidl.helper import (
     read_varint,
     read_varstr,
 )
-from buidl.siphash import SipHash_2_4
+from buidl.siphash import siphash, siphash_many
 
 
 BASIC_FILTER_TYPE = 0
@@ -15,27 +15,24 @@ GOLOMB_P = 19
 GOLOMB_M = int(round(1.497137 * 2**GOLOMB_P))
 
 
-def _siphash(key, value):
-    if len(key) != 16:
-        raise ValueError("Key should be 16 bytes")
-    sip = SipHash_2_4(key)
-    sip.update(value)
-    return sip.hash()
+_siphash = siphash
 
 
 def hash_to_range(key, value, f):
     """Returns a number between 0 and f-1, uniformly distributed.
     Uses siphash-2-4."""
-    return _siphash(key, value) * f >> 64
+    return siphash(key, value) * f >> 64
+
+
+def hashes_to_range(key, values, f):
+    """hash_to_range for many values, hashed in a single batch"""
+    return [h * f >> 64 for h in siphash_many(key, values)]
 
 
 def hashed_items(key, items):
     n = len(items)
     f = n * GOLOMB_M
-    result = []
-    for item in items:
-        result.append(hash_to_range(key, item, f))
-    return sorted(result)
+    return sorted(hashes_to_range(key, items, f))
 
 
 def encode_golomb(x, p):
@@ -149,6 +146,14 @@ class CompactFilter:
     def compute_hash(self, raw_script_pubkey):
         return hash_to_range(self.key, raw_script_pubkey, self.f)
 
+    def compute_hashes(self, raw_script_pubkeys):
+        return hashes_to_range(self.key, raw_script_pubkeys, self.f)
+
+    def matches_any(self, script_pubkeys):
+        """True if any of the script pubkeys is in the filter"""
+        raw_script_pubkeys = [s.raw_serialize() for s in script_pubkeys]
+        return not self.hashes.isdisjoint(self.compute_hashes(raw_script_pubkeys))
+
     def __contains__(self, script_pubkey):
         raw_script_pubkey = script_pubkey.raw_serialize()
         return self.compute_hash(raw_script_pubkey) in self.hashes
@@ -306,34 +306,54 @@ class P2WSHSortedMulti:
         If is_change=True, then we display change addresses.
         If is_change=False we display receive addresses.
 
+        sort_keys is for expert users only and should be left as True
+        """
+        return self.get_addresses(
+            offset=offset, limit=1, is_change=is_change, sort_keys=sort_keys
+        )[0]
+
+    def get_addresses(self, offset=0, limit=10, is_change=False, sort_keys=True):
+        """
+        Returns limit consecutive addresses starting at offset.
+        Much faster than calling get_address in a loop since the child keys
+        for every cosigner are derived together.
+
+        If is_change=True, then we display change addresses.
+        If is_change=False we display receive addresses.
+
         sort_keys is for expert users only and should be left as True
         """
         assert type(is_change) is bool, is_change
         assert type(offset) is int and offset >= 0, offset
+        assert type(limit) is int and limit >= 1, limit
 
-        sec_hexes_to_use = []
+        # one list of leaf SECs per key record
+        secs_per_key_record = []
         for key_record in self.key_records:
             hdpubkey = HDPublicKey.parse(key_record["xpub_parent"])
             if is_change is True:
                 account = key_record["account_index"] + 1
             else:
                 account = key_record["account_index"]
-            leaf_xpub = hdpubkey.child(account).child(offset)
-            sec_hexes_to_use.append(leaf_xpub.sec().hex())
-
-        commands = [number_to_op_code(self.quorum_m)]
-        if sort_keys:
-            # BIP67 lexicographical sorting for sortedmulti
-            commands.extend([bytes.fromhex(x) for x in sorted(sec_hexes_to_use)])
-        else:
-            commands.extend([bytes.fromhex(x) for x in sec_hexes_to_use])
-
-        commands.append(number_to_op_code(len(self.key_records)))
-        commands.append(174)  # OP_CHECKMULTISIG
-
-        witness_script = WitnessScript(commands)
-        redeem_script = P2WSHScriptPubKey(sha256(witness_script.raw_serialize()))
-        return redeem_script.address(network=self.network)
+            leaf_xpubs = hdpubkey.child(account).children(range(offset, offset + limit))
+            secs_per_key_record.append([leaf_xpub.sec() for leaf_xpub in leaf_xpubs])
+
+        addresses = []
+        for secs_to_use in zip(*secs_per_key_record):
+            commands = [number_to_op_code(self.quorum_m)]
+            if sort_keys:
+                # BIP67 lexicographical sorting for sortedmulti
+                commands.extend(sorted(secs_to_use))
+            else:
+                commands.extend(secs_to_use)
+
+            commands.append(number_to_op_code(len(self.key_records)))
+            commands.append(174)  # OP_CHECKMULTISIG
+
+            witness_script = WitnessScript(commands)
+            redeem_script = P2WSHScriptPubKey(sha256(witness_script.raw_serialize()))
+            addresses.append(redeem_script.address(network=self.network))
+        return addresses
 
     def caravan_export(self, wallet_name="p2wsh", key_record_names=[]):
         if key_record_names and len(key_record_names) != len(self.key_records):
@@ -0,0 +1,30 @@
+"""
+The pure python secp256k1 code running on gmpy2 integers.
+
+This module loads a second copy of buidl.pecc with its curve constants
+built as gmpy2.mpz values from the start, so default arguments and the
+tables made at import time use them too. The jacobian arithmetic reduces
+everything mod P, so every intermediate becomes an mpz and the
+multiplications and modular inversions run in GMP. Keys, points and
+signatures still hold plain ints. Serializing needs mpz.to_bytes, so this
+wants gmpy2 2.2 or later. Importing this module raises ModuleNotFoundError
+when gmpy2 is not installed or too old.
+"""
+import importlib.util
+
+from gmpy2 import mpz
+
+from buidl import pecc as _pecc
+from buidl.backend import public_names
+
+
+if not hasattr(mpz(1), "to_bytes"):
+    raise ModuleNotFoundError("buidl.gecc needs gmpy2 2.2 or later")
+
+_spec = importlib.util.spec_from_file_location(__name__, _pecc.__file__)
+_curve = importlib.util.module_from_spec(_spec)
+_curve._INTEGER = mpz
+_spec.loader.exec_module(_curve)
+
+globals().update(public_names(_curve))
+_INTEGER_TYPES = _curve._INTEGER_TYPES
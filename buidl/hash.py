@@ -1,4 +1,3 @@
-try:
-    from buidl.chash import *  # noqa: F401,F403
-except ModuleNotFoundError:
-    from buidl.phash import *  # noqa: F401,F403
+from buidl.backend import active_backend, load_backend, public_names
+
+globals().update(public_names(load_backend(active_backend())[1]))
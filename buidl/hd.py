@@ -6,7 +6,6 @@ from buidl.helper import (
     byte_to_int,
     encode_base58_checksum,
     hmac_sha512,
-    hmac_sha512_kdf,
     int_to_big_endian,
     int_to_byte,
     is_intable,
@@ -16,7 +15,7 @@ from buidl.mnemonic import (
     BIP39,
     InvalidChecksumWordsError,
     secure_mnemonic,
-    mnemonic_to_bytes,
+    mnemonic_to_seed,
 )
 from buidl.shamir import ShareSet
 
@@ -467,14 +466,7 @@ class HDPrivateKey:
         pub_version=None,
     ):
         """Returns a HDPrivateKey object from the mnemonic."""
-        # this will check that the mnemonic is valid
-        mnemonic_to_bytes(mnemonic)
-        # normalize in case we got a mnemonic that's just the first 4 letters
-        normalized = " ".join([BIP39.normalize(word) for word in mnemonic.split()])
-        # salt is b'mnemonic' + password
-        salt = b"mnemonic" + password
-        # the seed is the hmac_sha512_kdf with normalized mnemonic and salt
-        seed = hmac_sha512_kdf(normalized, salt)
+        seed = mnemonic_to_seed(mnemonic, password)
         # return the HDPrivateKey at the path specified
         return cls.from_seed(
             seed, network=network, priv_version=priv_version, pub_version=pub_version
@@ -592,36 +584,48 @@ class HDPublicKey:
         """Returns the child HDPublicKey at a particular index.
         Raises ValueError for indices >= 0x8000000 and indices < 0.
         """
-        if index >= 0x80000000:
-            raise ValueError("child number should always be less than 2^31")
-        if index < 0:
-            raise ValueError("child number should always be positive")
+        return self.children([index])[0]
 
-        # data is the SEC compressed and the index in 4 bytes big-endian
-        data = self.point.sec() + int_to_big_endian(index, 4)
-        # get hmac_sha512 with chain code, data
-        h = hmac_sha512(self.chain_code, data)
-        # the new public point is the current point +
-        #  the first 32 bytes in big endian * G
-        point = self.point + big_endian_to_int(h[:32])
-        # chain code is the last 32 bytes
-        chain_code = h[32:]
-        # depth is current depth + 1
-        depth = self.depth + 1
+    def children(self, indices):
+        """Returns the child HDPublicKeys at each of the indices.
+        Deriving many children at once is much faster than calling child
+        in a loop as the points are computed together.
+        Raises ValueError for indices >= 0x8000000 and indices < 0.
+        """
+        indices = list(indices)
+        for index in indices:
+            if index >= 0x80000000:
+                raise ValueError("child number should always be less than 2^31")
+            if index < 0:
+                raise ValueError("child number should always be positive")
+        sec = self.point.sec()
+        tweaks, chain_codes = [], []
+        for index in indices:
+            # data is the SEC compressed and the index in 4 bytes big-endian
+            data = sec + int_to_big_endian(index, 4)
+            # get hmac_sha512 with chain code, data
+            h = hmac_sha512(self.chain_code, data)
+            # the tweak is the first 32 bytes in big endian
+            tweaks.append(big_endian_to_int(h[:32]))
+            # chain code is the last 32 bytes
+            chain_codes.append(h[32:])
+        # the new public points are the current point + tweak * G
+        points = self.point.add_many(tweaks)
         # parent_fingerprint is the fingerprint of this node
         parent_fingerprint = self.fingerprint()
-        # child number is the index
-        child_number = index
-        # return the HDPublicKey instance
-        return HDPublicKey(
-            point=point,
-            chain_code=chain_code,
-            depth=depth,
-            parent_fingerprint=parent_fingerprint,
-            child_number=child_number,
-            network=self.network,
-            pub_version=self.pub_version,
-        )
+        # return the HDPublicKey instances
+        return [
+            HDPublicKey(
+                point=point,
+                chain_code=chain_code,
+                depth=self.depth + 1,
+                parent_fingerprint=parent_fingerprint,
+                child_number=index,
+                network=self.network,
+                pub_version=self.pub_version,
+            )
+            for index, point, chain_code in zip(indices, points, chain_codes)
+        ]
 
     def traverse(self, path):
         """Returns the HDPublicKey at the path indicated.
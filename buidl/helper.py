@@ -1,27 +1,20 @@
 import hashlib
 import hmac
+import os
 import re
 
 from base64 import b64decode, b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from weakref import ref
 from buidl.pbkdf2 import PBKDF2
+from buidl.siphash import siphash as _siphash  # noqa: F401
 
 try:
-    from csiphash import siphash24
-
-    def _siphash(key, value):
-        if len(key) != 16:
-            raise ValueError("Key should be 16 bytes")
-        return little_endian_to_int(siphash24(key, value))
-
-except ModuleNotFoundError:
-    from buidl.siphash import SipHash_2_4
-
-    def _siphash(key, value):
-        if len(key) != 16:
-            raise ValueError("Key should be 16 bytes")
-        sip = SipHash_2_4(key)
-        sip.update(value)
-        return sip.hash()
+    # implemented in C, but python can be built without it
+    from hashlib import pbkdf2_hmac as _pbkdf2_hmac
+except ImportError:
+    _pbkdf2_hmac = None
 
 
 SIGHASH_DEFAULT = 0
@@ -177,6 +170,26 @@ def read_varint(s):
         return i
 
 
+def read_varint_at(b, offset):
+    """reads a variable integer at offset in a bytes-like object,
+    returns the integer and the offset right after it"""
+    if offset >= len(b):
+        raise IOError("buffer has no bytes at offset")
+    i = b[offset]
+    if i == 0xFD:
+        # 0xfd means the next two bytes are the number
+        return int.from_bytes(b[offset + 1 : offset + 3], "little"), offset + 3
+    elif i == 0xFE:
+        # 0xfe means the next four bytes are the number
+        return int.from_bytes(b[offset + 1 : offset + 5], "little"), offset + 5
+    elif i == 0xFF:
+        # 0xff means the next eight bytes are the number
+        return int.from_bytes(b[offset + 1 : offset + 9], "little"), offset + 9
+    else:
+        # anything else is just the integer
+        return i, offset + 1
+
+
 def encode_varint(i):
     """encodes an integer as a varint"""
     if i < 0xFD:
@@ -326,6 +339,12 @@ def hmac_sha512(key, msg):
 
 
 def hmac_sha512_kdf(msg, salt):
+    if isinstance(msg, str):
+        msg = msg.encode("utf-8")
+    if isinstance(salt, str):
+        salt = salt.encode("utf-8")
+    if _pbkdf2_hmac is not None:
+        return _pbkdf2_hmac("sha512", msg, salt, PBKDF2_ROUNDS)
     return PBKDF2(
         msg,
         salt,
@@ -450,3 +469,153 @@ def is_intable(int_as_string):
 
 def xor_bytes(a, b):
     return bytes(x ^ y for x, y in zip(a, b))
+
+
+class LRUCache:
+    """A size-bounded mapping that evicts the least recently used entry.
+    A maxsize of 0 disables the cache: get always misses and put is a no-op."""
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """returns the cached value for key or None"""
+        value = self.entries.get(key)
+        if value is None:
+            if self.maxsize:
+                self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """changes the bound, evicting the oldest entries if needed"""
+        self.maxsize = maxsize
+        while len(self.entries) > maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """drops every entry and resets the counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "size": len(self.entries),
+        }
+
+
+class ObservedList(list):
+    """A list that tells its observers about changes made in place, by
+    calling their _list_changed with the items that were added. Observers
+    are held weakly and aren't pickled or copied, so owners observe the
+    list again after unpickling."""
+
+    # weak references, a WeakSet costs more than the list it watches
+    _observers = ()
+
+    def observe(self, observer):
+        refs = [r for r in self._observers if r() not in (None, observer)]
+        refs.append(ref(observer))
+        self._observers = refs
+        return self
+
+    def _changed(self, added=()):
+        for observer in [r() for r in self._observers]:
+            if observer is not None:
+                observer._list_changed(added)
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = list(value)
+            added = value
+        else:
+            added = [value]
+        super().__setitem__(key, value)
+        self._changed(added)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+
+    def append(self, item):
+        super().append(item)
+        self._changed([item])
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._changed(items)
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._changed([item])
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed()
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+
+def thread_map(func, items, max_workers=None):
+    """Returns [func(item) for item in items], splitting the items into one
+    contiguous chunk per thread. Only useful when func spends its time in
+    code that releases the GIL."""
+    items = list(items)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(items))
+    if max_workers <= 1:
+        return [func(item) for item in items]
+    size = -(-len(items) // max_workers)
+    chunks = [items[i : i + size] for i in range(0, len(items), size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda chunk: [func(item) for item in chunk], chunks)
+    return [result for chunk in results for result in chunk]
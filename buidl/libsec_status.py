@@ -1,3 +1,6 @@
+from buidl.backend import active_backend, available_backends
+
+
 def is_libsec_enabled():
     try:
         from buidl import cecc  # noqa: F401
@@ -5,3 +8,12 @@ def is_libsec_enabled():
         return True
     except ModuleNotFoundError:
         return False
+
+
+def backend_status():
+    """Reports which crypto backend is in use and which ones could be"""
+    return {
+        "active": active_backend(),
+        "available": available_backends(),
+        "libsec": is_libsec_enabled(),
+    }
@@ -1,8 +1,10 @@
-from os import path
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from os import cpu_count, path
 from secrets import randbits
 from time import time
 
-from buidl.helper import big_endian_to_int, int_to_big_endian, sha256
+from buidl.helper import big_endian_to_int, hmac_sha512_kdf, int_to_big_endian, sha256
 
 
 class InvalidBIP39Length(Exception):
@@ -98,6 +100,37 @@ def bytes_to_mnemonic(b, num_bits):
     return " ".join(mnemonic)
 
 
+def mnemonic_to_seed(mnemonic, password=b""):
+    """returns the 64 byte BIP39 seed for the mnemonic and password"""
+    # this will check that the mnemonic is valid
+    mnemonic_to_bytes(mnemonic)
+    # normalize in case we got a mnemonic that's just the first 4 letters
+    normalized = " ".join([BIP39.normalize(word) for word in mnemonic.split()])
+    # salt is b'mnemonic' + password
+    salt = b"mnemonic" + password
+    # the seed is the hmac_sha512_kdf with normalized mnemonic and salt
+    return hmac_sha512_kdf(normalized, salt)
+
+
+def mnemonic_to_seeds(mnemonic, passwords, max_workers=None):
+    """Returns the seeds for the mnemonic under each of the passwords,
+    in order. The key stretching runs across a pool of processes, which
+    is worth it when trying many candidate passwords."""
+    passwords = list(passwords)
+    # this will check that the mnemonic is valid before starting the pool
+    mnemonic_to_bytes(mnemonic)
+    workers = max_workers or cpu_count() or 1
+    if workers == 1 or len(passwords) <= 1:
+        return [mnemonic_to_seed(mnemonic, password) for password in passwords]
+    chunksize = max(1, len(passwords) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                mnemonic_to_seed, repeat(mnemonic), passwords, chunksize=chunksize
+            )
+        )
+
+
 class WordList:
     def __init__(self, filename, num_words):
         word_file = path.join(path.dirname(__file__), filename)
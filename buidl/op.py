@@ -728,7 +728,7 @@ def op_checksig(stack, tx_obj, input_index):
     point = S256Point.parse(sec_pubkey)
     # parse the der format signature with Signature
     sig = Signature.parse(der_signature)
-    z = tx_obj.sig_hash(input_index, hash_type)
+    z = tx_obj.sighash_context().sig_hash(input_index, hash_type)
     # verify using the point, z and signature
     # if verified add encode_num(1) to the end, otherwise encode_num(0)
     if point.verify(z, sig):
@@ -758,7 +758,7 @@ def op_checksig_schnorr(stack, tx_obj, input_index):
     else:
         hash_type = 0
     sig = SchnorrSignature.parse(signature)
-    msg = tx_obj.sig_hash(input_index, hash_type)
+    msg = tx_obj.sighash_context().sig_hash(input_index, hash_type)
     if point.verify_schnorr(msg, sig):
         stack.append(encode_num(1))
     else:
@@ -787,7 +787,7 @@ def op_checksigadd_schnorr(stack, tx_obj, input_index):
     else:
         hash_type = 0
     sig = SchnorrSignature.parse(signature)
-    msg = tx_obj.sig_hash(input_index, hash_type)
+    msg = tx_obj.sighash_context().sig_hash(input_index, hash_type)
     if point.verify_schnorr(msg, sig):
         stack.append(encode_num(n + 1))
     else:
@@ -817,13 +817,14 @@ def op_checkmultisig(stack, tx_obj, input_index):
     try:
         # parse the sec pubkeys into an array of points
         points = [S256Point.parse(sec) for sec in sec_pubkeys]
+        # signatures with the same hash type share a sig hash
+        context = tx_obj.sighash_context()
         # loop through the signatures
         for der_signature, hash_type in der_signatures:
             sig = Signature.parse(der_signature)
-            z = tx_obj.sig_hash(input_index, hash_type)
+            z = context.sig_hash(input_index, hash_type)
             # bail early if we don't have any points left
             if len(points) == 0:
-                print("signatures no good or not in right order")
                 return False
             # while we have points
             while points:
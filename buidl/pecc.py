@@ -2,7 +2,9 @@ from io import BytesIO
 
 import hmac
 import hashlib
+import secrets
 
+from buidl._ecc_common import PointCache, batch_functions, serial_map
 from buidl.hash import (
     hash_aux,
     hash_challenge,
@@ -20,7 +22,16 @@ from buidl.helper import (
 )
 
 
+POINT_CACHE = PointCache()
+enable_point_cache = POINT_CACHE.enable
+disable_point_cache = POINT_CACHE.disable
+clear_point_cache = POINT_CACHE.clear
+point_cache_info = POINT_CACHE.info
+
+
 class FieldElement:
+    __slots__ = ("num", "prime")
+
     def __init__(self, num, prime):
         if num >= prime or num < 0:
             error = f"Num {num} not in field range 0 to {prime - 1}"
@@ -102,6 +113,8 @@ class FieldElement:
 
 
 class Point:
+    __slots__ = ("a", "b", "x", "y")
+
     def __init__(self, x, y, a, b):
         self.a = a
         self.b = b
@@ -191,15 +204,63 @@ class Point:
         return result
 
 
+# the type of the curve constants. buidl.gecc loads this module again with
+# _INTEGER set to gmpy2.mpz beforehand, so that the arithmetic runs in GMP.
+# Keys, points and signatures hold plain ints either way.
+try:
+    _INTEGER
+except NameError:
+    _INTEGER = int
 A = 0
 B = 7
-P = 2**256 - 2**32 - 977
-N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+P = _INTEGER(2**256 - 2**32 - 977)
+# what S256Point takes as a coordinate or scalar
+_INTEGER_TYPES = (int,) if _INTEGER is int else (int, _INTEGER)
+N = _INTEGER(0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141)
 
 
 class S256Field(FieldElement):
+    """Field elements mod P. The arithmetic results are always in range
+    so they skip the validation FieldElement.__init__ does."""
+
+    __slots__ = ()
+
     def __init__(self, num, prime=None):
-        super().__init__(num=num, prime=P)
+        super().__init__(num=int(num), prime=P)
+
+    @classmethod
+    def _new(cls, num):
+        """builds an element from an int already reduced mod P"""
+        element = object.__new__(cls)
+        element.num = int(num)
+        element.prime = P
+        return element
+
+    def __add__(self, other):
+        if other.prime != P:
+            raise TypeError("Cannot add two numbers in different Fields")
+        return self._new((self.num + other.num) % P)
+
+    def __sub__(self, other):
+        if other.prime != P:
+            raise TypeError("Cannot add two numbers in different Fields")
+        return self._new((self.num - other.num) % P)
+
+    def __mul__(self, other):
+        if other.prime != P:
+            raise TypeError("Cannot add two numbers in different Fields")
+        return self._new(self.num * other.num % P)
+
+    def __pow__(self, n):
+        return self._new(pow(self.num, n % (P - 1), P))
+
+    def __truediv__(self, other):
+        if other.prime != P:
+            raise TypeError("Cannot add two numbers in different Fields")
+        return self._new(self.num * pow(other.num, P - 2, P) % P)
+
+    def __rmul__(self, coefficient):
+        return self._new(self.num * coefficient % P)
 
     def hex(self):
         return "{:x}".format(self.num).zfill(64)
@@ -214,10 +275,311 @@ class S256Field(FieldElement):
         return s
 
 
+_FIELD_A = S256Field(A)
+_FIELD_B = S256Field(B)
+
+
+# Jacobian coordinates (X, Y, Z) represent the affine point (X/Z^2, Y/Z^3).
+# Doing the arithmetic this way means we only need a single modular
+# inversion when we convert back to affine at the very end instead of
+# one inversion per addition/doubling. These work on plain ints mod P.
+# Z == 0 represents the point at infinity.
+JACOBIAN_INFINITY = (1, 1, 0)
+
+
+def _jacobian_double(p):
+    """Doubles a jacobian point on y^2 = x^3 + 7 (dbl-2009-l)"""
+    x1, y1, z1 = p
+    if z1 == 0 or y1 == 0:
+        return JACOBIAN_INFINITY
+    a = x1 * x1 % P
+    b = y1 * y1 % P
+    c = b * b % P
+    d = 2 * ((x1 + b) * (x1 + b) - a - c) % P
+    e = 3 * a % P
+    x3 = (e * e - 2 * d) % P
+    y3 = (e * (d - x3) - 8 * c) % P
+    z3 = 2 * y1 * z1 % P
+    return (x3, y3, z3)
+
+
+def _jacobian_add(p, q):
+    """Adds two jacobian points (add-2007-bl, mixed addition when q has Z=1)"""
+    x1, y1, z1 = p
+    x2, y2, z2 = q
+    if z1 == 0:
+        return q
+    if z2 == 0:
+        return p
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    if z2 == 1:
+        u1, s1 = x1, y1
+    else:
+        z2z2 = z2 * z2 % P
+        u1 = x1 * z2z2 % P
+        s1 = y1 * z2 * z2z2 % P
+    h = (u2 - u1) % P
+    r = (s2 - s1) % P
+    if h == 0:
+        if r == 0:
+            # same point, so double
+            return _jacobian_double(p)
+        # additive inverses
+        return JACOBIAN_INFINITY
+    hh = h * h % P
+    hhh = h * hh % P
+    v = u1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - s1 * hhh) % P
+    z3 = z1 * z2 * h % P
+    return (x3, y3, z3)
+
+
+def _jacobian_negate(p):
+    x, y, z = p
+    return (x, (P - y) % P, z)
+
+
+# window widths for wNAF recoding; the generator gets a wider window
+# since its odd multiples are computed only once per process
+WNAF_WIDTH = 5
+GENERATOR_WNAF_WIDTH = 8
+
+
+def _wnaf(coef, width):
+    """Returns the width-w non-adjacent form of coef, least significant first.
+    Every non-zero digit is odd and less than 2**(width-1) in absolute value
+    and at most one in any width consecutive digits is non-zero."""
+    digits = []
+    half = 1 << (width - 1)
+    full = 1 << width
+    while coef:
+        if coef & 1:
+            digit = coef & (full - 1)
+            if digit >= half:
+                digit -= full
+            coef -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        coef >>= 1
+    return digits
+
+
+def _odd_multiples(p, count):
+    """Returns [p, 3p, 5p, ...] with count entries"""
+    double = _jacobian_double(p)
+    multiples = [p]
+    for _ in range(count - 1):
+        multiples.append(_jacobian_add(multiples[-1], double))
+    return multiples
+
+
+# GLV endomorphism: for the cube root of unity BETA mod P, the map
+# (x, y) -> (BETA*x, y) is the same as multiplying by LAMBDA mod N. Any
+# scalar k can be split into k1 + k2*LAMBDA with k1, k2 around 128 bits,
+# which halves the number of doublings in a multiplication.
+BETA = _INTEGER(0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE)
+LAMBDA = _INTEGER(0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72)
+# short basis of the lattice {(a, b): a + b*LAMBDA = 0 mod N}
+GLV_A1 = 0x3086D221A7D46BCDE86C90E49284EB15
+GLV_B1 = -0xE4437ED6010E88286F547FA90ABFE4C3
+GLV_A2 = 0x114CA50F7A8E2F3F657C1108D9D44CFD8
+GLV_B2 = 0x3086D221A7D46BCDE86C90E49284EB15
+
+
+def _glv_split(coef):
+    """Returns (k1, k2) such that k1 + k2*LAMBDA = coef mod N.
+    Either can be negative."""
+    c1 = (GLV_B2 * coef + N // 2) // N
+    c2 = (-GLV_B1 * coef + N // 2) // N
+    k1 = coef - c1 * GLV_A1 - c2 * GLV_A2
+    k2 = -c1 * GLV_B1 - c2 * GLV_B2
+    return k1, k2
+
+
+def _endomorphism(p):
+    """Returns LAMBDA * p, which only costs one field multiplication"""
+    x, y, z = p
+    return (BETA * x % P, y, z)
+
+
+def _wnaf_term(coef, width, multiples):
+    if coef < 0:
+        return ([-digit for digit in _wnaf(-coef, width)], multiples)
+    return (_wnaf(coef, width), multiples)
+
+
+def _multi_multiply(pairs, glv=True):
+    """Computes the sum of coef * point over (coef, point) pairs using
+    Strauss-Shamir interleaving: a single chain of doublings is shared
+    by every term and each term only adds at its non-zero wNAF digits.
+    With glv, each coefficient is split in two halves with the
+    endomorphism so the chain of doublings is half as long."""
+    terms = []
+    for coef, point in pairs:
+        coef %= N
+        if coef == 0 or point.x is None:
+            continue
+        if point == G:
+            width = GENERATOR_WNAF_WIDTH
+            multiples, endo_multiples = _generator_odd_multiples()
+        else:
+            width = WNAF_WIDTH
+            multiples = _odd_multiples(_to_jacobian(point), 1 << (width - 2))
+            endo_multiples = None
+        if glv:
+            if endo_multiples is None:
+                endo_multiples = [_endomorphism(m) for m in multiples]
+            k1, k2 = _glv_split(coef)
+            terms.append(_wnaf_term(k1, width, multiples))
+            terms.append(_wnaf_term(k2, width, endo_multiples))
+        else:
+            terms.append(_wnaf_term(coef, width, multiples))
+    length = max([len(digits) for digits, _ in terms], default=0)
+    result = JACOBIAN_INFINITY
+    for i in range(length - 1, -1, -1):
+        result = _jacobian_double(result)
+        for digits, multiples in terms:
+            if i < len(digits) and digits[i]:
+                digit = digits[i]
+                if digit > 0:
+                    result = _jacobian_add(result, multiples[digit >> 1])
+                else:
+                    result = _jacobian_add(
+                        result, _jacobian_negate(multiples[-digit >> 1])
+                    )
+    return result
+
+
+_GENERATOR_ODD_MULTIPLES = None
+
+
+def _generator_odd_multiples():
+    """Returns the odd multiples of G and of LAMBDA*G, built once"""
+    global _GENERATOR_ODD_MULTIPLES
+    if _GENERATOR_ODD_MULTIPLES is None:
+        multiples = _batch_to_affine(
+            _odd_multiples(_to_jacobian(G), 1 << (GENERATOR_WNAF_WIDTH - 2))
+        )
+        _GENERATOR_ODD_MULTIPLES = (
+            multiples,
+            [_endomorphism(m) for m in multiples],
+        )
+    return _GENERATOR_ODD_MULTIPLES
+
+
+# Fixed-base table for the generator: for every 4-bit window i we store
+# j * 16**i * G for j = 1..15, so k*G becomes at most 64 additions and no
+# doublings. Built once per process on first use.
+GENERATOR_WINDOW = 4
+_GENERATOR_TABLE = None
+
+
+def _generator_table():
+    global _GENERATOR_TABLE
+    if _GENERATOR_TABLE is None:
+        table = []
+        base = _to_jacobian(G)
+        for _ in range(256 // GENERATOR_WINDOW):
+            row = [base]
+            for _ in range(2**GENERATOR_WINDOW - 2):
+                row.append(_jacobian_add(row[-1], base))
+            table.append(row)
+            for _ in range(GENERATOR_WINDOW):
+                base = _jacobian_double(base)
+        # normalize everything to Z=1 so lookups can use mixed additions
+        flat = _batch_to_affine([p for row in table for p in row])
+        size = len(table[0])
+        _GENERATOR_TABLE = [flat[i : i + size] for i in range(0, len(flat), size)]
+    return _GENERATOR_TABLE
+
+
+def _generator_multiply(coef):
+    """Computes coef * G using the fixed-base table"""
+    mask = 2**GENERATOR_WINDOW - 1
+    result = JACOBIAN_INFINITY
+    for row in _generator_table():
+        digit = coef & mask
+        if digit:
+            result = _jacobian_add(result, row[digit - 1])
+        coef >>= GENERATOR_WINDOW
+    return result
+
+
+def _to_jacobian(point):
+    if point.x is None:
+        return JACOBIAN_INFINITY
+    return (point.x.num, point.y.num, 1)
+
+
+def _from_jacobian(p):
+    """Converts a jacobian point back to an S256Point, one inversion"""
+    x, y, z = p
+    if z == 0:
+        return S256Point._new(None, None)
+    z_inv = pow(z, P - 2, P)
+    z_inv2 = z_inv * z_inv % P
+    return S256Point._new(x * z_inv2 % P, y * z_inv2 * z_inv % P)
+
+
+def batch_inverse(nums, prime=P):
+    """Returns the modular inverses of all of nums using Montgomery's trick:
+    a single inversion plus three multiplications per number."""
+    if not nums:
+        return []
+    # prefix[i] is the product of nums[0..i]
+    prefix = []
+    acc = 1
+    for num in nums:
+        if num % prime == 0:
+            raise ZeroDivisionError("0 has no inverse")
+        acc = acc * num % prime
+        prefix.append(acc)
+    acc_inv = pow(acc, prime - 2, prime)
+    inverses = [0] * len(nums)
+    for i in range(len(nums) - 1, 0, -1):
+        inverses[i] = acc_inv * prefix[i - 1] % prime
+        acc_inv = acc_inv * nums[i] % prime
+    inverses[0] = acc_inv
+    return inverses
+
+
+def _batch_to_affine(points):
+    """Normalizes jacobian points to Z=1 with a single inversion.
+    The point at infinity is left alone."""
+    finite = [p for p in points if p[2] != 0]
+    inverses = iter(batch_inverse([p[2] for p in finite]))
+    result = []
+    for x, y, z in points:
+        if z == 0:
+            result.append(JACOBIAN_INFINITY)
+            continue
+        z_inv = next(inverses)
+        z_inv2 = z_inv * z_inv % P
+        result.append((x * z_inv2 % P, y * z_inv2 * z_inv % P, 1))
+    return result
+
+
+def _batch_from_jacobian(points):
+    """Converts jacobian points to S256Points with a single inversion"""
+    result = []
+    for x, y, z in _batch_to_affine(points):
+        if z == 0:
+            result.append(S256Point._new(None, None))
+        else:
+            result.append(S256Point._new(x, y))
+    return result
+
+
 class S256Point(Point):
+    __slots__ = ("parity",)
+
     def __init__(self, x, y, a=None, b=None):
-        a, b = S256Field(A), S256Field(B)
-        if isinstance(x, int):
+        a, b = _FIELD_A, _FIELD_B
+        if isinstance(x, _INTEGER_TYPES):
             super().__init__(x=S256Field(x), y=S256Field(y), a=a, b=b)
         else:
             super().__init__(x=x, y=y, a=a, b=b)
@@ -228,9 +590,32 @@ class S256Point(Point):
         else:
             self.parity = 0
 
+    @classmethod
+    def _new(cls, x, y):
+        """builds a point from ints mod P that are known to be on the curve,
+        skipping the curve equation check. None, None is infinity."""
+        point = object.__new__(cls)
+        point.a = _FIELD_A
+        point.b = _FIELD_B
+        if x is None:
+            point.x = point.y = None
+            return point
+        point.x = S256Field._new(x)
+        point.y = S256Field._new(y)
+        point.parity = point.y.num & 1
+        return point
+
     def __eq__(self, other):
         return self.x == other.x and self.y == other.y
 
+    def __reduce__(self):
+        # uncompressed SEC so unpickling doesn't need a square root.
+        # Subclasses like NamedPublicKey keep their extra attributes.
+        state = getattr(self, "__dict__", None) or None
+        if self.x is None:
+            return (self.__class__._new, (None, None), state)
+        return (self.__class__.parse_sec, (self.sec(False),), state)
+
     def __repr__(self):
         if self.x is None:
             return "S256Point(infinity)"
@@ -240,15 +625,32 @@ class S256Point(Point):
     def __rmul__(self, coefficient):
         # we want to mod by N to make this simple
         coef = coefficient % N
-        return super().__rmul__(coef)
+        if coef == 0 or self.x is None:
+            return self._new(None, None)
+        if coef == N - 1:
+            # negation is just flipping y
+            return self._new(self.x.num, P - self.y.num)
+        if self == G:
+            return _from_jacobian(_generator_multiply(coef))
+        return _from_jacobian(_multi_multiply([(coef, self)]))
 
     def __add__(self, other):
         """If other is an int, multiplies scalar by generator, adds result to current point"""
-        if isinstance(other, int):
-            return super().__add__(other * G)
+        if isinstance(other, _INTEGER_TYPES):
+            # stay in jacobian coordinates so we only invert once
+            total = _generator_multiply(other % N)
+            return _from_jacobian(_jacobian_add(total, _to_jacobian(self)))
         else:
             return super().__add__(other)
 
+    def add_many(self, scalars):
+        """Returns [self + scalar for scalar in scalars], converting all the
+        resulting points back to affine with a single inversion"""
+        base = _to_jacobian(self)
+        return _batch_from_jacobian(
+            [_jacobian_add(_generator_multiply(s % N), base) for s in scalars]
+        )
+
     def even_point(self):
         if self.parity:
             return -1 * self
@@ -361,8 +763,11 @@ class S256Point(Point):
         # v = r / s
         v = sig.r * s_inv % N
         # u*G + v*P should have as the x coordinate, r
-        total = u * G + v * self
-        return total.x.num == sig.r
+        # computed in one pass and compared without converting to affine
+        x, _, z = _multi_multiply([(u, G), (v, self)])
+        if z == 0:
+            return False
+        return x == sig.r * z * z % P
 
     def verify_message(self, message, sig):
         """Verify a message in the form of bytes. Assumes that the z
@@ -375,15 +780,17 @@ class S256Point(Point):
         return self.verify(z, sig)
 
     def verify_schnorr(self, msg, schnorr_sig):
-        if self.parity:
-            point = -1 * self
-        else:
-            point = self
         if schnorr_sig.r.x is None:
             return False
-        message = schnorr_sig.r.xonly() + point.xonly() + msg
+        # the even point shares the x coordinate with this one
+        message = schnorr_sig.r.xonly() + self.xonly() + msg
         challenge = big_endian_to_int(hash_challenge(message)) % N
-        result = -challenge * point + schnorr_sig.s
+        # s*G - e*P where P is the even point, i.e. -self if self is odd
+        if self.parity:
+            coef = challenge
+        else:
+            coef = -challenge
+        result = _from_jacobian(_multi_multiply([(schnorr_sig.s, G), (coef, self)]))
         if result.x is None:
             return False
         if result.parity:
@@ -403,10 +810,16 @@ class S256Point(Point):
     @classmethod
     def parse_sec(cls, sec_bin):
         """returns a Point object from a SEC pubkey"""
+        key = bytes(sec_bin)
+        cached = POINT_CACHE.get(key)
+        if cached is not None:
+            return cls._new(*cached)
         if sec_bin[0] == 4:
             x = int(sec_bin[1:33].hex(), 16)
             y = int(sec_bin[33:65].hex(), 16)
-            return cls(x=x, y=y)
+            point = cls(x=x, y=y)
+            POINT_CACHE.put(key, (x, y))
+            return point
         is_even = sec_bin[0] == 2
         x = S256Field(int(sec_bin[1:].hex(), 16))
         # right side of the equation y^2 = x^3 + 7
@@ -419,10 +832,13 @@ class S256Point(Point):
         else:
             even_beta = S256Field(P - beta.num)
             odd_beta = beta
+        # sqrt checked that beta^2 == alpha so the point is on the curve
         if is_even:
-            return cls(x, even_beta)
+            point = cls._new(x.num, even_beta.num)
         else:
-            return cls(x, odd_beta)
+            point = cls._new(x.num, odd_beta.num)
+        POINT_CACHE.put(key, (point.x.num, point.y.num))
+        return point
 
     @classmethod
     def parse_xonly(cls, xonly_bin):
@@ -431,6 +847,10 @@ class S256Point(Point):
         if n == 0:
             # point at infinity
             return cls(None, None)
+        key = bytes(xonly_bin)
+        cached = POINT_CACHE.get(key)
+        if cached is not None:
+            return cls._new(*cached)
         x = S256Field(n)
         # right side of the equation y^2 = x^3 + 7
         alpha = x**3 + S256Field(B)
@@ -438,14 +858,12 @@ class S256Point(Point):
         beta = alpha.sqrt()
         if beta.num % 2 == 1:
             beta = S256Field(P - beta.num)
-        return cls(x, beta)
+        POINT_CACHE.put(key, (n, beta.num))
+        return cls._new(n, beta.num)
 
     @classmethod
     def combine(cls, points):
-        sum_point = points[0]
-        for point in points[1:]:
-            sum_point += point
-        return sum_point
+        return _from_jacobian(_multi_multiply([(1, point) for point in points]))
 
 
 G = S256Point(
@@ -455,13 +873,24 @@ G = S256Point(
 
 
 class Signature:
+    __slots__ = ("r", "s")
+
     def __init__(self, r, s):
-        self.r = r
-        self.s = s
+        self.r = int(r)
+        self.s = int(s)
 
     def __repr__(self):
         return "Signature({:x},{:x})".format(self.r, self.s)
 
+    def __eq__(self, other):
+        return self.r == other.r and self.s == other.s
+
+    def __hash__(self):
+        return hash((self.r, self.s))
+
+    def __reduce__(self):
+        return (self.__class__.parse, (self.der(),))
+
     def der(self):
         # convert the r part to bytes
         rbin = int_to_big_endian(self.r, 32)
@@ -511,11 +940,13 @@ class Signature:
 
 
 class SchnorrSignature:
+    __slots__ = ("r", "s")
+
     def __init__(self, r, s):
         self.r = r
         if s >= N:
             raise ValueError(f"{s:x} is greater than or equal to {N:x}")
-        self.s = s
+        self.s = int(s)
 
     def __repr__(self):
         return f"SchnorrSignature({self.r},{self.s:x})"
@@ -523,6 +954,10 @@ class SchnorrSignature:
     def __eq__(self, other):
         return self.r == other.r and self.s == other.s
 
+    def __reduce__(self):
+        # R goes as a point rather than x-only to avoid a square root
+        return (self.__class__, (self.r, self.s))
+
     def serialize(self):
         return self.r.xonly() + int_to_big_endian(self.s, 32)
 
@@ -534,9 +969,48 @@ class SchnorrSignature:
         return cls(r, s)
 
 
+def verify_schnorr_batch(items):
+    """Verifies a list of (point, msg, schnorr_sig) tuples with the BIP340
+    batch verification algorithm, which checks a random linear combination
+    of all the signatures with a single multi-scalar multiplication.
+    Returns a list of booleans with the same meaning as verify_schnorr.
+    If the batch doesn't verify, every signature is checked on its own
+    so the caller can tell which one failed."""
+    if all(sig.r.x is not None for _, _, sig in items):
+        total_s = 0
+        pairs = []
+        for i, (point, msg, sig) in enumerate(items):
+            # the first coefficient can be 1, the rest have to be random
+            if i == 0:
+                a = 1
+            else:
+                a = secrets.randbelow(N - 1) + 1
+            message = sig.r.xonly() + point.xonly() + msg
+            challenge = big_endian_to_int(hash_challenge(message)) % N
+            total_s += a * sig.s
+            # R and P are lifted to their even points, so we negate the
+            # coefficients of the even ones as we're checking
+            # (sum a*s)*G - sum a*R - sum a*e*P == 0
+            if sig.r.parity:
+                pairs.append((a, sig.r))
+            else:
+                pairs.append((-a, sig.r))
+            if point.parity:
+                pairs.append((a * challenge, point))
+            else:
+                pairs.append((-a * challenge, point))
+        _, _, z = _multi_multiply([(total_s, G)] + pairs)
+        if z == 0:
+            return [True] * len(items)
+    return [point.verify_schnorr(msg, sig) for point, msg, sig in items]
+
+
+sign_many, verify_many = batch_functions(serial_map)
+
+
 class PrivateKey:
     def __init__(self, secret, network="mainnet", compressed=True):
-        self.secret = secret
+        self.secret = int(secret)
         if secret > N - 1:
             raise RuntimeError("secret too big")
         if secret < 1:
@@ -565,7 +1039,7 @@ class PrivateKey:
 
     def even_secret(self):
         if self.point.parity:
-            return N - self.secret
+            return int(N - self.secret)
         else:
             return self.secret
 
@@ -584,7 +1058,7 @@ class PrivateKey:
         # t contains the secret, msg is added so it's unique to the
         # message and private key
         t = xor_bytes(int_to_big_endian(e, 32), hash_aux(aux))
-        return big_endian_to_int(hash_nonce(t + self.point.xonly() + msg)) % N
+        return int(big_endian_to_int(hash_nonce(t + self.point.xonly() + msg)) % N)
 
     def sign_schnorr(self, msg, aux=None):
         # e is the secret that generates an even y with the even_secret method
@@ -1,13 +1,35 @@
 import hashlib
 
 
+# tag: sha256 object that has already consumed sha256(tag) || sha256(tag).
+# Tagged hashes copy it instead of hashing the 64 byte prefix every time.
 TAG_HASH_CACHE = {}
 
 
+def tag_midstate(tag: bytes):
+    midstate = TAG_HASH_CACHE.get(tag)
+    if midstate is None:
+        tag_hash = hashlib.sha256(tag).digest()
+        midstate = hashlib.sha256(tag_hash + tag_hash)
+        TAG_HASH_CACHE[tag] = midstate
+    return midstate
+
+
 def tagged_hash(tag: bytes, msg: bytes) -> bytes:
-    if TAG_HASH_CACHE.get(tag) is None:
-        TAG_HASH_CACHE[tag] = hashlib.sha256(tag).digest() * 2
-    return hashlib.sha256(TAG_HASH_CACHE[tag] + msg).digest()
+    h = tag_midstate(tag).copy()
+    h.update(msg)
+    return h.digest()
+
+
+def tagged_hash_many(tag: bytes, msgs) -> list:
+    """returns [tagged_hash(tag, msg) for msg in msgs]"""
+    midstate = tag_midstate(tag)
+    result = []
+    for msg in msgs:
+        h = midstate.copy()
+        h.update(msg)
+        result.append(h.digest())
+    return result
 
 
 def hash_aux(msg):
@@ -48,3 +70,18 @@ def hash_tapsighash(msg):
 
 def hash_taptweak(msg):
     return tagged_hash(b"TapTweak", msg)
+
+
+for _tag in (
+    b"BIP0340/aux",
+    b"BIP0340/challenge",
+    b"BIP0340/nonce",
+    b"KeyAgg coefficient",
+    b"KeyAgg list",
+    b"MuSig/noncecoef",
+    b"TapBranch",
+    b"TapLeaf",
+    b"TapSighash",
+    b"TapTweak",
+):
+    tag_midstate(_tag)
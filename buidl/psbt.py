@@ -132,26 +132,31 @@ Path: {self.root_fingerprint.hex()}:{self.root_path}
         self.sync_point()
 
     def sync_point(self):
-        self.point.__class__ = NamedPublicKey
+        if not isinstance(self.point, NamedPublicKey):
+            # points may use __slots__, so build a new object instead of
+            # switching the class of the existing one
+            self.point = NamedPublicKey.parse_sec(self.point.sec(False))
         self.point.root_fingerprint = self.root_fingerprint
         self.point.root_path = self.root_path
         self.point.raw_path = self.raw_path
         self.point.network = self.network
 
-    def child(self, index):
-        child = super().child(index)
-        child.__class__ = self.__class__
-        child.root_fingerprint = self.root_fingerprint
-        child.root_path = self.root_path + child_to_path(index)
-        child.network = path_network(child.root_path)
-        child.raw_path = self.raw_path + int_to_little_endian(index, 4)
-        child.sync_point()
-        return child
+    def children(self, indices):
+        # indices is gone through twice, so it can't be a generator
+        indices = list(indices)
+        children = super().children(indices)
+        for index, child in zip(indices, children):
+            child.__class__ = self.__class__
+            child.root_fingerprint = self.root_fingerprint
+            child.root_path = self.root_path + child_to_path(index)
+            child.network = path_network(child.root_path)
+            child.raw_path = self.raw_path + int_to_little_endian(index, 4)
+            child.sync_point()
+        return children
 
     def pubkey_lookup(self, max_child=9):
         lookup = {}
-        for child_index in range(max_child + 1):
-            child = self.child(child_index)
+        for child in self.children(range(max_child + 1)):
             lookup[child.sec()] = child
             lookup[child.hash160()] = child
         return lookup
@@ -162,20 +167,16 @@ Path: {self.root_fingerprint.hex()}:{self.root_path}
         lookup = {}
         # create the external child (0)
         external = self.child(0)
-        # loop through to the maximum external child + 1
-        for child_index in range(max_external + 1):
-            # grab the child at the index
-            child = external.child(child_index)
+        # loop through the children up to the maximum external child
+        for child in external.children(range(max_external + 1)):
             # create the p2sh-p2wpkh RedeemScript of [0, hash160]
             redeem_script = RedeemScript([0, child.hash160()])
             # hash160 of the RedeemScript is the key, RedeemScript is the value
             lookup[redeem_script.hash160()] = redeem_script
         # create the internal child (1)
         internal = self.child(1)
-        # loop through to the maximum internal child + 1
-        for child_index in range(max_internal + 1):
-            # grab the child at the index
-            child = internal.child(child_index)
+        # loop through the children up to the maximum internal child
+        for child in internal.children(range(max_internal + 1)):
             # create the p2sh-p2wpkh RedeemScript of [0, hash160]
             redeem_script = RedeemScript([0, child.hash160()])
             # hash160 of the RedeemScript is the key, RedeemScript is the value
@@ -608,25 +609,45 @@ Extra:\n{self.extra_map}
         return base64_encode(self.serialize())
 
     def serialize(self):
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
+        self.serialize_globals_into(buf)
+        # per input data
+        for psbt_in in self.psbt_ins:
+            psbt_in.serialize_into(buf)
+        # per output data
+        for psbt_out in self.psbt_outs:
+            psbt_out.serialize_into(buf)
+
+    def serialize_globals_into(self, buf):
         # always start with the magic and separator
-        result = PSBT_MAGIC + PSBT_SEPARATOR
+        buf += PSBT_MAGIC + PSBT_SEPARATOR
         # tx
-        result += serialize_key_value(PSBT_GLOBAL_UNSIGNED_TX, self.tx_obj.serialize())
+        buf += serialize_key_value(PSBT_GLOBAL_UNSIGNED_TX, self.tx_obj.serialize())
         # xpubs
         for xpub in sorted(self.hd_pubs.keys()):
             hd_pub = self.hd_pubs[xpub]
-            result += hd_pub.serialize()
+            buf += hd_pub.serialize()
         for key in sorted(self.extra_map.keys()):
-            result += serialize_key_value(key, self.extra_map[key])
+            buf += serialize_key_value(key, self.extra_map[key])
         # delimiter
-        result += PSBT_DELIMITER
-        # per input data
-        for psbt_in in self.psbt_ins:
-            result += psbt_in.serialize()
-        # per output data
-        for psbt_out in self.psbt_outs:
-            result += psbt_out.serialize()
-        return result
+        buf += PSBT_DELIMITER
+
+    def write(self, s, chunk_size=65536):
+        """Writes the serialization to a stream, like a file or socket, in
+        pieces of about chunk_size bytes instead of all at once"""
+        buf = bytearray()
+        self.serialize_globals_into(buf)
+        for section in self.psbt_ins + self.psbt_outs:
+            if len(buf) >= chunk_size:
+                s.write(buf)
+                buf = bytearray()
+            section.serialize_into(buf)
+        s.write(buf)
 
     def remove_global_xpubs(self):
         """Blank the `hd_pubs` and return the PSBT in base64 serialized format"""
@@ -1253,8 +1274,8 @@ Witness:\n{self.witness}
                 prev_tx = Tx.parse(s)
                 if len(prev_tx.serialize()) != tx_len:
                     raise IOError("tx length does not match")
-                tx_in._value = prev_tx.tx_outs[tx_in.prev_index].amount
-                tx_in._script_pubkey = prev_tx.tx_outs[tx_in.prev_index].script_pubkey
+                spent = prev_tx.tx_outs[tx_in.prev_index]
+                tx_in.set_prevout(spent.amount, spent.script_pubkey)
             elif psbt_type == PSBT_IN_WITNESS_UTXO:
                 tx_out_len = read_varint(s)
                 if len(key) != 1:
@@ -1264,8 +1285,7 @@ Witness:\n{self.witness}
                 prev_out = TxOut.parse(s)
                 if len(prev_out.serialize()) != tx_out_len:
                     raise ValueError("tx out length does not match")
-                tx_in._value = prev_out.amount
-                tx_in._script_pubkey = prev_out.script_pubkey
+                tx_in.set_prevout(prev_out.amount, prev_out.script_pubkey)
             elif psbt_type == PSBT_IN_PARTIAL_SIG:
                 if sigs.get(key[1:]):
                     raise KeyError(f"Duplicate Key in parsing: {key.hex()}")
@@ -1326,15 +1346,18 @@ Witness:\n{self.witness}
         )
 
     def serialize(self):
-        result = b""
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
         if self.prev_tx:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_NON_WITNESS_UTXO, self.prev_tx.serialize()
             )
         elif self.prev_out:
-            result += serialize_key_value(
-                PSBT_IN_WITNESS_UTXO, self.prev_out.serialize()
-            )
+            buf += serialize_key_value(PSBT_IN_WITNESS_UTXO, self.prev_out.serialize())
         # we need to put the keys in the witness script or redeem script order
         keys = []
         if self.witness_script:
@@ -1348,36 +1371,35 @@ Witness:\n{self.witness}
         else:
             keys = sorted(self.sigs.keys())
         for key in keys:
-            result += serialize_key_value(PSBT_IN_PARTIAL_SIG + key, self.sigs[key])
+            buf += serialize_key_value(PSBT_IN_PARTIAL_SIG + key, self.sigs[key])
         if self.hash_type:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_SIGHASH_TYPE, int_to_little_endian(self.hash_type, 4)
             )
         if self.redeem_script:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_REDEEM_SCRIPT, self.redeem_script.raw_serialize()
             )
         if self.witness_script:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_WITNESS_SCRIPT, self.witness_script.raw_serialize()
             )
         for sec in sorted(self.named_pubs.keys()):
             named_pub = self.named_pubs[sec]
-            result += named_pub.serialize(PSBT_IN_BIP32_DERIVATION)
+            buf += named_pub.serialize(PSBT_IN_BIP32_DERIVATION)
         if self.script_sig:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_FINAL_SCRIPTSIG, self.script_sig.raw_serialize()
             )
         if self.witness:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_IN_FINAL_SCRIPTWITNESS, self.witness.serialize()
             )
         # extra
         for key in sorted(self.extra_map.keys()):
-            result += encode_varstr(key) + encode_varstr(self.extra_map[key])
+            buf += encode_varstr(key) + encode_varstr(self.extra_map[key])
         # delimiter
-        result += PSBT_DELIMITER
-        return result
+        buf += PSBT_DELIMITER
 
     def script_pubkey(self):
         if self.prev_tx:
@@ -1412,10 +1434,9 @@ Witness:\n{self.witness}
             return
         # get the ScriptPubKey that we're unlocking
         script_pubkey = prev_out.script_pubkey
-        # Set the _value and _script_pubkey properties of the TxIn object
+        # Set the value and ScriptPubKey of the TxIn object
         #  so that no full node is needed to look those up
-        self.tx_in._value = prev_out.amount
-        self.tx_in._script_pubkey = script_pubkey
+        self.tx_in.set_prevout(prev_out.amount, script_pubkey)
         # grab the RedeemScript
         if script_pubkey.is_p2sh():
             # see if we have a RedeemScript already defined or in the lookup
@@ -1764,24 +1785,28 @@ PSBT Pubs:\n{self.named_pubs}
         return cls(tx_out, redeem_script, witness_script, named_pubs, extra_map)
 
     def serialize(self):
-        result = b""
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
         if self.redeem_script:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_OUT_REDEEM_SCRIPT, self.redeem_script.raw_serialize()
             )
         if self.witness_script:
-            result += serialize_key_value(
+            buf += serialize_key_value(
                 PSBT_OUT_WITNESS_SCRIPT, self.witness_script.raw_serialize()
             )
         for key in sorted(self.named_pubs.keys()):
             named_pub = self.named_pubs[key]
-            result += named_pub.serialize(PSBT_OUT_BIP32_DERIVATION)
+            buf += named_pub.serialize(PSBT_OUT_BIP32_DERIVATION)
         # extra
         for key in sorted(self.extra_map.keys()):
-            result += encode_varstr(key) + encode_varstr(self.extra_map[key])
+            buf += encode_varstr(key) + encode_varstr(self.extra_map[key])
         # delimiter
-        result += PSBT_DELIMITER
-        return result
+        buf += PSBT_DELIMITER
 
     def update(self, pubkey_lookup, redeem_lookup, witness_lookup):
         """Updates the output with NamedPublicKeys, RedeemScript or WitnessScript that
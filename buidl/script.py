@@ -5,10 +5,10 @@ from buidl.ecc import S256Point
 from buidl.helper import (
     decode_base58,
     encode_base58_checksum,
+    encode_varint,
     encode_varstr,
     hash160,
     little_endian_to_int,
-    int_to_byte,
     int_to_little_endian,
     read_varstr,
     sha256,
@@ -26,6 +26,15 @@ from buidl.op import (
 )
 
 
+def _fail(reasons, message, quiet=False):
+    """Records why a script failed for Script.evaluate and returns False"""
+    if reasons is not None:
+        reasons.append(message)
+    elif not quiet:
+        print(message)
+    return False
+
+
 class Script:
     def __init__(self, commands=None):
         if commands is None:
@@ -61,48 +70,46 @@ class Script:
             if stream is None:
                 raise ValueError("provide one of stream/raw")
             raw = read_varstr(stream)
+        # walk the raw script with an index instead of a stream
+        raw = bytes(raw)
         length = len(raw)
-        s = BytesIO(raw)
         # initialize the commands array
         commands = []
         # initialize the number of bytes we've read to 0
         count = 0
         # loop until we've read length bytes
         while count < length:
-            # get the current byte
-            current = s.read(1)
+            # get the current byte as an integer
+            current_byte = raw[count]
             # increment the bytes we've read
             count += 1
-            # convert the current byte to an integer
-            current_byte = current[0]
             # if the current byte is between 1 and 75 inclusive
             if current_byte >= 1 and current_byte <= 75:
-                # we have an command set n to be the current byte
-                n = current_byte
-                # add the next n bytes as an command
-                commands.append(s.read(n))
+                # we have an command, add the next n bytes as an command
+                commands.append(raw[count : count + current_byte])
                 # increase the count by n
-                count += n
+                count += current_byte
             elif current_byte == 76:
                 # op_pushdata1
-                data_length = little_endian_to_int(s.read(1))
-                commands.append(s.read(data_length))
-                count += data_length + 1
+                data_length = little_endian_to_int(raw[count : count + 1])
+                count += 1
+                commands.append(raw[count : count + data_length])
+                count += data_length
             elif current_byte == 77:
                 # op_pushdata2
-                data_length = little_endian_to_int(s.read(2))
-                commands.append(s.read(data_length))
-                count += data_length + 2
+                data_length = little_endian_to_int(raw[count : count + 2])
+                count += 2
+                commands.append(raw[count : count + data_length])
+                count += data_length
             elif current_byte == 78:
                 # op_pushdata4
-                data_length = little_endian_to_int(s.read(4))
-                commands.append(s.read(data_length))
-                count += data_length + 4
+                data_length = little_endian_to_int(raw[count : count + 4])
+                count += 4
+                commands.append(raw[count : count + data_length])
+                count += data_length
             else:
-                # we have an op code. set the current byte to op_code
-                op_code = current_byte
-                # add the op_code to the list of commands
-                commands.append(op_code)
+                # we have an op code, add it to the list of commands
+                commands.append(current_byte)
         obj = cls(commands)
         if count != length:
             # Would throw error, but Bitcoin Core will read the number of bytes that are there (not what was promised)
@@ -119,33 +126,33 @@ class Script:
         if self.raw:
             return self.raw
         # initialize what we'll send back
-        result = b""
+        result = bytearray()
         # go through each command
         for command in self.commands:
             # if the command is an integer, it's an op code
             if isinstance(command, int):
-                # turn the command into a single byte integer using int_to_byte
-                result += int_to_byte(command)
+                # the op code is a single byte
+                result.append(command)
             else:
                 # otherwise, this is an element
                 # get the length in bytes
                 length = len(command)
                 # for large lengths, we have to use a pushdata op code
-                if length < 75:
-                    # turn the length into a single byte integer
-                    result += int_to_byte(length)
+                if length <= 75:
+                    # the length is a single byte
+                    result.append(length)
                 elif length > 75 and length < 0x100:
                     # 76 is pushdata1
-                    result += int_to_byte(76)
-                    result += int_to_byte(length)
+                    result.append(76)
+                    result.append(length)
                 elif length >= 0x100 and length <= 520:
                     # 77 is pushdata2
-                    result += int_to_byte(77)
+                    result.append(77)
                     result += int_to_little_endian(length, 2)
                 else:
                     raise ValueError("too long a command")
                 result += command
-        return result
+        return bytes(result)
 
     def serialize(self):
         # get the raw serialization (no prepended length)
@@ -153,7 +160,15 @@ class Script:
         # encode_varstr the result
         return encode_varstr(result)
 
-    def evaluate(self, tx_obj, input_index):
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
+        raw = self.raw_serialize()
+        buf += encode_varint(len(raw))
+        buf += raw
+
+    def evaluate(self, tx_obj, input_index, reasons=None):
+        """Returns whether the script succeeds for the input. Why it failed
+        gets printed, or appended to reasons if a list is passed in."""
         # create a copy as we may need to add to this list if we have a
         # RedeemScript
         commands = self.commands[:]
@@ -172,23 +187,19 @@ class Script:
                 if command in (99, 100):
                     # op_if/op_notif require the commands array
                     if not operation(stack, commands):
-                        print("bad op: {}".format(OP_CODE_NAMES[command]))
-                        return False
+                        return _fail(reasons, f"bad op: {OP_CODE_NAMES[command]}")
                 elif command in (107, 108):
                     # op_toaltstack/op_fromaltstack require the altstack
                     if not operation(stack, altstack):
-                        print("bad op: {}".format(OP_CODE_NAMES[command]))
-                        return False
+                        return _fail(reasons, f"bad op: {OP_CODE_NAMES[command]}")
                 elif command in (172, 173, 174, 175, 177, 178, 186):
                     # SIG ops (172-175, 186) and CLTV/CSV (177, 178)
                     # are operations that need the tx and input index
                     if not operation(stack, tx_obj, input_index):
-                        print("bad op: {}".format(OP_CODE_NAMES[command]))
-                        return False
+                        return _fail(reasons, f"bad op: {OP_CODE_NAMES[command]}")
                 else:
                     if not operation(stack):
-                        print("bad op: {}".format(OP_CODE_NAMES[command]))
-                        return False
+                        return _fail(reasons, f"bad op: {OP_CODE_NAMES[command]}")
             else:
                 # add the command to the stack
                 stack.append(command)
@@ -208,14 +219,13 @@ class Script:
                     h160 = commands.pop()
                     commands.pop()
                     if not op_hash160(stack):
-                        return False
+                        return _fail(reasons, "bad op: OP_HASH160", quiet=True)
                     stack.append(h160)
                     if not op_equal(stack):
-                        return False
+                        return _fail(reasons, "bad op: OP_EQUAL", quiet=True)
                     # final result should be a 1
                     if not op_verify(stack):
-                        print("bad p2sh h160")
-                        return False
+                        return _fail(reasons, "bad p2sh h160")
                     # hashes match! now add the RedeemScript
                     stream = BytesIO(redeem_script)
                     commands.extend(Script.parse(stream).commands)
@@ -234,10 +244,10 @@ class Script:
                     commands.extend(witness.items[:-1])
                     witness_script = witness.items[-1]
                     if s256 != sha256(witness_script):
-                        print(
-                            f"bad sha256 {s256.hex()} vs {sha256(witness_script).hex()}"
+                        return _fail(
+                            reasons,
+                            f"bad sha256 {s256.hex()} vs {sha256(witness_script).hex()}",
                         )
-                        return False
                     # hashes match! now add the Witness Script
                     stream = BytesIO(encode_varstr(witness_script))
                     witness_script_commands = Script.parse(stream).commands
@@ -246,10 +256,10 @@ class Script:
                 # 1 <32 byte hash> this is p2tr
                 elif len(stack) == 2 and stack[0] == b"\x01" and len(stack[1]) == 32:
                     if len(witness) == 0:
-                        print("stack in witness v1 empty")
-                        return False
+                        return _fail(reasons, "stack in witness v1 empty")
                     if witness.has_annex():
-                        # ignore the annex
+                        # ignore the annex. witness is a clone, so the
+                        # input and its transaction's caches keep it
                         witness.items.pop()
                     if len(witness) == 1:
                         # this is a key path spend
@@ -264,20 +274,18 @@ class Script:
                         tweak_point = control_block.external_pubkey(tap_script)
                         # the tweak point should be what's on the stack
                         if tweak_point.parity != control_block.parity:
-                            print("bad tweak point parity")
-                            return False
+                            return _fail(reasons, "bad tweak point parity")
                         if tweak_point.xonly() != stack.pop():
-                            print("bad tweak point")
-                            return False
+                            return _fail(reasons, "bad tweak point")
                         # pop off the 1 and start fresh
                         stack.pop()
                         tap_script = witness.tap_script()
                         commands = witness[:-2] + tap_script.commands[:]
                         op_lookup = TAPROOT_OP_CODE_FUNCTIONS
         if len(stack) == 0:
-            return False
+            return _fail(reasons, "empty stack", quiet=True)
         if stack.pop() == b"":
-            return False
+            return _fail(reasons, "script evaluated to false", quiet=True)
         return True
 
     def is_p2pkh(self):
@@ -353,8 +361,18 @@ class ScriptPubKey(Script):
     """Represents a ScriptPubKey in a transaction"""
 
     @classmethod
-    def parse(cls, s):
-        script_pubkey = super().parse(s)
+    def parse(cls, s=None, raw=None):
+        if s and raw:
+            raise ValueError("provide exactly one of stream/raw, not both")
+        if raw is None and s is not None:
+            raw = read_varstr(s)
+        if raw is not None:
+            # the standard templates can be recognized from the raw bytes
+            # without going through the script command by command
+            script_pubkey = cls.parse_standard(raw)
+            if script_pubkey is not None:
+                return script_pubkey
+        script_pubkey = super().parse(raw=raw)
         if script_pubkey.is_p2pkh():
             return P2PKHScriptPubKey(script_pubkey.commands[2])
         elif script_pubkey.is_p2sh():
@@ -368,6 +386,27 @@ class ScriptPubKey(Script):
         else:
             return script_pubkey
 
+    @classmethod
+    def parse_standard(cls, raw):
+        """Returns the ScriptPubKey for a raw script in one of the standard
+        minimally encoded templates, None for anything else"""
+        length = len(raw)
+        if length == 25:
+            if raw[:3] == b"\x76\xa9\x14" and raw[23:] == b"\x88\xac":
+                return P2PKHScriptPubKey(bytes(raw[3:23]))
+        elif length == 23:
+            if raw[:2] == b"\xa9\x14" and raw[22] == 0x87:
+                return P2SHScriptPubKey(bytes(raw[2:22]))
+        elif length == 22:
+            if raw[:2] == b"\x00\x14":
+                return P2WPKHScriptPubKey(bytes(raw[2:]))
+        elif length == 34:
+            if raw[:2] == b"\x00\x20":
+                return P2WSHScriptPubKey(bytes(raw[2:]))
+            elif raw[:2] == b"\x51\x20":
+                return P2TRScriptPubKey(bytes(raw[2:]))
+        return None
+
     def redeem_script(self):
         """Convert this ScriptPubKey to its RedeemScript equivalent"""
         return RedeemScript(self.commands)
@@ -44,6 +44,16 @@ b'310e0edd47db6f72'
 import struct
 import binascii
 
+try:
+    from csiphash import siphash24 as _c_siphash24
+except ModuleNotFoundError:
+    _c_siphash24 = None
+
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
+
 
 def _doublesipround(v, m):
     """
@@ -201,6 +211,95 @@ siphash24 = SipHash_2_4
 SipHash24 = SipHash_2_4
 
 
+# siphash/siphash_many pick the fastest implementation that is installed:
+# csiphash (C), NumPy for batches and SipHash_2_4 above otherwise. The
+# NumPy path has a fixed cost of around a millisecond, so it only wins
+# over pure python from about 64 items and over csiphash from about 1000.
+NUMPY_MIN_BATCH = 64
+NUMPY_OVER_C_MIN_BATCH = 1024
+
+
+def siphash(key, value):
+    """returns SipHash-2-4 of value under the 16 byte key as an int"""
+    if len(key) != 16:
+        raise ValueError("Key should be 16 bytes")
+    if _c_siphash24 is not None:
+        return _oneQ.unpack(_c_siphash24(key, value))[0]
+    return SipHash_2_4(key, value).hash()
+
+
+def siphash_many(key, values):
+    """returns [siphash(key, value) for value in values]"""
+    if len(key) != 16:
+        raise ValueError("Key should be 16 bytes")
+    values = list(values)
+    if _c_siphash24 is not None:
+        min_batch = NUMPY_OVER_C_MIN_BATCH
+    else:
+        min_batch = NUMPY_MIN_BATCH
+    if numpy is not None and len(values) >= min_batch:
+        return _siphash_numpy(key, values)
+    if _c_siphash24 is not None:
+        unpack = _oneQ.unpack
+        return [unpack(_c_siphash24(key, value))[0] for value in values]
+    return [SipHash_2_4(key, value).hash() for value in values]
+
+
+def _numpy_sipround(v0, v1, v2, v3):
+    v0 += v1
+    v1 = (v1 << numpy.uint64(13)) | (v1 >> numpy.uint64(51))
+    v1 ^= v0
+    v0 = (v0 << numpy.uint64(32)) | (v0 >> numpy.uint64(32))
+    v2 += v3
+    v3 = (v3 << numpy.uint64(16)) | (v3 >> numpy.uint64(48))
+    v3 ^= v2
+    v0 += v3
+    v3 = (v3 << numpy.uint64(21)) | (v3 >> numpy.uint64(43))
+    v3 ^= v0
+    v2 += v1
+    v1 = (v1 << numpy.uint64(17)) | (v1 >> numpy.uint64(47))
+    v1 ^= v2
+    v2 = (v2 << numpy.uint64(32)) | (v2 >> numpy.uint64(32))
+    return v0, v1, v2, v3
+
+
+def _siphash_numpy(key, values):
+    """SipHash-2-4 of many values under one key, one uint64 lane per value.
+    Values are grouped by their number of 8 byte blocks so that every
+    lane in a group runs the same rounds."""
+    k0, k1 = _twoQ.unpack(key)
+    groups = {}
+    for index, value in enumerate(values):
+        groups.setdefault(len(value) // 8 + 1, []).append(index)
+    result = [0] * len(values)
+    for num_blocks, indices in groups.items():
+        # pad each value to whole blocks, the last byte holds the length
+        padded = b"".join(
+            values[i]
+            + bytes(num_blocks * 8 - len(values[i]) - 1)
+            + bytes([len(values[i]) & 0xFF])
+            for i in indices
+        )
+        blocks = numpy.frombuffer(padded, dtype="<u8").reshape(len(indices), -1)
+        size = len(indices)
+        v0 = numpy.full(size, 0x736F6D6570736575 ^ k0, dtype=numpy.uint64)
+        v1 = numpy.full(size, 0x646F72616E646F6D ^ k1, dtype=numpy.uint64)
+        v2 = numpy.full(size, 0x6C7967656E657261 ^ k0, dtype=numpy.uint64)
+        v3 = numpy.full(size, 0x7465646279746573 ^ k1, dtype=numpy.uint64)
+        for column in range(num_blocks):
+            m = blocks[:, column].astype(numpy.uint64)
+            v3 ^= m
+            v0, v1, v2, v3 = _numpy_sipround(v0, v1, v2, v3)
+            v0, v1, v2, v3 = _numpy_sipround(v0, v1, v2, v3)
+            v0 ^= m
+        v2 ^= numpy.uint64(0xFF)
+        for _ in range(4):
+            v0, v1, v2, v3 = _numpy_sipround(v0, v1, v2, v3)
+        for i, h in zip(indices, (v0 ^ v1 ^ v2 ^ v3).tolist()):
+            result[i] = h
+    return result
+
+
 if __name__ == "__main__":
     # Test vectors as per spec
     vectors = [
@@ -1,9 +1,14 @@
 from os.path import dirname, realpath, sep
 from os import getenv
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
 from unittest import TestCase
 
 from buidl.tx import TxFetcher
 
+import json
+
 
 class OfflineTestCase(TestCase):
     cache_file = dirname(realpath(__file__)) + sep + "tx.cache"
@@ -21,3 +26,52 @@ class OfflineTestCase(TestCase):
             TxFetcher.fetch(tx_id="0" * 32)
 
         self.assertIn("Unit test requires internet", str(cm.exception))
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that counts its connections on the test case"""
+
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        self.server.test.connections += 1
+        super().handle()
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServerTestCase(TestCase):
+    """Serves handler on this machine for each test, with an empty TxFetcher cache
+
+    The raw transactions of the offline cache are in self.raw_txs and the
+    handler reaches the test case as self.server.test.
+    """
+
+    handler = LocalHandler
+
+    def setUp(self):
+        with open(OfflineTestCase.cache_file) as f:
+            self.raw_txs = json.load(f)
+        self.connections = 0
+        self.cache = TxFetcher.cache
+        TxFetcher.cache = {}
+        self.server = _Server(("127.0.0.1", 0), self.handler)
+        self.server.test = self
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        TxFetcher.cache = self.cache
@@ -1,5 +1,6 @@
 import socket
 
+from ipaddress import ip_address
 from os import getenv
 
 # Disable networking during pytest
@@ -12,5 +13,50 @@ def guard(*args, **kwargs):
     )
 
 
+def is_local_host(host):
+    if host is None:
+        # the wildcard address, for servers
+        return True
+    if isinstance(host, bytes):
+        host = host.decode()
+    try:
+        return ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def is_local(address):
+    if not isinstance(address, tuple):
+        # unix domain sockets
+        return True
+    return is_local_host(address[0])
+
+
+_getaddrinfo = socket.getaddrinfo
+
+
+def guarded_getaddrinfo(host, *args, **kwargs):
+    # stop before the DNS lookup, which would fail on its own offline
+    if not is_local_host(host):
+        guard()
+    return _getaddrinfo(host, *args, **kwargs)
+
+
+class GuardedSocket(socket.socket):
+    """A socket that can only connect to servers on this machine, so tests
+    can run their own stand-in servers"""
+
+    def connect(self, address):
+        if not is_local(address):
+            guard()
+        return super().connect(address)
+
+    def connect_ex(self, address):
+        if not is_local(address):
+            guard()
+        return super().connect_ex(address)
+
+
 if not getenv("INCLUDE_NETWORK_TESTS"):
-    socket.socket = guard
+    socket.socket = GuardedSocket
+    socket.getaddrinfo = guarded_getaddrinfo
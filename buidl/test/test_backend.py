@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from buidl import backend, hd, pecc, psbt
+from buidl.backend import (
+    active_backend,
+    available_backends,
+    is_backend_available,
+    load_backend,
+    select_backend,
+)
+from buidl.libsec_status import backend_status
+
+
+class BackendTest(TestCase):
+    def test_available(self):
+        self.assertIn("python", available_backends())
+        self.assertIn(active_backend(), available_backends())
+        self.assertEqual(backend_status()["active"], active_backend())
+        with self.assertRaises(ValueError):
+            load_backend("fortran")
+        for name in backend.BACKENDS:
+            if not is_backend_available(name):
+                with self.assertRaises(ModuleNotFoundError):
+                    load_backend(name)
+        # gmpy2 before 2.2 has no mpz.to_bytes
+        old_gmpy2 = SimpleNamespace(mpz=lambda num: object())
+        with patch.dict("sys.modules", {"gmpy2": old_gmpy2}):
+            self.assertFalse(is_backend_available("gmpy2"))
+
+    def test_select_backend(self):
+        from buidl import ecc, hash
+
+        original = active_backend()
+        try:
+            select_backend("python")
+            self.assertEqual(active_backend(), "python")
+            self.assertIs(ecc.S256Point, pecc.S256Point)
+            self.assertIs(hd.S256Point, pecc.S256Point)
+            self.assertIs(hash.hash_taptweak, load_backend("python")[1].hash_taptweak)
+            pub = hd.HDPrivateKey.from_seed(b"buidl backend test").pub
+            self.assertIsInstance(pub.child(0).point, pecc.S256Point)
+        finally:
+            select_backend(original)
+        self.assertIs(ecc.S256Point, load_backend(original)[0].S256Point)
+        self.assertIs(hd.S256Point, ecc.S256Point)
+
+    @skipUnless(len(available_backends()) > 1, "only one backend is installed")
+    def test_select_backend_psbt(self):
+        signed = "cHNidP8BAJoCAAAAAljoeiG1ba8MI76OcHBFbDNvfLqlyHV5JPVFiHuyq911AAAAAAD/////g40EJ9DsZQpoqka7CwmK6kQiwHGyyng1Kgd5WdB86h0BAAAAAP////8CcKrwCAAAAAAWABTYXCtx0AYLCcmIauuBXlCZHdoSTQDh9QUAAAAAFgAUAK6pouXw+HaliN9VRuh0LR2HAI8AAAAAAAEAuwIAAAABqtc5MQGL0l+ErkALaISL4J23BurCrBgpi6vucatlb4sAAAAASEcwRAIgWPb8fGoz4bMVSNSByCbAFb0wE1qtQs1neQ2rZtKtJDsCIEoc7SYExnNbY5PltBaR3XiwDwxZQvufdRhW+qk4FX26Af7///8CgPD6AgAAAAAXqRQPuUY0IWlrgsgzryQceMF9295JNIfQ8gonAQAAABepFCnKdPigj4GZlCgYXJe12FLkBj9hh2UAAAAiAgKVg785rgpgl0etGZrd1jT6YQhVnWxc05tMIYPxq5bgf0cwRAIgdAGK1BgAl7hzMjwAFXILNoTMgSOJEEjn282bVa1nnJkCIHPTabdA4+tT3O+jOCPIBwUUylWn3ZVE8VfBZ5EyYRGMAQEDBAEAAAABBEdSIQKVg785rgpgl0etGZrd1jT6YQhVnWxc05tMIYPxq5bgfyEC2rYf9JoU22p9ArDNH7t4/EsYMStbTlTa5Nui+/71NtdSriIGApWDvzmuCmCXR60Zmt3WNPphCFWdbFzTm0whg/GrluB/ENkMak8AAACAAAAAgAAAAIAiBgLath/0mhTban0CsM0fu3j8SxgxK1tOVNrk26L7/vU21xDZDGpPAAAAgAAAAIABAACAAAEBIADC6wsAAAAAF6kUt/X69A49QKWkWbHbNTXyty+pIeiHIgIDCJ3BDHrG21T5EymvYXMz2ziM6tDCMfcjN50bmQMLAtxHMEQCIGLrelVhB6fHP0WsSrWh3d9vcHX7EnWWmn84Pv/3hLyyAiAMBdu3Rw2/LwhVfdNWxzJcHtMJE+mWzThAlF2xIijaXwEBAwQBAAAAAQQiACCMI1MXN0O1ld+0oHtyuo5C43l9p06H/n2ddJfjsgKJAwEFR1IhAwidwQx6xttU+RMpr2FzM9s4jOrQwjH3IzedG5kDCwLcIQI63ZBPPW3PWd25BrDe4jUpt/+57VDl6GFRkmhgIh8Oc1KuIgYCOt2QTz1tz1nduQaw3uI1Kbf/ue1Q5ehhUZJoYCIfDnMQ2QxqTwAAAIAAAACAAwAAgCIGAwidwQx6xttU+RMpr2FzM9s4jOrQwjH3IzedG5kDCwLcENkMak8AAACAAAAAgAIAAIAAIgIDqaTDf1mW06ol26xrVwrwZQOUSSlCRgs1R1Ptnuylh3EQ2QxqTwAAAIAAAACABAAAgAAiAgJ/Y5l1fS7/VaE2rQLGhLGDi2VW5fG2s0KCqUtrUAUQlhDZDGpPAAAAgAAAAIAFAACAAA=="
+        original = active_backend()
+        other = [name for name in available_backends() if name != original][0]
+        try:
+            for name in (other, original):
+                select_backend(name)
+                ecc = load_backend(name)[0]
+                self.assertTrue(issubclass(psbt.NamedPublicKey, ecc.S256Point))
+                psbt_obj = psbt.PSBT.parse_base64(signed)
+                # checks the partial signatures with this backend
+                self.assertTrue(psbt_obj.validate())
+                for psbt_in in psbt_obj.psbt_ins:
+                    for named_pub in psbt_in.named_pubs.values():
+                        self.assertIsInstance(named_pub, ecc.S256Point)
+                self.assertEqual(psbt_obj.serialize_base64(), signed)
+        finally:
+            select_backend(original)
+
+    @skipUnless(is_backend_available("gmpy2"), "gmpy2 is not installed")
+    def test_gmpy2(self):
+        import gmpy2
+
+        gecc, _ = load_backend("gmpy2")
+        secret = 0x1234567890ABCDEF
+        msg = b"\x42" * 32
+        private_key = gecc.PrivateKey(secret)
+        expected = pecc.PrivateKey(secret)
+        self.assertEqual(private_key.point.sec(), expected.point.sec())
+        sig = private_key.sign_schnorr(msg)
+        self.assertEqual(sig.serialize(), expected.sign_schnorr(msg).serialize())
+        self.assertTrue(private_key.point.verify_schnorr(msg, sig))
+        z = int.from_bytes(msg, "big")
+        self.assertEqual(private_key.sign(z).der(), expected.sign(z).der())
+        # coordinates and scalars may be mpz as well as int
+        point = private_key.point
+        copy = gecc.S256Point(gmpy2.mpz(point.x.num), gmpy2.mpz(point.y.num))
+        self.assertEqual(copy.sec(), expected.point.sec())
+        self.assertEqual((point + gmpy2.mpz(7)).sec(), (expected.point + 7).sec())
+        # each backend caches its own kind of parsed points
+        self.assertIsNot(gecc.POINT_CACHE, pecc.POINT_CACHE)
+        self.assertIs(gecc.enable_point_cache.__self__, gecc.POINT_CACHE)
+        # the constants are mpz, default arguments included
+        self.assertIsInstance(gecc.P, type(gmpy2.mpz(1)))
+        self.assertIs(gecc.batch_inverse.__defaults__[0], gecc.P)
+        self.assertIsInstance(pecc.P, int)
+        # while what comes out is plain ints
+        for num in (
+            sig.s,
+            private_key.sign(z).r,
+            private_key.sign(z).s,
+            point.x.num,
+            (point + gmpy2.mpz(7)).y.num,
+            private_key.tweaked_key().secret,
+        ):
+            self.assertIs(type(num), int)
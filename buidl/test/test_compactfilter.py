@@ -1,10 +1,11 @@
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 
 from io import BytesIO
 
 from buidl.block import Block
 from buidl.compactfilter import (
     _siphash,
+    CompactFilter,
     decode_golomb,
     encode_golomb,
     decode_gcs,
@@ -17,6 +18,7 @@ from buidl.helper import (
     filter_null,
     hash256,
 )
+from buidl import siphash
 
 
 class CompactFilterTest(TestCase):
@@ -41,6 +43,36 @@ class CompactFilterTest(TestCase):
         with self.assertRaises(ValueError):
             _siphash(b"\x00" * 4, b"\x00")
 
+    def test_siphash_many(self):
+        key = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+        values = [bytes(range(length)) for length in range(40)] + [b"\xff" * 300]
+        want = [siphash.SipHash_2_4(key, value).hash() for value in values]
+        self.assertEqual(siphash.siphash_many(key, values), want)
+        self.assertEqual(siphash.siphash_many(key, []), [])
+        with self.assertRaises(ValueError):
+            siphash.siphash_many(b"\x00" * 4, values)
+
+    @skipUnless(siphash.numpy, "numpy is not installed")
+    def test_siphash_numpy(self):
+        key = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+        values = [bytes(range(length)) for length in range(40)] + [b"\xff" * 300]
+        want = [siphash.SipHash_2_4(key, value).hash() for value in values]
+        self.assertEqual(siphash._siphash_numpy(key, values), want)
+        # long enough batches take the NumPy path
+        self.assertEqual(siphash.siphash_many(key, values * 100), want * 100)
+        # vectors from the SipHash paper, the input is bytes 0 to length - 1
+        vectors = {
+            0: "310e0edd47db6f72",
+            1: "fd67dc93c539f874",
+            7: "37d1018bf50002ab",
+            8: "6224939a79f5f593",
+            15: "e545be4961ca29a1",
+            63: "724506eb4c328a95",
+        }
+        result = siphash._siphash_numpy(key, [bytes(range(i)) for i in vectors])
+        want = [int.from_bytes(bytes.fromhex(v), "little") for v in vectors.values()]
+        self.assertEqual(result, want)
+
     def test_golomb(self):
         tests = (
             # x, p, want
@@ -169,6 +201,11 @@ class CompactFilterTest(TestCase):
             self.assertEqual(cfilter.hex(), cfilter_hex, notes)
             decoded_items = decode_gcs(key, cfilter)
             self.assertEqual(decoded_items, hashed_items(key, items))
+            cf = CompactFilter.parse(key, cfilter)
+            self.assertEqual(
+                cf.compute_hashes(items), [cf.compute_hash(i) for i in items]
+            )
+            self.assertTrue(all(h in cf.hashes for h in cf.compute_hashes(items)))
             prev_hash = bytes.fromhex(prev_hash_hex)[::-1]
             filter_header = hash256(hash256(cfilter) + prev_hash)[::-1]
             self.assertEqual(filter_header_hex, filter_header.hex(), notes)
@@ -47,6 +47,15 @@ class P2WSHMultiTest(TestCase):
                 p2wsh_sortedmulti_obj.get_address(is_change=False, offset=cnt),
             )
 
+        self.assertEqual(
+            p2wsh_sortedmulti_obj.get_addresses(limit=3, is_change=True),
+            expected_change_addrs,
+        )
+        self.assertEqual(
+            p2wsh_sortedmulti_obj.get_addresses(offset=1, limit=2),
+            expected_receive_addrs[1:],
+        )
+
         expected_key_records = [
             {
                 "xfp": "c7d0648a",
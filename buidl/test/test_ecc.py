@@ -1,8 +1,24 @@
+import pickle
+
+from copy import deepcopy
 from os import urandom
 from random import randint
 from unittest import TestCase
 
-from buidl.ecc import G, N, S256Point, PrivateKey, Signature, SchnorrSignature
+from buidl.ecc import (
+    G,
+    N,
+    S256Point,
+    PrivateKey,
+    Signature,
+    SchnorrSignature,
+    clear_point_cache,
+    sign_many,
+    verify_many,
+    disable_point_cache,
+    enable_point_cache,
+    point_cache_info,
+)
 from buidl.bech32 import decode_bech32
 from buidl.hash import hash_challenge
 from buidl.helper import big_endian_to_int, int_to_big_endian
@@ -180,6 +196,34 @@ class S256Test(TestCase):
         )
         self.assertEqual(point.sec(False), usec)
 
+    def test_point_cache(self):
+        secs = [(randint(1, N - 1) * G).sec() for _ in range(3)]
+        enable_point_cache(maxsize=2)
+        try:
+            clear_point_cache()
+            first = S256Point.parse(secs[0])
+            second = S256Point.parse(secs[0])
+            self.assertEqual(first, second)
+            self.assertIsNot(first, second)
+            self.assertEqual(point_cache_info()["hits"], 1)
+            self.assertEqual(point_cache_info()["misses"], 1)
+            xonly = S256Point.parse(secs[1][1:])
+            self.assertEqual(S256Point.parse(secs[1][1:]), xonly)
+            S256Point.parse(secs[2])
+            # the bound evicts the least recently used key
+            self.assertEqual(point_cache_info()["size"], 2)
+            S256Point.parse(secs[0])
+            self.assertEqual(point_cache_info()["hits"], 2)
+            self.assertEqual(point_cache_info()["misses"], 4)
+            clear_point_cache()
+            self.assertEqual(
+                point_cache_info(), {"hits": 0, "misses": 0, "maxsize": 2, "size": 0}
+            )
+        finally:
+            disable_point_cache()
+        S256Point.parse(secs[0])
+        self.assertEqual(point_cache_info()["size"], 0)
+
 
 class SignatureTest(TestCase):
     def test_der(self):
@@ -234,3 +278,33 @@ class PrivateKeyTest(TestCase):
             s = (s + challenge * tweak) % N
         sig = SchnorrSignature.parse(r.xonly() + int_to_big_endian(s, 32))
         self.assertTrue(external_pubkey.verify_schnorr(msg, sig))
+
+    def test_pickle(self):
+        pk = PrivateKey(randint(1, N))
+        msg = int_to_big_endian(randint(1, N), 32)
+        sig = pk.sign(big_endian_to_int(msg))
+        schnorr_sig = pk.sign_schnorr(msg, aux=urandom(32))
+        for obj in (pk.point, sig, schnorr_sig):
+            copied = pickle.loads(pickle.dumps(obj))
+            self.assertIs(type(copied), type(obj))
+            self.assertEqual(copied, obj)
+            self.assertEqual(deepcopy(obj), obj)
+        # equal signatures hash the same, so they can go in sets
+        self.assertEqual(len({sig, pickle.loads(pickle.dumps(sig))}), 1)
+        point = pickle.loads(pickle.dumps(pk.point))
+        self.assertTrue(point.verify(big_endian_to_int(msg), sig))
+        self.assertTrue(point.verify_schnorr(msg, schnorr_sig))
+        copied = pickle.loads(pickle.dumps(pk))
+        self.assertEqual(copied.wif(), pk.wif())
+        self.assertEqual(copied.point, pk.point)
+
+    def test_sign_many(self):
+        keys = [PrivateKey(randint(1, N - 1)) for _ in range(5)]
+        zs = [randint(1, N - 1) for _ in range(5)]
+        sigs = sign_many(list(zip(keys, zs)), max_workers=3)
+        self.assertEqual(sigs, [pk.sign(z) for pk, z in zip(keys, zs)])
+        msg = int_to_big_endian(zs[0], 32)
+        items = [(pk.point, z, sig) for pk, z, sig in zip(keys, zs, sigs)]
+        items.append((keys[0].point, msg, keys[0].sign_schnorr(msg, aux=urandom(32))))
+        items.append((keys[1].point, zs[0], sigs[0]))
+        self.assertEqual(verify_many(items, max_workers=3), [True] * 6 + [False])
@@ -1,9 +1,25 @@
+from hashlib import sha256
 from unittest import TestCase
 
-from buidl.hash import hash_keyaggcoef
+from buidl.hash import hash_keyaggcoef, hash_tapsighash, tagged_hash, tagged_hash_many
 
 
 class HashTest(TestCase):
     def test_keyaggcoef(self):
         want = "55a02026378a033a97431c5ac6a72eeec43069940a330431216895c11eff3cc7"
         self.assertEqual(hash_keyaggcoef(b"").hex(), want)
+
+    def test_tagged_hash(self):
+        tag = b"TapSighash"
+        msgs = [b"", b"\x00" * 32, bytes(range(200))]
+        prefix = sha256(tag).digest() * 2
+        want = [sha256(prefix + msg).digest() for msg in msgs]
+        self.assertEqual([tagged_hash(tag, msg) for msg in msgs], want)
+        self.assertEqual([hash_tapsighash(msg) for msg in msgs], want)
+        self.assertEqual(tagged_hash_many(tag, msgs), want)
+        # new tags get a midstate on first use
+        self.assertEqual(
+            tagged_hash(b"buidl/test", b"msg"),
+            sha256(sha256(b"buidl/test").digest() * 2 + b"msg").digest(),
+        )
+        self.assertEqual(tagged_hash_many(tag, []), [])
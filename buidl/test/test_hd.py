@@ -61,6 +61,18 @@ class HDTest(TestCase):
             with self.assertRaises(ValueError):
                 pub.child(-1)
 
+    def test_children(self):
+        seed = b"jimmy@programmingblockchain.com Jimmy Song"
+        pub = HDPrivateKey.from_seed(seed, network="testnet").pub
+        children = pub.children(range(5, 10))
+        for index, child in zip(range(5, 10), children):
+            want = pub.child(index)
+            self.assertEqual(child.xpub(), want.xpub())
+            self.assertEqual(child.child_number, index)
+        self.assertEqual(pub.children([]), [])
+        with self.assertRaises(ValueError):
+            pub.children([0, 0x80000002])
+
     def test_traverse(self):
         seed = b"jimmy@programmingblockchain.com Jimmy Song"
         tests = (
@@ -1,14 +1,18 @@
 from unittest import TestCase
 
 from io import BytesIO
+from unittest.mock import patch
 
+from buidl import helper
 from buidl.helper import (
+    LRUCache,
     bit_field_to_bytes,
     bytes_to_bit_field,
     bytes_to_str,
     decode_base58,
     encode_base58_checksum,
     encode_varstr,
+    hmac_sha512_kdf,
     int_to_little_endian,
     little_endian_to_int,
     merkle_parent,
@@ -16,6 +20,7 @@ from buidl.helper import (
     merkle_root,
     read_varstr,
     str_to_bytes,
+    thread_map,
 )
 
 
@@ -214,3 +219,41 @@ class HelperTest(TestCase):
         self.assertEqual(encode_varstr(to_encode), want)
         stream = BytesIO(want)
         self.assertEqual(read_varstr(stream), to_encode)
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache.put(b"a", 1)
+        cache.put(b"b", 2)
+        self.assertEqual(cache.get(b"a"), 1)
+        cache.put(b"c", 3)
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"c"), 3)
+        self.assertEqual(
+            cache.info(), {"hits": 2, "misses": 1, "maxsize": 2, "size": 2}
+        )
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(
+            cache.info(), {"hits": 0, "misses": 0, "maxsize": 1, "size": 0}
+        )
+        disabled = LRUCache()
+        disabled.put(b"a", 1)
+        self.assertIsNone(disabled.get(b"a"))
+        self.assertEqual(disabled.misses, 0)
+
+    def test_thread_map(self):
+        items = list(range(10))
+        want = [item * item for item in items]
+        for max_workers in (None, 1, 3, 20):
+            self.assertEqual(thread_map(lambda x: x * x, items, max_workers), want)
+        self.assertEqual(thread_map(lambda x: x, [], 4), [])
+
+    def test_hmac_sha512_kdf(self):
+        msg, salt = "buidl", b"mnemonic"
+        want = hmac_sha512_kdf(msg, salt)
+        self.assertEqual(len(want), 64)
+        self.assertEqual(hmac_sha512_kdf(msg.encode("utf-8"), salt), want)
+        # the pure python fallback has to agree with hashlib
+        with patch.object(helper, "_pbkdf2_hmac", None):
+            self.assertEqual(hmac_sha512_kdf(msg, salt), want)
@@ -1,6 +1,11 @@
 from unittest import TestCase
 
-from buidl.mnemonic import secure_mnemonic
+from buidl.mnemonic import (
+    InvalidChecksumWordsError,
+    mnemonic_to_seed,
+    mnemonic_to_seeds,
+    secure_mnemonic,
+)
 from buidl.hd import HDPrivateKey
 
 
@@ -45,3 +50,18 @@ class MnemonicTest(TestCase):
             secure_mnemonic(extra_entropy="not an int")
         with self.assertRaises(ValueError):
             secure_mnemonic(extra_entropy=-1)
+
+    def test_mnemonic_to_seeds(self):
+        mnemonic = "abandon " * 11 + "about"
+        want = "c55257c360c07c72029aebc1b53c05ed0362ada38ead3e3e9efa3708e53495531f09a6987599d18264c1e1c92f2cf141630c7a3c4ab7c81b2f001698e7463b04"
+        self.assertEqual(mnemonic_to_seed(mnemonic, b"TREZOR").hex(), want)
+        passwords = [b"", b"TREZOR", b"buidl"]
+        seeds = [mnemonic_to_seed(mnemonic, password) for password in passwords]
+        self.assertEqual(seeds[1].hex(), want)
+        for max_workers in (1, 2):
+            self.assertEqual(
+                mnemonic_to_seeds(mnemonic, passwords, max_workers=max_workers), seeds
+            )
+        self.assertEqual(mnemonic_to_seeds(mnemonic, []), [])
+        with self.assertRaises(InvalidChecksumWordsError):
+            mnemonic_to_seeds("abandon " * 12, passwords)
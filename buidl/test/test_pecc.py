@@ -1,6 +1,20 @@
+from random import randint
 from unittest import TestCase
 
-from buidl.pecc import FieldElement, Point
+from buidl.pecc import (
+    BETA,
+    LAMBDA,
+    FieldElement,
+    G,
+    N,
+    P,
+    Point,
+    S256Point,
+    _from_jacobian,
+    _glv_split,
+    _multi_multiply,
+    batch_inverse,
+)
 
 
 class FieldElementTest(TestCase):
@@ -203,3 +217,83 @@ class ECCTest(TestCase):
                 p2 = Point(x2, y2, a, b)
             # check that the product is equal to the expected point
             self.assertEqual(s * p1, p2)
+
+
+class S256PointTest(TestCase):
+    def test_rmul(self):
+        # jacobian scalar multiplication should match the affine one
+        point = randint(1, N - 1) * G
+        for _ in range(3):
+            coef = randint(1, N - 1)
+            self.assertEqual(coef * G, Point.__rmul__(G, coef))
+            self.assertEqual(coef * point, Point.__rmul__(point, coef))
+        self.assertIsNone((N * G).x)
+        self.assertIsNone((0 * point).x)
+        self.assertEqual(2 * G, G + G)
+
+    def test_generator_table(self):
+        # fixed-base multiplication should match the generic one
+        coefs = [1, 15, 16, 2**252, N - 1, randint(1, N - 1), randint(1, N - 1)]
+        for coef in coefs:
+            self.assertEqual(coef * G, Point.__rmul__(G, coef))
+
+    def test_multi_multiply(self):
+        points = [randint(1, N - 1) * G for _ in range(3)]
+        coefs = [randint(1, N - 1) for _ in range(3)]
+        want = coefs[0] * G
+        for coef, point in zip(coefs, points):
+            want += coef * point
+        pairs = [(coefs[0], G)] + list(zip(coefs, points))
+        self.assertEqual(_from_jacobian(_multi_multiply(pairs)), want)
+        self.assertEqual(S256Point.combine(points), points[0] + points[1] + points[2])
+        self.assertIsNone(S256Point.combine([G, -1 * G]).x)
+
+    def test_glv(self):
+        point = randint(1, N - 1) * G
+        for _ in range(20):
+            coef = randint(1, N - 1)
+            k1, k2 = _glv_split(coef)
+            self.assertEqual((k1 + k2 * LAMBDA) % N, coef)
+            self.assertTrue(abs(k1).bit_length() <= 129)
+            self.assertTrue(abs(k2).bit_length() <= 129)
+            self.assertEqual(
+                _from_jacobian(_multi_multiply([(coef, point)], glv=True)),
+                _from_jacobian(_multi_multiply([(coef, point)], glv=False)),
+            )
+        coef = randint(1, N - 1)
+        self.assertEqual(coef * point, Point.__rmul__(point, coef))
+        self.assertEqual(LAMBDA * point, S256Point(BETA * point.x.num % P, point.y.num))
+        self.assertEqual(-1 * point, Point.__rmul__(point, N - 1))
+
+    def test_batch_inverse(self):
+        nums = [randint(1, P - 1) for _ in range(10)]
+        for num, inverse in zip(nums, batch_inverse(nums)):
+            self.assertEqual(num * inverse % P, 1)
+        self.assertEqual(batch_inverse([3, 5], 7), [5, 3])
+        self.assertEqual(batch_inverse([]), [])
+        with self.assertRaises(ZeroDivisionError):
+            batch_inverse([1, 0])
+
+    def test_add_many(self):
+        point = randint(1, N - 1) * G
+        scalars = [randint(1, N - 1) for _ in range(5)] + [N - 1]
+        want = [point + scalar for scalar in scalars]
+        self.assertEqual(point.add_many(scalars), want)
+        self.assertIsNone(G.add_many([N - 1])[0].x)
+
+    def test_add_scalar(self):
+        point = randint(1, N - 1) * G
+        coef = randint(1, N - 1)
+        self.assertEqual(point + coef, Point.__add__(point, coef * G))
+        self.assertEqual(-1 * G + 1, S256Point(None, None))
+
+    def test_new(self):
+        point = randint(1, N - 1) * G
+        built = S256Point._new(point.x.num, point.y.num)
+        self.assertEqual(built, S256Point(point.x.num, point.y.num))
+        self.assertEqual(built.parity, point.parity)
+        self.assertEqual(S256Point._new(None, None), S256Point(None, None))
+        self.assertFalse(hasattr(built, "__dict__"))
+        self.assertFalse(hasattr(built.x, "__dict__"))
+        with self.assertRaises(TypeError):
+            built.x + FieldElement(2, 31)
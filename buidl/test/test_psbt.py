@@ -1,3 +1,5 @@
+import pickle
+
 from unittest import TestCase
 
 from io import BytesIO
@@ -5,7 +7,7 @@ from io import BytesIO
 from buidl.ecc import PrivateKey
 from buidl.descriptor import P2WSHSortedMulti
 from buidl.hd import HDPrivateKey, HDPublicKey
-from buidl.helper import encode_varstr, SIGHASH_ALL, read_varstr
+from buidl.helper import encode_varstr, int_to_little_endian, SIGHASH_ALL, read_varstr
 from buidl.psbt import (
     PSBT,
     MixedNetwork,
@@ -26,6 +28,9 @@ class NamedHDPublicKeyTest(TestCase):
         named_hd = NamedHDPublicKey.parse(read_varstr(stream), stream)
         # simple test to show repr works (otherwise this would throw an error)
         str(named_hd)
+        copied = pickle.loads(pickle.dumps(named_hd))
+        self.assertEqual(copied.point.root_path, named_hd.point.root_path)
+        self.assertEqual(copied.point.sec(), named_hd.point.sec())
 
         redeem_script_lookup = named_hd.redeem_script_lookup(
             max_external=1, max_internal=1
@@ -46,6 +51,21 @@ class NamedHDPublicKeyTest(TestCase):
         }
         self.assertEqual(redeem_script_lookup, want)
 
+    def test_children(self):
+        hex_named_hd = "4f01043587cf034d513c1580000000fb406c9fec09b6957a3449d2102318717b0c0d230b657d0ebc6698abd52145eb02eaf3397fea02c5dac747888a9e535eaf3c7e7cb9d5f2da77ddbdd943592a14af10fbfef36f2c0000800100008000000080"
+        stream = BytesIO(bytes.fromhex(hex_named_hd))
+        named_hd = NamedHDPublicKey.parse(read_varstr(stream), stream)
+        children = named_hd.children(index for index in range(3))
+        self.assertEqual(len(children), 3)
+        for index, child in enumerate(children):
+            self.assertIsInstance(child, NamedHDPublicKey)
+            self.assertEqual(child.root_path, f"{named_hd.root_path}/{index}")
+            self.assertEqual(
+                child.raw_path, named_hd.raw_path + int_to_little_endian(index, 4)
+            )
+            self.assertEqual(child.point.root_path, child.root_path)
+            self.assertEqual(child.sec(), named_hd.child(index).sec())
+
 
 class PSBTTest(OfflineTestCase):
     def test_create(self):
@@ -440,6 +460,21 @@ class PSBTTest(OfflineTestCase):
             # parse does all the validation
             psbt = PSBT.parse_base64(base64_psbt)
             self.assertEqual(psbt.serialize_base64(), base64_psbt)
+            copied = pickle.loads(pickle.dumps(psbt))
+            self.assertEqual(copied.serialize_base64(), base64_psbt)
+
+    def test_write(self):
+        hex_psbt = "70736274ff01009d0100000002710ea76ab45c5cb6438e607e59cc037626981805ae9e0dfd9089012abb0be5350100000000ffffffff190994d6a8b3c8c82ccbcfb2fba4106aa06639b872a8d447465c0d42588d6d670000000000ffffffff0200e1f505000000001976a914b6bc2c0ee5655a843d79afedd0ccc3f7dd64340988ac605af405000000001600141188ef8e4ce0449eaac8fb141cbf5a1176e6a088000000004f010488b21e039e530cac800000003dbc8a5c9769f031b17e77fea1518603221a18fd18f2b9a54c6c8c1ac75cbc3502f230584b155d1c7f1cd45120a653c48d650b431b67c5b2c13f27d7142037c1691027569c503100008000000080000000800001011f00e1f5050000000016001433b982f91b28f160c920b4ab95e58ce50dda3a4a220203309680f33c7de38ea6a47cd4ecd66f1f5a49747c6ffb8808ed09039243e3ad5c47304402202d704ced830c56a909344bd742b6852dccd103e963bae92d38e75254d2bb424502202d86c437195df46c0ceda084f2a291c3da2d64070f76bf9b90b195e7ef28f77201220603309680f33c7de38ea6a47cd4ecd66f1f5a49747c6ffb8808ed09039243e3ad5c1827569c5031000080000000800000008000000000010000000001011f00e1f50500000000160014388fb944307eb77ef45197d0b0b245e079f011de220202c777161f73d0b7c72b9ee7bde650293d13f095bc7656ad1f525da5fd2e10b11047304402204cb1fb5f869c942e0e26100576125439179ae88dca8a9dc3ba08f7953988faa60220521f49ca791c27d70e273c9b14616985909361e25be274ea200d7e08827e514d01220602c777161f73d0b7c72b9ee7bde650293d13f095bc7656ad1f525da5fd2e10b1101827569c5031000080000000800000008000000000000000000000220202d20ca502ee289686d21815bd43a80637b0698e1fbcdbe4caed445f6c1a0a90ef1827569c50310000800000008000000080000000000400000000"
+        raw = bytes.fromhex(hex_psbt)
+        psbt = PSBT.parse(BytesIO(raw))
+        self.assertEqual(psbt.serialize(), raw)
+        buf = bytearray(b"prefix")
+        psbt.serialize_into(buf)
+        self.assertEqual(buf, b"prefix" + raw)
+        for chunk_size in (1, 7, 65536):
+            s = BytesIO()
+            psbt.write(s, chunk_size=chunk_size)
+            self.assertEqual(s.getvalue(), raw)
 
     def test_parse_2(self):
         hex_psbt = "70736274ff01009d0100000002710ea76ab45c5cb6438e607e59cc037626981805ae9e0dfd9089012abb0be5350100000000ffffffff190994d6a8b3c8c82ccbcfb2fba4106aa06639b872a8d447465c0d42588d6d670000000000ffffffff0200e1f505000000001976a914b6bc2c0ee5655a843d79afedd0ccc3f7dd64340988ac605af405000000001600141188ef8e4ce0449eaac8fb141cbf5a1176e6a088000000004f010488b21e039e530cac800000003dbc8a5c9769f031b17e77fea1518603221a18fd18f2b9a54c6c8c1ac75cbc3502f230584b155d1c7f1cd45120a653c48d650b431b67c5b2c13f27d7142037c1691027569c503100008000000080000000800001011f00e1f5050000000016001433b982f91b28f160c920b4ab95e58ce50dda3a4a220203309680f33c7de38ea6a47cd4ecd66f1f5a49747c6ffb8808ed09039243e3ad5c47304402202d704ced830c56a909344bd742b6852dccd103e963bae92d38e75254d2bb424502202d86c437195df46c0ceda084f2a291c3da2d64070f76bf9b90b195e7ef28f77201220603309680f33c7de38ea6a47cd4ecd66f1f5a49747c6ffb8808ed09039243e3ad5c1827569c5031000080000000800000008000000000010000000001011f00e1f50500000000160014388fb944307eb77ef45197d0b0b245e079f011de220202c777161f73d0b7c72b9ee7bde650293d13f095bc7656ad1f525da5fd2e10b11047304402204cb1fb5f869c942e0e26100576125439179ae88dca8a9dc3ba08f7953988faa60220521f49ca791c27d70e273c9b14616985909361e25be274ea200d7e08827e514d01220602c777161f73d0b7c72b9ee7bde650293d13f095bc7656ad1f525da5fd2e10b1101827569c5031000080000000800000008000000000000000000000220202d20ca502ee289686d21815bd43a80637b0698e1fbcdbe4caed445f6c1a0a90ef1827569c50310000800000008000000080000000000400000000"
@@ -0,0 +1,109 @@
+from buidl.rpc import BitcoinRPC, RPCError
+from buidl.test import LocalHandler, LocalServerTestCase
+from buidl.tx import Tx, TxFetcher
+
+from base64 import b64encode
+
+import json
+
+
+AUTHORIZATION = "Basic " + b64encode(b"user:secret").decode()
+
+
+class BitcoindHandler(LocalHandler):
+    def do_POST(self):
+        test = self.server.test
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Authorization"] != AUTHORIZATION:
+            self.reply(401, b"")
+            return
+        requests = json.loads(body)
+        test.posts.append(requests)
+        responses = []
+        for request in requests:
+            result, error = test.answer(request)
+            responses.append({"result": result, "error": error, "id": request["id"]})
+        # answer out of order, which JSON-RPC allows
+        self.reply(200, json.dumps(responses[::-1]).encode())
+
+
+class BitcoinRPCTest(LocalServerTestCase):
+    """BitcoinRPC against a stand-in for bitcoind on this machine"""
+
+    handler = BitcoindHandler
+
+    def setUp(self):
+        super().setUp()
+        self.posts = []
+        self.rpc = BitcoinRPC(self.url, username="user", password="secret")
+
+    def tearDown(self):
+        self.rpc.close()
+        super().tearDown()
+        TxFetcher.rpc.pop("mainnet", None)
+
+    def answer(self, request):
+        method, params = request["method"], request["params"]
+        if method == "getrawtransaction" and params[0] in self.raw_txs:
+            return self.raw_txs[params[0]], None
+        if method == "sendrawtransaction":
+            return Tx.parse_hex(params[0]).id(), None
+        if method == "gettxout" and params[0] in self.raw_txs:
+            tx_out = Tx.parse_hex(self.raw_txs[params[0]]).tx_outs[params[1]]
+            script_pubkey = tx_out.script_pubkey.raw_serialize().hex()
+            return {
+                "value": tx_out.amount / 100000000,
+                "scriptPubKey": {"hex": script_pubkey},
+            }, None
+        if method == "gettxout":
+            return None, None
+        return None, {"code": -5, "message": "No such transaction"}
+
+    def test_getrawtransactions(self):
+        tx_ids = sorted(self.raw_txs)[:10]
+        self.assertEqual(
+            self.rpc.getrawtransactions(tx_ids),
+            [self.raw_txs[tx_id] for tx_id in tx_ids],
+        )
+        self.assertEqual(len(self.posts), 1)
+        self.rpc.getrawtransactions(tx_ids, batch_size=4)
+        self.assertEqual([len(post) for post in self.posts[1:]], [4, 4, 2])
+        # every request went over the same connection
+        self.assertEqual(self.connections, 1)
+        with self.assertRaises(RPCError) as fail:
+            self.rpc.getrawtransactions(tx_ids[:1] + ["00" * 32])
+        self.assertEqual(fail.exception.code, -5)
+
+    def test_authorization(self):
+        rpc = BitcoinRPC(self.url.replace("//", "//user:wrong@"))
+        with self.assertRaises(RPCError) as fail:
+            rpc.call("getblockcount")
+        self.assertEqual(fail.exception.code, 401)
+        rpc.close()
+        rpc = BitcoinRPC(self.url.replace("//", "//user:secret@"))
+        self.assertEqual(rpc.getrawtransactions([]), [])
+        tx_id = sorted(self.raw_txs)[0]
+        self.assertEqual(rpc.getrawtransactions([tx_id]), [self.raw_txs[tx_id]])
+        rpc.close()
+
+    def test_gettxout(self):
+        tx_id = sorted(self.raw_txs)[0]
+        tx_out = Tx.parse_hex(self.raw_txs[tx_id]).tx_outs[0]
+        unspent = self.rpc.gettxout(tx_id, 0)
+        self.assertEqual(unspent.amount, tx_out.amount)
+        self.assertEqual(unspent.script_pubkey, tx_out.script_pubkey)
+        self.assertIsNone(self.rpc.gettxout("00" * 32, 0))
+
+    def test_tx_fetcher(self):
+        TxFetcher.rpc["mainnet"] = self.rpc
+        tx_ids = sorted(self.raw_txs)[:10]
+        txs = TxFetcher.fetch_many(tx_ids)
+        self.assertEqual([tx.id() for tx in txs], tx_ids)
+        self.assertEqual(len(self.posts), 1)
+        tx_id = sorted(self.raw_txs)[10]
+        self.assertEqual(TxFetcher.fetch(tx_id).id(), tx_id)
+        self.assertEqual(len(self.posts), 2)
+        self.assertEqual(
+            TxFetcher.sendrawtransaction(self.raw_txs[tx_id]),
+            tx_id,
+        )
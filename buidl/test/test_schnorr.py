@@ -1,6 +1,7 @@
 from unittest import TestCase
 
-from buidl.ecc import S256Point, PrivateKey, SchnorrSignature
+from buidl.ecc import S256Point, PrivateKey, SchnorrSignature, verify_schnorr_batch
+from buidl.helper import int_to_big_endian
 
 
 class SchnorrTest(TestCase):
@@ -80,6 +81,19 @@ class SchnorrTest(TestCase):
             sig = SchnorrSignature.parse(bytes.fromhex(signature))
             self.assertTrue(public_key.verify_schnorr(msg, sig))
 
+    def test_verify_batch(self):
+        items = []
+        for i in range(1, 6):
+            private_key = PrivateKey(secret=i * 0x1234567)
+            msg = int_to_big_endian(i, 32)
+            sig = private_key.sign_schnorr(msg, aux=b"\x00" * 32)
+            items.append((private_key.point, msg, sig))
+        self.assertEqual(verify_schnorr_batch(items), [True] * 5)
+        point, msg, sig = items[2]
+        items[2] = (point, int_to_big_endian(42, 32), sig)
+        self.assertEqual(verify_schnorr_batch(items), [True, True, False, True, True])
+        self.assertEqual(verify_schnorr_batch([]), [])
+
     def test_errors(self):
         tests = [
             (
@@ -10,8 +10,10 @@ from buidl.script import (
     P2SHScriptPubKey,
     P2WPKHScriptPubKey,
     P2WSHScriptPubKey,
+    P2TRScriptPubKey,
     RedeemScript,
     Script,
+    ScriptPubKey,
     WitnessScript,
 )
 
@@ -40,6 +42,30 @@ class ScriptTest(TestCase):
         self.assertEqual(script.serialize().hex(), want)
 
 
+class ScriptPubKeyTest(TestCase):
+    def test_parse_standard(self):
+        tests = (
+            (P2PKHScriptPubKey, "76a914" + "11" * 20 + "88ac"),
+            (P2SHScriptPubKey, "a914" + "22" * 20 + "87"),
+            (P2WPKHScriptPubKey, "0014" + "33" * 20),
+            (P2WSHScriptPubKey, "0020" + "44" * 32),
+            (P2TRScriptPubKey, "5120" + "55" * 32),
+        )
+        for want, raw_hex in tests:
+            raw = bytes.fromhex(raw_hex)
+            script_pubkey = ScriptPubKey.parse_standard(raw)
+            self.assertIs(type(script_pubkey), want)
+            self.assertEqual(script_pubkey.commands, Script.parse(raw=raw).commands)
+            self.assertEqual(script_pubkey.raw_serialize(), raw)
+            stream = BytesIO(Script.parse(raw=raw).serialize())
+            self.assertIs(type(ScriptPubKey.parse(stream)), want)
+        # a non-minimal push of the same hash is left to the full parser
+        raw = bytes.fromhex("a94c14" + "22" * 20 + "87")
+        self.assertIsNone(ScriptPubKey.parse_standard(raw))
+        self.assertIs(type(ScriptPubKey.parse(raw=raw)), P2SHScriptPubKey)
+        self.assertIsNone(ScriptPubKey.parse_standard(bytes.fromhex("6a0400000000")))
+
+
 class P2PKHScriptPubKeyTest(TestCase):
     def test_address(self):
         address_1 = "1BenRpVUFK65JFWcQSuHnJKzc4M8ZP8Eqa"
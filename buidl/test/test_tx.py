@@ -1,12 +1,63 @@
 from buidl.ecc import PrivateKey, Signature
-from buidl.script import RedeemScript, WitnessScript
-from buidl.test import OfflineTestCase
-from buidl.tx import Tx, TxIn, TxOut, TxFetcher
-
+from buidl.helper import SIGHASH_ALL, encode_varint, hash256, int_to_little_endian
+from buidl.script import RedeemScript, Script, WitnessScript
+from buidl.test import LocalHandler, LocalServerTestCase, OfflineTestCase
+from buidl.timelock import Locktime, Sequence
+from buidl.tx import URL, LazyTx, Tx, TxIn, TxOut, TxFetcher, verify_txs
+from buidl.txcache import TxCache
+from buidl.witness import Witness
+
+from io import BytesIO
 from os import getenv
+from random import randint, seed
 from unittest import skipUnless
+from unittest.mock import patch
 from urllib.error import HTTPError
 
+import pickle
+
+
+def random_bytes(n):
+    """n bytes from random, so seed makes them reproducible"""
+    return bytes(randint(0, 255) for _ in range(n))
+
+
+def reference_sig_hash_legacy(tx_obj, input_index, script_code, hash_type):
+    """the legacy sighash, serialized exactly the way Bitcoin Core does"""
+    base_type, anyone_can_pay = hash_type & 0x1F, hash_type & 0x80
+    s = int_to_little_endian(tx_obj.version, 4)
+    if anyone_can_pay:
+        indices = [input_index]
+    else:
+        indices = range(len(tx_obj.tx_ins))
+    s += encode_varint(len(indices))
+    for i in indices:
+        tx_in = tx_obj.tx_ins[i]
+        s += tx_in.prev_tx[::-1] + int_to_little_endian(tx_in.prev_index, 4)
+        if i == input_index:
+            s += script_code.serialize()
+        else:
+            s += b"\x00"
+        if i != input_index and base_type in (2, 3):
+            s += b"\x00\x00\x00\x00"
+        else:
+            s += tx_in.sequence.serialize()
+    if base_type == 2:
+        num_outputs = 0
+    elif base_type == 3:
+        num_outputs = input_index + 1
+    else:
+        num_outputs = len(tx_obj.tx_outs)
+    s += encode_varint(num_outputs)
+    for i in range(num_outputs):
+        if base_type == 3 and i != input_index:
+            s += b"\xff" * 8 + b"\x00"
+        else:
+            s += tx_obj.tx_outs[i].serialize()
+    s += tx_obj.locktime.serialize()
+    s += int_to_little_endian(hash_type, 4)
+    return int.from_bytes(hash256(s), "big")
+
 
 class TxTest(OfflineTestCase):
     def test_parse_tricky(self):
@@ -61,6 +112,215 @@ class TxTest(OfflineTestCase):
         self.assertEqual(tx.tx_outs[0].amount, 10000000)
         self.assertEqual(tx.locktime, 0)
 
+    def test_parse_bytes(self):
+        raws = [tx_obj.serialize() for tx_obj in TxFetcher.cache.values()]
+        for raw in raws:
+            want = Tx.parse(BytesIO(raw))
+            for b in (raw, bytearray(raw), memoryview(raw)):
+                tx_obj = Tx.parse_bytes(b)
+                self.assertEqual(tx_obj.serialize(), raw)
+                self.assertEqual(tx_obj.segwit, want.segwit)
+                self.assertEqual(tx_obj.locktime, want.locktime)
+                for tx_in_1, tx_in_2 in zip(tx_obj.tx_ins, want.tx_ins):
+                    self.assertEqual(tx_in_1.script_sig, tx_in_2.script_sig)
+                    self.assertEqual(tx_in_1.witness.items, tx_in_2.witness.items)
+                    self.assertEqual(tx_in_1.sequence, tx_in_2.sequence)
+                for tx_out_1, tx_out_2 in zip(tx_obj.tx_outs, want.tx_outs):
+                    self.assertEqual(
+                        type(tx_out_1.script_pubkey), type(tx_out_2.script_pubkey)
+                    )
+        # walk a buffer of back to back transactions
+        b, offset = memoryview(b"".join(raws)), 0
+        for raw in raws:
+            tx_obj, offset = Tx.parse_at(b, offset)
+            self.assertEqual(tx_obj.serialize(), raw)
+        self.assertEqual(offset, len(b))
+        with self.assertRaises(IOError):
+            Tx.parse_bytes(raws[0][:-1])
+
+    def test_parse_lazy(self):
+        for raw in [tx_obj.serialize() for tx_obj in TxFetcher.cache.values()]:
+            want = Tx.parse_bytes(raw)
+            tx_obj = Tx.parse_lazy(memoryview(raw))
+            # hashing works straight from the raw bytes
+            self.assertEqual(tx_obj.id(), want.id())
+            self.assertEqual(tx_obj.wtxid(), want.wtxid())
+            self.assertEqual(tx_obj.serialize(), raw)
+            self.assertIsNone(tx_obj._tx_ins)
+            self.assertIsNone(tx_obj._tx_outs)
+            self.assertEqual(tx_obj.segwit, want.segwit)
+            self.assertEqual(tx_obj.version, want.version)
+            self.assertEqual(tx_obj.locktime, want.locktime)
+            self.assertEqual(tx_obj.vbytes(), want.vbytes())
+            for tx_out_1, tx_out_2 in zip(tx_obj.tx_outs, want.tx_outs):
+                self.assertEqual(tx_out_1.serialize(), tx_out_2.serialize())
+            self.assertIsNone(tx_obj._tx_ins)
+            for tx_in_1, tx_in_2 in zip(tx_obj.tx_ins, want.tx_ins):
+                self.assertEqual(tx_in_1.prev_tx, tx_in_2.prev_tx)
+                self.assertEqual(tx_in_1.prev_index, tx_in_2.prev_index)
+                self.assertEqual(tx_in_1.sequence, tx_in_2.sequence)
+                self.assertIsNone(tx_in_1._script_sig)
+                self.assertEqual(tx_in_1.serialize(), tx_in_2.serialize())
+                self.assertEqual(tx_in_1.script_sig, tx_in_2.script_sig)
+                self.assertEqual(tx_in_1.witness.items, tx_in_2.witness.items)
+            self.assertEqual(tx_obj.serialize(), raw)
+            # changes to the parsed objects show up in the serialization
+            for tx_in_1, tx_in_2 in zip(tx_obj.tx_ins, want.tx_ins):
+                tx_in_1.script_sig = tx_in_2.script_sig = Script([b"buidl"])
+                tx_in_1.witness = tx_in_2.witness = Witness([b"buidl"])
+            tx_obj.tx_outs[0].amount = want.tx_outs[0].amount = 1
+            self.assertEqual(tx_obj.serialize(), want.serialize())
+            self.assertEqual(tx_obj.id(), want.id())
+        # a legacy transaction has the same wtxid and txid
+        raw = bytes.fromhex(
+            "0100000001813f79011acb80925dfe69b3def355fe914bd1d96a3f5f71bf8303c6a989c7d1000000006b483045022100ed81ff192e75a3fd2304004dcadb746fa5e24c5031ccfcf21320b0277457c98f02207a986d955c6e0cb35d446a89d3f56100f4d7f67801c31967743a9c8e10615bed01210349fc4e631e3624a545de3f89f5d8684c7b8138bd94bdd531d2e213bf016b278afeffffff02a135ef01000000001976a914bc3b654dca7e56b04dca18f2566cdaf02e8d9ada88ac99c39800000000001976a9141c4bc762dd5423e332166702cb75f40df79fea1288ac19430600"
+        )
+        tx_obj = Tx.parse_lazy(raw)
+        self.assertFalse(tx_obj.segwit)
+        self.assertEqual(tx_obj.wtxid(), tx_obj.id())
+        with self.assertRaises(IOError):
+            Tx.parse_lazy(raw[:-1])
+        # a transaction in the middle of a block keeps only its own bytes
+        block = bytearray(b"header" + raw + raw)
+        tx_obj, end = LazyTx.parse_at(memoryview(block), 6 + len(raw))
+        self.assertEqual(end, len(block))
+        self.assertEqual(tx_obj._raw, raw)
+        block[:] = bytes(len(block))
+        copied = pickle.loads(pickle.dumps(tx_obj))
+        for tx in (tx_obj, copied):
+            self.assertEqual(tx.serialize(), raw)
+            self.assertEqual(
+                tx.tx_ins[0].script_sig, Tx.parse_hex(raw.hex()).tx_ins[0].script_sig
+            )
+
+    def test_invalidate(self):
+        raw_tx = "0100000000010115e180dc28a2327e687facc33f10f2a20da717e5548406f7ae8b4c811072f8560100000000ffffffff0100b4f505000000001976a9141d7cd6c75c2e86f4cbf98eaed221b30bd9a0b92888ac02483045022100df7b7e5cda14ddf91290e02ea10786e03eb11ee36ec02dd862fe9a326bbcb7fd02203f5b4496b667e6e281cc654a2da9e4f08660c620a1051337fa8965f727eb19190121038262a6c6cec93c2d3ecd6c6072efea86d02ff8e3328bbd0242b20af3425990ac00000000"
+        tx_obj = Tx.parse_hex(raw_tx, network="testnet")
+        # repeated hashing is served from the cache
+        self.assertIs(tx_obj.hash(), tx_obj.hash())
+        self.assertIs(tx_obj.serialize(), tx_obj.serialize())
+        self.assertEqual(tx_obj.clone().hash(), tx_obj.hash())
+
+        def fresh():
+            return Tx.parse(BytesIO(tx_obj.serialize()), network="testnet")
+
+        tx_id, wtxid = tx_obj.id(), tx_obj.wtxid()
+        z = tx_obj.sig_hash_bip143(0)
+        context = tx_obj.sighash_context()
+        # the witness only changes the wtxid
+        tx_obj.tx_ins[0].witness = Witness([b"buidl"])
+        self.assertEqual(tx_obj.id(), tx_id)
+        self.assertNotEqual(tx_obj.wtxid(), wtxid)
+        self.assertEqual(tx_obj.wtxid(), fresh().wtxid())
+        # the ScriptSig changes the txid but not what gets signed
+        tx_obj.tx_ins[0].script_sig = Script([b"buidl"])
+        self.assertNotEqual(tx_obj.id(), tx_id)
+        self.assertEqual(tx_obj.id(), fresh().id())
+        self.assertIs(tx_obj.sighash_context(), context)
+        self.assertEqual(tx_obj.sig_hash_bip143(0), z)
+        # sequences, outpoints and outputs change what gets signed
+        for change in (
+            lambda: setattr(tx_obj.tx_ins[0], "sequence", Sequence(1)),
+            lambda: setattr(tx_obj.tx_ins[0], "prev_index", 2),
+            lambda: setattr(tx_obj.tx_outs[0], "amount", 1000),
+            lambda: setattr(tx_obj, "tx_outs", tx_obj.tx_outs * 2),
+        ):
+            change()
+            self.assertNotEqual(tx_obj.sig_hash_bip143(0), z)
+            z = tx_obj.sig_hash_bip143(0)
+            self.assertEqual(z, fresh().sig_hash_bip143(0))
+            self.assertEqual(tx_obj.id(), fresh().id())
+        tx_obj.locktime = Locktime(100)
+        self.assertEqual(tx_obj.serialize(), fresh().serialize())
+        self.assertEqual(tx_obj.id(), fresh().id())
+        # so do changes made in place
+        for change in (
+            lambda: tx_obj.tx_outs.pop(),
+            lambda: tx_obj.tx_ins.append(TxIn(bytes(32), 1)),
+            lambda: tx_obj.tx_ins[1].witness.items.append(b"buidl"),
+            lambda: tx_obj.tx_ins[0].witness.items.insert(0, b""),
+            lambda: setattr(tx_obj.tx_ins[1], "witness", tx_obj.tx_ins[0].witness),
+            lambda: setattr(tx_obj.tx_ins[0].witness, "items", [b"\x01"]),
+            lambda: tx_obj.tx_ins[0].set_prevout(
+                1000, tx_obj.tx_ins[0].script_pubkey(network="testnet")
+            ),
+            lambda: tx_obj.tx_ins.pop(),
+        ):
+            z, wtxid = tx_obj.sig_hash_bip143(0), tx_obj.wtxid()
+            change()
+            self.assertEqual(tx_obj.wtxid(), fresh().wtxid())
+            self.assertEqual(tx_obj.id(), fresh().id())
+            self.assertNotEqual(
+                (tx_obj.sig_hash_bip143(0), tx_obj.wtxid()),
+                (z, wtxid),
+            )
+        # an input shared by two transactions clears the caches of both
+        other = Tx(1, tx_obj.tx_ins, [TxOut(1000, tx_obj.tx_outs[0].script_pubkey)])
+        copied = pickle.loads(pickle.dumps(tx_obj))
+        ids = [tx.id() for tx in (tx_obj, other, copied)]
+        tx_obj.tx_ins[0].prev_index = 3
+        copied.tx_ins[0].prev_index = 3
+        for tx, tx_id in zip((tx_obj, other, copied), ids):
+            self.assertNotEqual(tx.id(), tx_id)
+            self.assertEqual(
+                tx.id(), Tx.parse(BytesIO(tx.serialize()), network="testnet").id()
+            )
+        self.assertEqual(copied.id(), tx_obj.id())
+        # the unpickled copy still watches its lists
+        copied.tx_outs.append(TxOut(1000, copied.tx_outs[0].script_pubkey))
+        copied.tx_ins[0].witness.items.append(b"buidl")
+        self.assertEqual(
+            copied.wtxid(),
+            Tx.parse(BytesIO(copied.serialize()), network="testnet").wtxid(),
+        )
+
+    def test_evaluate_annex(self):
+        private_key = PrivateKey(secret=8675309)
+        script_pubkey = private_key.point.p2tr_script()
+        tx_in = TxIn(bytes.fromhex("11" * 32), 0)
+        tx_in._value = 100000
+        tx_in._script_pubkey = script_pubkey
+        tx_obj = Tx(2, [tx_in], [TxOut(90000, script_pubkey)], segwit=True)
+        annex = b"\x50buidl"
+        # the annex is signed, so it goes in before the signature
+        tx_in.witness = Witness([annex])
+        sig = tx_obj.get_sig_taproot(0, private_key.tweaked_key())
+        tx_in.witness = Witness([sig, annex])
+        wtxid = tx_obj.wtxid()
+        context = tx_obj.sighash_context()
+        self.assertTrue(tx_obj.verify_input(0))
+        # evaluating skips the annex without taking it off the input
+        self.assertEqual(tx_in.witness.items, [sig, annex])
+        self.assertEqual(tx_obj.wtxid(), wtxid)
+        self.assertEqual(tx_obj.wtxid(), Tx.parse(BytesIO(tx_obj.serialize())).wtxid())
+        self.assertIs(tx_obj.sighash_context(), context)
+        self.assertTrue(tx_obj.verify_input(0))
+
+    def test_sighash_context(self):
+        raw_tx = "0100000000010115e180dc28a2327e687facc33f10f2a20da717e5548406f7ae8b4c811072f8560100000000ffffffff0100b4f505000000001976a9141d7cd6c75c2e86f4cbf98eaed221b30bd9a0b92888ac02483045022100df7b7e5cda14ddf91290e02ea10786e03eb11ee36ec02dd862fe9a326bbcb7fd02203f5b4496b667e6e281cc654a2da9e4f08660c620a1051337fa8965f727eb19190121038262a6c6cec93c2d3ecd6c6072efea86d02ff8e3328bbd0242b20af3425990ac00000000"
+        tx_obj = Tx.parse_hex(raw_tx, network="testnet")
+        context = tx_obj.sighash_context()
+        self.assertIs(tx_obj.sighash_context(), context)
+        self.assertEqual(context.classify(0)[0], "bip143")
+        z = tx_obj.sig_hash(0, SIGHASH_ALL)
+        self.assertEqual(z, tx_obj.sig_hash_bip143(0))
+        self.assertEqual(context.digests, {("bip143", 0, SIGHASH_ALL): z})
+        # a digest of another kind for the same input is kept apart
+        z_bip341 = context.sig_hash_bip341(0, 0, SIGHASH_ALL)
+        self.assertNotEqual(z_bip341, z)
+        self.assertEqual(tx_obj.sig_hash(0, SIGHASH_ALL), z)
+        self.assertEqual(context.sig_hash_bip341(0, 0, SIGHASH_ALL), z_bip341)
+        self.assertEqual(context.hash_prevouts(), tx_obj.hash_prevouts())
+        # the witness says which scripts are used, so the memo is cleared
+        tx_obj.tx_ins[0].witness = Witness(tx_obj.tx_ins[0].witness.items)
+        self.assertIs(tx_obj.sighash_context(), context)
+        self.assertEqual(context.digests, {})
+        self.assertEqual(tx_obj.sig_hash(0, SIGHASH_ALL), z)
+        # the outputs are signed, so the whole context goes
+        tx_obj.tx_outs[0].amount = 1000
+        self.assertIsNot(tx_obj.sighash_context(), context)
+        self.assertNotEqual(tx_obj.sig_hash(0, SIGHASH_ALL), z)
+
     def test_serialize(self):
         raw_tx = "0100000001813f79011acb80925dfe69b3def355fe914bd1d96a3f5f71bf8303c6a989c7d1000000006b483045022100ed81ff192e75a3fd2304004dcadb746fa5e24c5031ccfcf21320b0277457c98f02207a986d955c6e0cb35d446a89d3f56100f4d7f67801c31967743a9c8e10615bed01210349fc4e631e3624a545de3f89f5d8684c7b8138bd94bdd531d2e213bf016b278afeffffff02a135ef01000000001976a914bc3b654dca7e56b04dca18f2566cdaf02e8d9ada88ac99c39800000000001976a9141c4bc762dd5423e332166702cb75f40df79fea1288ac19430600"
         tx = Tx.parse_hex(raw_tx)
@@ -74,6 +334,43 @@ class TxTest(OfflineTestCase):
         tx = Tx.parse_hex(raw_tx)
         self.assertEqual(tx.serialize().hex(), raw_tx)
 
+    def test_serialize_into(self):
+        raw_txs = (
+            "0100000001813f79011acb80925dfe69b3def355fe914bd1d96a3f5f71bf8303c6a989c7d1000000006b483045022100ed81ff192e75a3fd2304004dcadb746fa5e24c5031ccfcf21320b0277457c98f02207a986d955c6e0cb35d446a89d3f56100f4d7f67801c31967743a9c8e10615bed01210349fc4e631e3624a545de3f89f5d8684c7b8138bd94bdd531d2e213bf016b278afeffffff02a135ef01000000001976a914bc3b654dca7e56b04dca18f2566cdaf02e8d9ada88ac99c39800000000001976a9141c4bc762dd5423e332166702cb75f40df79fea1288ac19430600",
+            "01000000000101c70c4ede5731f1b47a89d133be9244927fa12e15778ec78a7e071273c0c58a870400000000ffffffff02809698000000000017a9144f34d55c56f827169921df008e8dfdc23678fc1787d464da1f00000000220020701a8d401c84fb13e6baf169d59684e17abd9fa216c8cc5b9fc63d622ff8c58d0400473044022050a5a50e78e6f9c65b5d94c78f8e4b339848456ff7c2231702b4a37439e2a3bd02201569cbf1c672bbb1608d6e9feea28705d8d6e54aa51d9fa396469be6ffc83c2d0147304402200b69a83cc3e3e1694037ef639049b0ece00f15718a03e9038aa42ac9d1bd0ea50220780c510821cd5205e5d178e6277005f4dd61a7fcccd4f8fae9e2d2adc355e728016952210375e00eb72e29da82b89367947f29ef34afb75e8654f6ea368e0acdfd92976b7c2103a1b26313f430c4b15bb1fdce663207659d8cac749a0e53d70eff01874496feff2103c96d495bfdd5ba4145e3e046fee45e84a8a48ad05bd8dbb395c011a32cf9f88053ae00000000",
+        )
+        for raw_tx in raw_txs:
+            raw = bytes.fromhex(raw_tx)
+            for tx_obj in (Tx.parse(BytesIO(raw)), Tx.parse_lazy(raw)):
+                # serialize_into appends to whatever is already there
+                buf = bytearray(b"prefix")
+                tx_obj.serialize_into(buf)
+                self.assertEqual(buf, b"prefix" + raw)
+                s = BytesIO()
+                tx_obj.write(s)
+                self.assertEqual(s.getvalue(), raw)
+                buf = bytearray()
+                tx_obj.serialize_into(buf, segwit=False)
+                self.assertEqual(buf, tx_obj.serialize_legacy())
+                for tx_in in tx_obj.tx_ins:
+                    buf = bytearray()
+                    tx_in.serialize_into(buf)
+                    self.assertEqual(buf, tx_in.serialize())
+                buf = bytearray()
+                tx_obj.tx_ins[0].script_sig.serialize_into(buf)
+                self.assertEqual(buf, tx_obj.tx_ins[0].script_sig.serialize())
+                buf = bytearray()
+                tx_obj.tx_ins[0].witness.serialize_into(buf)
+                self.assertEqual(buf, tx_obj.tx_ins[0].witness.serialize())
+            # nothing cached, so the stream gets one piece per input and output
+            tx_obj = Tx.parse(BytesIO(raw))
+            pieces = []
+            s = BytesIO()
+            with patch.object(s, "write", side_effect=pieces.append):
+                tx_obj.write(s, chunk_size=1)
+            self.assertEqual(b"".join(pieces), raw)
+            self.assertGreater(len(pieces), len(tx_obj.tx_ins) + len(tx_obj.tx_outs))
+
     def test_input_value(self):
         tx_hash = "d1c789a9c60383bf715f3f6ad9d14b91fe55f3deb369fe5d9280cb1a01793f81"
         index = 0
@@ -104,6 +401,41 @@ class TxTest(OfflineTestCase):
         )
         self.assertEqual(tx.sig_hash_legacy(0), want)
 
+    def test_sig_hash_legacy_random(self):
+        seed(2009)
+        hash_types = [1, 2, 3, 0x81, 0x82, 0x83]
+        for _ in range(40):
+            tx_ins = [
+                TxIn(
+                    random_bytes(32),
+                    randint(0, 5),
+                    Script([random_bytes(20)]),
+                    randint(0, 0xFFFFFFFF),
+                )
+                for _ in range(randint(1, 6))
+            ]
+            tx_outs = [
+                TxOut(
+                    randint(0, 10**8),
+                    Script([0x76, 0xA9, random_bytes(20), 0x88, 0xAC]),
+                )
+                for _ in range(randint(1, 6))
+            ]
+            tx_obj = Tx(randint(1, 2), tx_ins, tx_outs, locktime=randint(0, 10**6))
+            for input_index in range(len(tx_ins)):
+                script_code = RedeemScript([0x51, random_bytes(randint(1, 75)), 0x87])
+                for hash_type in hash_types + [randint(0, 0xFF)]:
+                    if hash_type & 0x1F == 3 and input_index >= len(tx_outs):
+                        want = 1 << 248
+                    else:
+                        want = reference_sig_hash_legacy(
+                            tx_obj, input_index, script_code, hash_type
+                        )
+                    got = tx_obj.sig_hash_legacy(input_index, script_code, hash_type)
+                    self.assertEqual(got, want)
+        # out of range inputs sign the consensus bug value
+        self.assertEqual(tx_obj.sig_hash_legacy(len(tx_ins), script_code), 1 << 248)
+
     def test_sig_hash_bip143(self):
         raw_tx = "0100000000010115e180dc28a2327e687facc33f10f2a20da717e5548406f7ae8b4c811072f8560100000000ffffffff0100b4f505000000001976a9141d7cd6c75c2e86f4cbf98eaed221b30bd9a0b92888ac02483045022100df7b7e5cda14ddf91290e02ea10786e03eb11ee36ec02dd862fe9a326bbcb7fd02203f5b4496b667e6e281cc654a2da9e4f08660c620a1051337fa8965f727eb19190121038262a6c6cec93c2d3ecd6c6072efea86d02ff8e3328bbd0242b20af3425990ac00000000"
         tx = Tx.parse_hex(raw_tx, network="testnet")
@@ -114,6 +446,79 @@ class TxTest(OfflineTestCase):
         tx = Tx.parse_hex(raw_tx, network="signet")
         self.assertEqual(tx.sig_hash_legacy(0), want)
 
+    def test_verify_txs(self):
+        txs = [
+            TxFetcher.fetch(tx_id, network=network)
+            for tx_id, network in (
+                (
+                    "452c629d67e41baec3ac6f04fe744b4b9617f8f859c63b3002f8684e7a4fee03",
+                    "mainnet",
+                ),
+                (
+                    "46df1a9484d0a81d03ce0ee543ab6e1a23ed06175c104a178268fad381216c2b",
+                    "mainnet",
+                ),
+                (
+                    "d869f854e1f8788bcff294cc83b280942a8c728de71eb709a2c29d10bfe21b7c",
+                    "testnet",
+                ),
+                (
+                    "c586389e5e4b3acb9d6c8be1c19ae8ab2795397633176f5a6442a261bbdefc3a",
+                    "mainnet",
+                ),
+                (
+                    "78457666f82c28aa37b74b506745a7c7684dc7842a52a457b09f09446721e11c",
+                    "testnet",
+                ),
+            )
+        ]
+        prevout_view = {}
+        for tx_obj in txs:
+            for tx_in in tx_obj.tx_ins:
+                prevout_view[(tx_in.prev_tx, tx_in.prev_index)] = TxOut(
+                    tx_in.value(tx_obj.network), tx_in.script_pubkey(tx_obj.network)
+                )
+        self.assertEqual(verify_txs(txs, prevout_view, workers=2), [{}] * len(txs))
+        self.assertTrue(txs[0].verify(parallel=2))
+        # break the signature of the p2wpkh input
+        witness = txs[2].tx_ins[0].witness
+        sig = bytearray(witness.items[0])
+        sig[10] ^= 1
+        txs[2].tx_ins[0].witness = Witness([bytes(sig), witness.items[1]])
+        del prevout_view[(txs[0].tx_ins[0].prev_tx, txs[0].tx_ins[0].prev_index)]
+        serial = verify_txs(txs, prevout_view, workers=1)
+        self.assertEqual(serial[0][0], "missing prevout")
+        self.assertEqual(serial[2], {0: "script evaluated to false"})
+        self.assertEqual(verify_txs(txs, prevout_view, workers=2, chunk_size=1), serial)
+        self.assertEqual(txs[2].input_failures(), serial[2])
+        self.assertEqual(txs[2].input_failures(parallel=2), serial[2])
+        self.assertFalse(txs[2].verify(parallel=2))
+        self.assertFalse(txs[2].verify())
+
+    def test_verify_txs_missing_taproot_prevout(self):
+        private_key = PrivateKey(secret=8675309)
+        script_pubkey = private_key.point.p2tr_script()
+        tx_ins = [TxIn(bytes.fromhex("22" * 32), i) for i in range(2)]
+        prevout_view = {}
+        for tx_in in tx_ins:
+            tx_in._value = 100000
+            tx_in._script_pubkey = script_pubkey
+            prevout_view[(tx_in.prev_tx, tx_in.prev_index)] = TxOut(
+                100000, script_pubkey
+            )
+        tx_obj = Tx(2, tx_ins, [TxOut(190000, script_pubkey)], segwit=True)
+        for i in range(2):
+            self.assertTrue(tx_obj.sign_p2tr_keypath(i, private_key.tweaked_key()))
+        self.assertEqual(verify_txs([tx_obj], prevout_view, workers=1), [{}])
+        del prevout_view[(tx_ins[1].prev_tx, tx_ins[1].prev_index)]
+        with patch.object(TxFetcher, "fetch_many") as fetch_many:
+            results = verify_txs([tx_obj], prevout_view, workers=1)
+        fetch_many.assert_not_called()
+        self.assertEqual(
+            results,
+            [{0: "missing prevout of another input", 1: "missing prevout"}],
+        )
+
     def test_verify_p2pkh(self):
         tx = TxFetcher.fetch(
             "452c629d67e41baec3ac6f04fe744b4b9617f8f859c63b3002f8684e7a4fee03"
@@ -428,6 +833,82 @@ class TxTest(OfflineTestCase):
         self.assertIsNone(tx.coinbase_height())
 
 
+class ExplorerHandler(LocalHandler):
+    def do_GET(self):
+        test = self.server.test
+        tx_id = self.path.split("/")[-2]
+        test.requests.append(tx_id)
+        if tx_id in test.flaky:
+            test.flaky.remove(tx_id)
+            self.reply(500, b"try again")
+        elif tx_id in test.raw_txs:
+            self.reply(200, test.raw_txs[test.liars.get(tx_id, tx_id)].encode())
+        else:
+            self.reply(404, b"not found")
+
+
+class TxFetcherServerTest(LocalServerTestCase):
+    """TxFetcher against a stand-in for the block explorer on this machine"""
+
+    handler = ExplorerHandler
+
+    def setUp(self):
+        super().setUp()
+        self.requests = []
+        self.flaky = set()
+        self.liars = {}
+        self.url_patch = patch.dict(URL, {"mainnet": self.url + "api"})
+        self.url_patch.start()
+
+    def tearDown(self):
+        self.url_patch.stop()
+        super().tearDown()
+
+    def test_fetch_many(self):
+        tx_ids = sorted(self.raw_txs)[:6]
+        self.flaky.add(tx_ids[1])
+        txs = TxFetcher.fetch_many(tx_ids + tx_ids[:2], max_workers=2)
+        self.assertEqual([tx.id() for tx in txs], tx_ids + tx_ids[:2])
+        self.assertIs(txs[0], txs[6])
+        # one request per transaction plus the retry, over kept-alive connections
+        self.assertEqual(sorted(self.requests), sorted(tx_ids + tx_ids[1:2]))
+        self.assertLessEqual(self.connections, 2)
+        # the cache is filled, so asking again is free
+        TxFetcher.fetch_many(tx_ids)
+        self.assertEqual(len(self.requests), 7)
+        self.liars[tx_ids[5]] = tx_ids[0]
+        with self.assertRaises(RuntimeError):
+            TxFetcher.fetch_many(tx_ids, fresh=True)
+        with self.assertRaises(HTTPError) as fail:
+            TxFetcher.fetch_many(["00" * 32])
+        self.assertEqual(fail.exception.code, 404)
+
+    def test_fetch_many_bounded_cache(self):
+        tx_ids = sorted(self.raw_txs)[:5]
+        TxFetcher.cache = TxCache(max_items=2)
+        TxFetcher.fetch(tx_ids[0])
+        # more transactions than the cache holds, one of them a hit
+        txs = TxFetcher.fetch_many(tx_ids, max_workers=2)
+        self.assertEqual([tx.id() for tx in txs], tx_ids)
+        self.assertEqual(len(TxFetcher.cache), 2)
+
+    def test_prefetch_inputs(self):
+        tx_obj = Tx.parse_hex(
+            self.raw_txs[
+                "46df1a9484d0a81d03ce0ee543ab6e1a23ed06175c104a178268fad381216c2b"
+            ]
+        )
+        tx_obj.prefetch_inputs()
+        prev_tx_ids = {tx_in.prev_tx.hex() for tx_in in tx_obj.tx_ins}
+        self.assertEqual(sorted(self.requests), sorted(prev_tx_ids))
+        for tx_in in tx_obj.tx_ins:
+            tx_out = TxFetcher.cache[tx_in.prev_tx.hex()].tx_outs[tx_in.prev_index]
+            self.assertEqual(tx_in._value, tx_out.amount)
+            self.assertEqual(tx_in._script_pubkey, tx_out.script_pubkey)
+        self.assertTrue(tx_obj.verify())
+        self.assertEqual(len(self.requests), len(prev_tx_ids))
+
+
 @skipUnless(
     getenv("INCLUDE_NETWORK_TESTS"),
     reason="Requires (unreliable) network connection",
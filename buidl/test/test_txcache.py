@@ -0,0 +1,106 @@
+from buidl.test import OfflineTestCase
+from buidl.tx import Tx, TxFetcher
+from buidl.txcache import BinaryTxStore, SqliteTxStore, TxCache, migrate_json_cache
+
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import json
+
+
+def cached_txs():
+    with open(OfflineTestCase.cache_file) as f:
+        return {
+            tx_id: bytes.fromhex(raw_hex) for tx_id, raw_hex in json.load(f).items()
+        }
+
+
+class TxCacheTest(TestCase):
+    def setUp(self):
+        self.raw_txs = cached_txs()
+        self.tx_ids = sorted(self.raw_txs)
+        self.tmp = TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_max_items(self):
+        cache = TxCache(max_items=2)
+        for tx_id in self.tx_ids[:5]:
+            cache[tx_id] = Tx.parse_bytes(self.raw_txs[tx_id])
+        self.assertEqual(list(cache), self.tx_ids[3:5])
+        cache[self.tx_ids[3]]
+        cache[self.tx_ids[5]] = Tx.parse_bytes(self.raw_txs[self.tx_ids[5]])
+        self.assertEqual(list(cache), [self.tx_ids[3], self.tx_ids[5]])
+        self.assertNotIn(self.tx_ids[0], cache)
+        with self.assertRaises(KeyError):
+            cache[self.tx_ids[0]]
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["evictions"], 4)
+        self.assertEqual(stats["items"], 2)
+
+    def test_max_bytes(self):
+        max_bytes = 2000
+        cache = TxCache(max_bytes=max_bytes)
+        for tx_id in self.tx_ids:
+            cache[tx_id] = Tx.parse_bytes(self.raw_txs[tx_id])
+            self.assertLessEqual(cache.stats()["bytes"], max_bytes)
+        self.assertEqual(
+            cache.stats()["bytes"], sum(len(self.raw_txs[tx_id]) for tx_id in cache)
+        )
+
+    def test_store(self):
+        for store in (
+            BinaryTxStore(join(self.tmp.name, "txs.bin")),
+            SqliteTxStore(join(self.tmp.name, "txs.db")),
+        ):
+            cache = TxCache(max_items=3, store=store)
+            for tx_id in self.tx_ids[:10]:
+                cache[tx_id] = Tx.parse_bytes(self.raw_txs[tx_id])
+            self.assertEqual(len(cache), 10)
+            self.assertEqual(len(cache.entries), 3)
+            # evicted transactions come back from the store
+            self.assertIn(self.tx_ids[0], cache)
+            self.assertEqual(cache[self.tx_ids[0]].id(), self.tx_ids[0])
+            self.assertEqual(cache.stats()["loads"], 1)
+            del cache[self.tx_ids[1]]
+            self.assertNotIn(self.tx_ids[1], cache)
+            store.close()
+
+    def test_binary_store(self):
+        filename = join(self.tmp.name, "txs.bin")
+        store = BinaryTxStore(filename)
+        store.update({tx_id: self.raw_txs[tx_id] for tx_id in self.tx_ids[:3]})
+        del store[self.tx_ids[0]]
+        store[self.tx_ids[1]] = self.raw_txs[self.tx_ids[1]]
+        store.close()
+        # cut the last record short
+        with open(filename, "ab") as f:
+            f.write(bytes.fromhex(self.tx_ids[4])[::-1] + b"\xff\x00\x00\x00ab")
+        store = BinaryTxStore(filename)
+        self.assertEqual(sorted(store), self.tx_ids[1:3])
+        self.assertEqual(store[self.tx_ids[2]], self.raw_txs[self.tx_ids[2]])
+        store[self.tx_ids[3]] = self.raw_txs[self.tx_ids[3]]
+        store.close()
+        store = BinaryTxStore(filename)
+        self.assertEqual(sorted(store), self.tx_ids[1:4])
+        self.assertEqual(store[self.tx_ids[3]], self.raw_txs[self.tx_ids[3]])
+        store.close()
+
+    def test_migrate_json_cache(self):
+        store = SqliteTxStore(join(self.tmp.name, "txs.db"))
+        count = migrate_json_cache(OfflineTestCase.cache_file, store)
+        self.assertEqual(count, len(self.raw_txs))
+        self.assertEqual(dict(store.items()), self.raw_txs)
+        cache = TxFetcher.cache
+        TxFetcher.cache = TxCache(max_items=10, store=store)
+        try:
+            tx_obj = TxFetcher.fetch(self.tx_ids[0])
+            self.assertEqual(tx_obj.id(), self.tx_ids[0])
+            self.assertIs(TxFetcher.fetch(self.tx_ids[0]), tx_obj)
+        finally:
+            TxFetcher.cache = cache
+            store.close()
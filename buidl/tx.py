@@ -1,6 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
 from io import BytesIO
+from os import cpu_count
+from threading import local
+from time import sleep
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
+from weakref import WeakSet
 
+import hashlib
 import json
 
 from buidl.bech32 import decode_bech32
@@ -15,7 +24,9 @@ from buidl.helper import (
     int_to_byte,
     int_to_little_endian,
     little_endian_to_int,
+    ObservedList,
     read_varint,
+    read_varint_at,
     sha256,
     SIGHASH_ALL,
     SIGHASH_DEFAULT,
@@ -48,6 +59,8 @@ URL = {
 
 class TxFetcher:
     cache = {}
+    # network: buidl.rpc.BitcoinRPC to ask instead of the block explorer
+    rpc = {}
 
     @classmethod
     def get_url(cls, network="mainnet"):
@@ -56,25 +69,131 @@ class TxFetcher:
     @classmethod
     def fetch(cls, tx_id, network="mainnet", fresh=False):
         if fresh or (tx_id not in cls.cache):
-            url = "{}/tx/{}/hex".format(cls.get_url(network), tx_id)
-            req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-            response = urlopen(req).read().decode("utf-8").strip()
-            try:
-                raw = bytes.fromhex(response)
-            except ValueError:
-                raise ValueError(f"unexpected response: {response}")
-            tx = Tx.parse(BytesIO(raw), network=network)
-            # make sure the tx we got matches to the hash we requested
-            if tx.segwit:
-                computed = tx.id()
+            if network in cls.rpc:
+                response = cls.rpc[network].getrawtransactions([tx_id])[0]
             else:
-                computed = hash256(raw)[::-1].hex()
-            if computed != tx_id:
-                raise RuntimeError(f"server lied: {computed} vs {tx_id}")
-            cls.cache[tx_id] = tx
+                url = "{}/tx/{}/hex".format(cls.get_url(network), tx_id)
+                req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
+                response = urlopen(req).read().decode("utf-8").strip()
+            cls.cache[tx_id] = cls.parse_response(tx_id, response, network)
         cls.cache[tx_id].network = network
         return cls.cache[tx_id]
 
+    @classmethod
+    def parse_response(cls, tx_id, response, network="mainnet"):
+        """Parses the hex the server sent for tx_id, checking that it is
+        the transaction that was asked for"""
+        try:
+            raw = bytes.fromhex(response)
+        except ValueError:
+            raise ValueError(f"unexpected response: {response}")
+        tx = Tx.parse(BytesIO(raw), network=network)
+        # make sure the tx we got matches to the hash we requested
+        if tx.segwit:
+            computed = tx.id()
+        else:
+            computed = hash256(raw)[::-1].hex()
+        if computed != tx_id:
+            raise RuntimeError(f"server lied: {computed} vs {tx_id}")
+        return tx
+
+    @classmethod
+    def fetch_many(
+        cls,
+        tx_ids,
+        network="mainnet",
+        fresh=False,
+        max_workers=8,
+        retries=3,
+        timeout=30,
+    ):
+        """Returns the transactions for tx_ids, in order. The ones not in
+        the cache are requested in one batch from the node in cls.rpc if
+        there is one for the network. Otherwise they're requested from the
+        block explorer concurrently by up to max_workers threads, each
+        keeping its own keep-alive connection to the server. Failed
+        connections and server errors are retried with a growing pause;
+        a transaction that doesn't match its id raises like fetch does."""
+        tx_ids = list(tx_ids)
+        # hold on to the hits, a bounded cache may evict them while the
+        # rest of the batch goes in
+        found, to_fetch = {}, []
+        for tx_id in dict.fromkeys(tx_ids):
+            if not fresh and tx_id in cls.cache:
+                found[tx_id] = cls.cache[tx_id]
+            else:
+                to_fetch.append(tx_id)
+        txs = []
+        if to_fetch and network in cls.rpc:
+            # one batched request to the node
+            responses = cls.rpc[network].getrawtransactions(to_fetch)
+            txs = [
+                cls.parse_response(tx_id, response, network)
+                for tx_id, response in zip(to_fetch, responses)
+            ]
+        elif to_fetch:
+            url = urlsplit(cls.get_url(network))
+            if url.scheme == "https":
+                connection_class = HTTPSConnection
+            else:
+                connection_class = HTTPConnection
+            connections = []
+            thread_data = local()
+
+            def fetch_one(tx_id):
+                path = f"{url.path}/tx/{tx_id}/hex"
+                for attempt in range(retries + 1):
+                    if attempt:
+                        sleep(0.1 * 2**attempt)
+                    connection = getattr(thread_data, "connection", None)
+                    if connection is None:
+                        connection = connection_class(url.netloc, timeout=timeout)
+                        connections.append(connection)
+                        thread_data.connection = connection
+                    try:
+                        connection.request(
+                            "GET", path, headers={"User-Agent": "Mozilla/5.0"}
+                        )
+                        response = connection.getresponse()
+                        body = response.read()
+                    except (HTTPException, OSError):
+                        # start over on a new connection
+                        connection.close()
+                        thread_data.connection = None
+                        if attempt == retries:
+                            raise
+                        continue
+                    if response.status >= 500 and attempt < retries:
+                        continue
+                    if response.status != 200:
+                        raise HTTPError(
+                            url.geturl() + path,
+                            response.status,
+                            response.reason,
+                            response.headers,
+                            None,
+                        )
+                    return cls.parse_response(
+                        tx_id, body.decode("utf-8").strip(), network
+                    )
+
+            try:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(to_fetch))
+                ) as executor:
+                    txs = list(executor.map(fetch_one, to_fetch))
+            finally:
+                for connection in connections:
+                    connection.close()
+        for tx_id, tx in zip(to_fetch, txs):
+            cls.cache[tx_id] = tx
+            found[tx_id] = tx
+        result = []
+        for tx_id in tx_ids:
+            found[tx_id].network = network
+            result.append(found[tx_id])
+        return result
+
     @classmethod
     def load_cache(cls, filename):
         disk_cache = json.loads(open(filename, "r").read())
@@ -91,6 +210,8 @@ class TxFetcher:
     @classmethod
     def sendrawtransaction(cls, signed_tx_hex_str, network="mainnet"):
         """Broadcasts a signed transaction."""
+        if network in cls.rpc:
+            return cls.rpc[network].sendrawtransaction(signed_tx_hex_str)
         url = "{}/tx".format(cls.get_url(network=network))
         req = Request(
             url, data=signed_tx_hex_str.encode(), headers={"User-Agent": "Mozilla/5.0"}
@@ -105,23 +226,16 @@ class Tx:
     def __init__(
         self, version, tx_ins, tx_outs, locktime=None, network="mainnet", segwit=False
     ):
-        self.version = version
-        self.tx_ins = tx_ins
-        self.tx_outs = tx_outs
+        self.invalidate()
+        self._version = version
+        self._tx_ins = self._adopt(tx_ins)
+        self._tx_outs = self._adopt(tx_outs)
         if locktime is None:
-            self.locktime = Locktime()
+            self._locktime = Locktime()
         else:
-            self.locktime = Locktime(locktime)
+            self._locktime = Locktime(locktime)
         self.network = network
-        self.segwit = segwit
-        self._hash_prevouts = None
-        self._hash_sequence = None
-        self._hash_outputs = None
-        self._sha_prevouts = None
-        self._sha_amounts = None
-        self._sha_script_pubkeys = None
-        self._sha_sequence = None
-        self._sha_outputs = None
+        self._segwit = segwit
 
     def __repr__(self):
         tx_ins = "\n".join([str(txi) for txi in self.tx_ins])
@@ -134,11 +248,105 @@ tx_ins:\n{tx_ins}
 tx_outs:\n{tx_outs}
 """
 
+    @property
+    def version(self):
+        return self._version
+
+    @version.setter
+    def version(self, version):
+        self._version = version
+        self.invalidate(sighash=False)
+
+    @property
+    def tx_ins(self):
+        return self._tx_ins
+
+    @tx_ins.setter
+    def tx_ins(self, tx_ins):
+        self._tx_ins = self._adopt(tx_ins)
+        self.invalidate()
+
+    @property
+    def tx_outs(self):
+        return self._tx_outs
+
+    @tx_outs.setter
+    def tx_outs(self, tx_outs):
+        self._tx_outs = self._adopt(tx_outs)
+        self.invalidate()
+
+    @property
+    def locktime(self):
+        return self._locktime
+
+    @locktime.setter
+    def locktime(self, locktime):
+        self._locktime = locktime
+        self.invalidate(sighash=False)
+
+    @property
+    def segwit(self):
+        return self._segwit
+
+    @segwit.setter
+    def segwit(self, segwit):
+        self._segwit = segwit
+        self.invalidate(sighash=False)
+
+    def _adopt(self, items):
+        """Returns the inputs or outputs as an ObservedList, so that changing
+        the list in place clears the caches, and points them back at this
+        transaction, so that assigning to their fields does too. An input,
+        output or list of them can belong to more than one transaction."""
+        if items is None:
+            return None
+        if not isinstance(items, ObservedList):
+            items = ObservedList(items)
+        self._list_changed(items.observe(self), invalidate=False)
+        return items
+
+    def _list_changed(self, added, invalidate=True):
+        for item in added:
+            if not item._txs:
+                item._txs = WeakSet()
+            item._txs.add(self)
+        if invalidate:
+            self.invalidate()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # the inputs and outputs don't pickle who owns them
+        self._tx_ins = self._adopt(self._tx_ins)
+        self._tx_outs = self._adopt(self._tx_outs)
+
+    def invalidate(self, sighash=True):
+        """Clears the cached serializations and hashes. Assigning to the
+        fields of the transaction, its inputs or its outputs does this on
+        its own, and so does changing tx_ins, tx_outs or the items of a
+        Witness in place. Changes made inside other objects, like the
+        commands of a Script, need a call to this. The sighash caches only
+        depend on the outpoints, sequences and outputs, so changes to a
+        ScriptSig or Witness leave them alone by passing sighash=False."""
+        self._serialized_legacy = None
+        self._serialized_segwit = None
+        self._hash = None
+        self._witness_hash = None
+        if sighash:
+            self._sighash_context = None
+        elif self._sighash_context is not None:
+            # which scripts an input uses depends on its ScriptSig and Witness
+            self._sighash_context.forget_inputs()
+
     def clone(self):
         tx_obj = self.__class__.parse(BytesIO(self.serialize()), network=self.network)
         for tx_in_1, tx_in_2 in zip(self.tx_ins, tx_obj.tx_ins):
             tx_in_2._value = tx_in_1._value
             tx_in_2._script_pubkey = tx_in_1._script_pubkey
+        # the clone serializes to the same bytes
+        tx_obj._serialized_legacy = self._serialized_legacy
+        tx_obj._serialized_segwit = self._serialized_segwit
+        tx_obj._hash = self._hash
+        tx_obj._witness_hash = self._witness_hash
         return tx_obj
 
     def id(self):
@@ -147,7 +355,19 @@ tx_outs:\n{tx_outs}
 
     def hash(self):
         """Binary hash of the legacy serialization"""
-        return hash256(self.serialize_legacy())[::-1]
+        if self._hash is None:
+            self._hash = hash256(self.serialize_legacy())[::-1]
+        return self._hash
+
+    def wtxid(self):
+        """Human-readable hexadecimal of the witness transaction hash"""
+        return self.witness_hash().hex()
+
+    def witness_hash(self):
+        """Binary hash of the full serialization, witness included"""
+        if self._witness_hash is None:
+            self._witness_hash = hash256(self.serialize())[::-1]
+        return self._witness_hash
 
     def vbytes(self):
         if self.segwit:
@@ -176,6 +396,59 @@ tx_outs:\n{tx_outs}
         s.seek(-5, 1)
         return parse_method(s, network=network)
 
+    @classmethod
+    def parse_bytes(cls, b, network="mainnet"):
+        """Parses a transaction from a bytes-like object"""
+        tx_obj, offset = cls.parse_at(b, 0, network=network)
+        return tx_obj
+
+    @classmethod
+    def parse_at(cls, b, offset=0, network="mainnet"):
+        """Parses the transaction starting at offset in a bytes-like object
+        (bytes, bytearray or memoryview), walking it with an index instead
+        of a stream. Returns the Tx and the offset right after it."""
+        if not isinstance(b, bytes):
+            b = memoryview(b).cast("B")
+        start = offset
+        # version has 4 bytes, little-endian, interpret as int
+        version = int.from_bytes(b[offset : offset + 4], "little")
+        offset += 4
+        # segwit transactions have the marker 0x00 and flag 0x01 next
+        segwit = b[offset : offset + 1] == b"\x00"
+        if segwit:
+            marker = bytes(b[offset : offset + 2])
+            if marker != b"\x00\x01":
+                raise RuntimeError(f"Not a segwit transaction {marker}")
+            offset += 2
+        num_inputs, offset = read_varint_at(b, offset)
+        inputs = []
+        for _ in range(num_inputs):
+            tx_in, offset = TxIn.parse_at(b, offset)
+            inputs.append(tx_in)
+        num_outputs, offset = read_varint_at(b, offset)
+        outputs = []
+        for _ in range(num_outputs):
+            tx_out, offset = TxOut.parse_at(b, offset)
+            outputs.append(tx_out)
+        if segwit:
+            # there is a witness for each input
+            for tx_in in inputs:
+                tx_in.witness, offset = Witness.parse_at(b, offset)
+        # locktime is 4 bytes, little-endian
+        locktime = int.from_bytes(b[offset : offset + 4], "little")
+        offset += 4
+        if offset > len(b):
+            raise IOError(f"transaction at offset {start} is truncated")
+        tx_obj = cls(version, inputs, outputs, locktime, network=network, segwit=segwit)
+        return tx_obj, offset
+
+    @classmethod
+    def parse_lazy(cls, b, network="mainnet"):
+        """Parses a transaction from a bytes-like object into a LazyTx,
+        which builds inputs, outputs and witnesses only when they're used"""
+        tx_obj, offset = LazyTx.parse_at(b, 0, network=network)
+        return tx_obj
+
     @classmethod
     def parse_legacy(cls, s, network="mainnet"):
         """Takes a byte stream and parses a legacy transaction"""
@@ -237,59 +510,111 @@ tx_outs:\n{tx_outs}
         else:
             return self.serialize_legacy()
 
+    def serialize_into(self, buf, segwit=None):
+        """Appends the serialization to a bytearray, leaving out the
+        witnesses if segwit is False"""
+        if segwit is None:
+            segwit = self.segwit
+        cached = self._serialized_segwit if segwit else self._serialized_legacy
+        if cached is not None:
+            buf += cached
+            return
+        # serialize version (4 bytes, little endian)
+        buf += int_to_little_endian(self.version, 4)
+        if segwit:
+            # segwit marker b'\x00\x01'
+            buf += b"\x00\x01"
+        # number of inputs and each input serialized
+        self.serialize_tx_ins_into(buf)
+        # number of outputs and each output serialized
+        self.serialize_tx_outs_into(buf)
+        if segwit:
+            self.serialize_witness_into(buf)
+        # serialize locktime (4 bytes, little endian)
+        buf += self.locktime.serialize()
+
+    def write(self, s, chunk_size=65536):
+        """Writes the serialization to a stream, like a file or socket, in
+        pieces of about chunk_size bytes instead of all at once"""
+        cached = self._serialized_segwit if self.segwit else self._serialized_legacy
+        if cached is not None:
+            s.write(cached)
+            return
+        buf = bytearray(int_to_little_endian(self.version, 4))
+        if self.segwit:
+            buf += b"\x00\x01"
+        sections = [
+            (encode_varint(len(self.tx_ins)), self.tx_ins),
+            (encode_varint(len(self.tx_outs)), self.tx_outs),
+        ]
+        if self.segwit:
+            sections.append((b"", [tx_in.witness for tx_in in self.tx_ins]))
+        for prefix, items in sections:
+            buf += prefix
+            for item in items:
+                if len(buf) >= chunk_size:
+                    s.write(buf)
+                    buf = bytearray()
+                item.serialize_into(buf)
+        buf += self.locktime.serialize()
+        s.write(buf)
+
     def serialize_legacy(self):
         """Returns the byte serialization of the transaction"""
-        # serialize version (4 bytes, little endian)
-        result = int_to_little_endian(self.version, 4)
+        if self._serialized_legacy is None:
+            result = bytearray()
+            self.serialize_into(result, segwit=False)
+            self._serialized_legacy = bytes(result)
+        return self._serialized_legacy
+
+    def serialize_tx_ins(self):
+        result = bytearray()
+        self.serialize_tx_ins_into(result)
+        return bytes(result)
+
+    def serialize_tx_ins_into(self, buf):
         # encode_varint on the number of inputs
-        result += encode_varint(len(self.tx_ins))
+        buf += encode_varint(len(self.tx_ins))
         # iterate inputs
         for tx_in in self.tx_ins:
             # serialize each input
-            result += tx_in.serialize()
+            tx_in.serialize_into(buf)
+
+    def serialize_tx_outs(self):
+        result = bytearray()
+        self.serialize_tx_outs_into(result)
+        return bytes(result)
+
+    def serialize_tx_outs_into(self, buf):
         # encode_varint on the number of outputs
-        result += encode_varint(len(self.tx_outs))
+        buf += encode_varint(len(self.tx_outs))
         # iterate outputs
         for tx_out in self.tx_outs:
             # serialize each output
-            result += tx_out.serialize()
-        # serialize locktime (4 bytes, little endian)
-        result += self.locktime.serialize()
-        return result
+            tx_out.serialize_into(buf)
 
     def serialize_witness(self):
-        result = b""
+        result = bytearray()
+        self.serialize_witness_into(result)
+        return bytes(result)
+
+    def serialize_witness_into(self, buf):
         # add the witness data for each input
         for tx_in in self.tx_ins:
             # serialize the witness field
-            result += tx_in.witness.serialize()
-        return result
+            tx_in.witness.serialize_into(buf)
 
     def serialize_segwit(self):
         """Returns the byte serialization of the transaction"""
-        # serialize version (4 bytes, little endian)
-        result = int_to_little_endian(self.version, 4)
-        # segwit marker b'\x00\x01'
-        result += b"\x00\x01"
-        # encode_varint on the number of inputs
-        result += encode_varint(len(self.tx_ins))
-        # iterate inputs
-        for tx_in in self.tx_ins:
-            # serialize each input
-            result += tx_in.serialize()
-        # encode_varint on the number of inputs
-        result += encode_varint(len(self.tx_outs))
-        # iterate outputs
-        for tx_out in self.tx_outs:
-            # serialize each output
-            result += tx_out.serialize()
-        result += self.serialize_witness()
-        # serialize locktime (4 bytes, little endian)
-        result += self.locktime.serialize()
-        return result
+        if self._serialized_segwit is None:
+            result = bytearray()
+            self.serialize_into(result, segwit=True)
+            self._serialized_segwit = bytes(result)
+        return self._serialized_segwit
 
     def fee(self):
         """Returns the fee of this transaction in satoshi"""
+        self.prefetch_inputs()
         # initialize input sum and output sum
         input_sum, output_sum = 0, 0
         # iterate through inputs
@@ -307,95 +632,78 @@ tx_outs:\n{tx_outs}
         """Returns the integer representation of the hash that needs to get
         signed for index input_index"""
 
+        # like bitcoin core, only the low 5 bits choose NONE or SINGLE
+        base_type = hash_type & 0x1F
         # consensus bugs related to invalid input indices
         DEFAULT = 1 << 248
         if input_index >= len(self.tx_ins):
             return DEFAULT
-        elif hash_type & 3 == SIGHASH_SINGLE and input_index >= len(self.tx_outs):
+        elif base_type == SIGHASH_SINGLE and input_index >= len(self.tx_outs):
             return DEFAULT
-        # create the serialization per spec
-        # start with version: int_to_little_endian in 4 bytes
-        s = int_to_little_endian(self.version, 4)
-        # next, how many inputs there are: encode_varint
-        s += encode_varint(len(self.tx_ins))
-        # loop through each input: for i, tx_in in enumerate(self.tx_ins)
-        for i, tx_in in enumerate(self.tx_ins):
-            sequence = tx_in.sequence
-            # if the input index is the one we're signing
-            if i == input_index:
-                # if the RedeemScript was passed in, that's the ScriptSig
-                if redeem_script:
-                    script_sig = redeem_script
-                # otherwise the previous tx's ScriptPubkey is the ScriptSig
-                else:
-                    script_sig = tx_in.script_pubkey(self.network)
-            # Otherwise, the ScriptSig is empty
-            else:
-                script_sig = None
-                if hash_type & 3 in (SIGHASH_NONE, SIGHASH_SINGLE):
-                    sequence = Sequence(0)
-            # create a TxIn object with the prev_tx, prev_index and sequence
-            # the same as the current tx_in and the script_sig from above
-            new_tx_in = TxIn(
-                prev_tx=tx_in.prev_tx,
-                prev_index=tx_in.prev_index,
-                script_sig=script_sig,
-                sequence=sequence,
+        tx_in = self.tx_ins[input_index]
+        # if the RedeemScript was passed in, that's the ScriptCode
+        if redeem_script:
+            script_code = redeem_script
+        # otherwise the previous tx's ScriptPubkey is the ScriptCode
+        else:
+            script_code = tx_in.script_pubkey(self.network)
+        # the serialization per spec, made from pieces computed once per tx
+        # with only the input being signed serialized here
+        context = self.sighash_context()
+        h = hashlib.sha256(int_to_little_endian(self.version, 4))
+        signed_input = (
+            context.legacy_outpoints()[input_index]
+            + script_code.serialize()
+            + tx_in.sequence.serialize()
+        )
+        if hash_type & SIGHASH_ANYONECANPAY:
+            # only the input being signed is included
+            h.update(b"\x01")
+            h.update(signed_input)
+        else:
+            # every other input has an empty ScriptSig, and a 0 sequence
+            # for SIGHASH_NONE and SIGHASH_SINGLE
+            other_inputs = memoryview(
+                context.legacy_inputs(base_type in (SIGHASH_NONE, SIGHASH_SINGLE))
             )
-            # add the serialization of the TxIn object
-            if hash_type & SIGHASH_ANYONECANPAY:
-                if i == input_index:
-                    s += new_tx_in.serialize()
-            else:
-                s += new_tx_in.serialize()
-        # add how many outputs there are using encode_varint
-        s += encode_varint(len(self.tx_outs))
-        # add the serialization of each output
-        for i, tx_out in enumerate(self.tx_outs):
-            if hash_type & 3 == SIGHASH_NONE:
-                continue
-            elif hash_type & 3 == SIGHASH_SINGLE:
-                if i == input_index:
-                    s += tx_out.serialize()
-                    break
-                else:
-                    s += b"\xff\xff\xff\xff\xff\xff\xff\xff\x00"
-            else:
-                s += tx_out.serialize()
-        # add the locktime using int_to_little_endian in 4 bytes
-        s += self.locktime.serialize()
-        # add SIGHASH_ALL using int_to_little_endian in 4 bytes
-        s += int_to_little_endian(hash_type, 4)
+            # each of those is a 36 byte outpoint, 0x00 and a 4 byte sequence
+            start, end = input_index * 41, (input_index + 1) * 41
+            h.update(encode_varint(len(self.tx_ins)))
+            h.update(other_inputs[:start])
+            h.update(signed_input)
+            h.update(other_inputs[end:])
+        if base_type == SIGHASH_NONE:
+            # no outputs
+            h.update(b"\x00")
+        elif base_type == SIGHASH_SINGLE:
+            # blank outputs up to the one with the same index
+            h.update(encode_varint(input_index + 1))
+            h.update(b"\xff\xff\xff\xff\xff\xff\xff\xff\x00" * input_index)
+            h.update(self.tx_outs[input_index].serialize())
+        else:
+            h.update(context.legacy_outputs())
+        # add the locktime and the hash type, 4 bytes little endian each
+        h.update(self.locktime.serialize())
+        h.update(int_to_little_endian(hash_type, 4))
         # hash256 the serialization
-        h256 = hash256(s)
+        h256 = hashlib.sha256(h.digest()).digest()
         # convert the result to an integer using big_endian_to_int(x)
         return big_endian_to_int(h256)
 
+    def sighash_context(self):
+        """Returns the SighashContext for the current state of the tx"""
+        if self._sighash_context is None:
+            self._sighash_context = SighashContext(self)
+        return self._sighash_context
+
     def hash_prevouts(self):
-        if self._hash_prevouts is None:
-            all_prevouts = b""
-            all_sequence = b""
-            for tx_in in self.tx_ins:
-                all_prevouts += tx_in.prev_tx[::-1] + int_to_little_endian(
-                    tx_in.prev_index, 4
-                )
-                all_sequence += tx_in.sequence.serialize()
-            self._hash_prevouts = hash256(all_prevouts)
-            self._hash_sequence = hash256(all_sequence)
-        return self._hash_prevouts
+        return self.sighash_context().hash_prevouts()
 
     def hash_sequence(self):
-        if self._hash_sequence is None:
-            self.hash_prevouts()  # this should calculate self._hash_prevouts
-        return self._hash_sequence
+        return self.sighash_context().hash_sequence()
 
     def hash_outputs(self):
-        if self._hash_outputs is None:
-            all_outputs = b""
-            for tx_out in self.tx_outs:
-                all_outputs += tx_out.serialize()
-            self._hash_outputs = hash256(all_outputs)
-        return self._hash_outputs
+        return self.sighash_context().hash_outputs()
 
     def sig_hash_bip143(
         self,
@@ -457,46 +765,19 @@ tx_outs:\n{tx_outs}
         return big_endian_to_int(hash256(s))
 
     def sha_prevouts(self):
-        if self._sha_prevouts is None:
-            all_prevouts = b""
-            all_amounts = b""
-            all_script_pubkeys = b""
-            all_sequence = b""
-            for tx_in in self.tx_ins:
-                all_prevouts += tx_in.prev_tx[::-1] + int_to_little_endian(
-                    tx_in.prev_index, 4
-                )
-                all_amounts += int_to_little_endian(tx_in.value(self.network), 8)
-                all_script_pubkeys += tx_in.script_pubkey(self.network).serialize()
-                all_sequence += tx_in.sequence.serialize()
-            self._sha_prevouts = sha256(all_prevouts)
-            self._sha_amounts = sha256(all_amounts)
-            self._sha_script_pubkeys = sha256(all_script_pubkeys)
-            self._sha_sequences = sha256(all_sequence)
-        return self._sha_prevouts
+        return self.sighash_context().sha_prevouts()
 
     def sha_amounts(self):
-        if self._sha_amounts is None:
-            self.sha_prevouts()  # this should calculate self._sha_amounts
-        return self._sha_amounts
+        return self.sighash_context().sha_amounts()
 
     def sha_script_pubkeys(self):
-        if self._sha_script_pubkeys is None:
-            self.sha_prevouts()  # this should calculate self._sha_script_pubkeys
-        return self._sha_script_pubkeys
+        return self.sighash_context().sha_script_pubkeys()
 
     def sha_sequences(self):
-        if self._sha_sequences is None:
-            self.sha_prevouts()  # this should calculate self._sha_sequences
-        return self._sha_sequences
+        return self.sighash_context().sha_sequences()
 
     def sha_outputs(self):
-        if self._sha_outputs is None:
-            all_outputs = b""
-            for tx_out in self.tx_outs:
-                all_outputs += tx_out.serialize()
-            self._sha_outputs = sha256(all_outputs)
-        return self._sha_outputs
+        return self.sighash_context().sha_outputs()
 
     def sig_hash_bip341(self, input_index, ext_flag=0, hash_type=SIGHASH_DEFAULT):
         """Returns the root message being signed for p2tr"""
@@ -534,66 +815,35 @@ tx_outs:\n{tx_outs}
         return hash_tapsighash(s)
 
     def sig_hash(self, input_index, hash_type):
-        # get the relevant input
-        tx_in = self.tx_ins[input_index]
-        # get the script_pubkey of the input
-        script_pubkey = tx_in.script_pubkey(network=self.network)
-        # grab the RedeemScript if we have a p2sh
-        if script_pubkey.is_p2sh():
-            # the last command of the ScriptSig is the raw RedeemScript
-            raw_redeem_script = tx_in.script_sig.commands[-1]
-            # convert to RedeemScript
-            redeem_script = RedeemScript.convert(raw_redeem_script)
-        else:
-            redeem_script = None
-        # grab the WitnessScript if we have a p2wsh
-        if script_pubkey.is_p2wsh() or (redeem_script and redeem_script.is_p2wsh()):
-            # the last item of the Witness is the raw WitnessScript
-            raw_witness_script = tx_in.witness.items[-1]
-            # convert to WitnessScript
-            witness_script = WitnessScript.convert(raw_witness_script)
-        else:
-            witness_script = None
-        # check to see if the ScriptPubKey or the RedeemScript is p2wpkh or p2wsh
-        if (
-            script_pubkey.is_p2wpkh()
-            or (redeem_script and redeem_script.is_p2wpkh())
-            or script_pubkey.is_p2wsh()
-            or (redeem_script and redeem_script.is_p2wsh())
-        ):
-            return self.sig_hash_bip143(
-                input_index,
-                redeem_script=redeem_script,
-                witness_script=witness_script,
-                hash_type=hash_type,
-            )
-        elif script_pubkey.is_p2tr():
-            if len(tx_in.witness) > 1:
-                ext_flag = 1
-            else:
-                ext_flag = 0
-            return self.sig_hash_bip341(
-                input_index, ext_flag=ext_flag, hash_type=hash_type
-            )
-        else:
-            return self.sig_hash_legacy(input_index, redeem_script, hash_type=hash_type)
+        return self.sighash_context().sig_hash(input_index, hash_type)
 
-    def verify_input(self, input_index):
-        """Returns whether the input has a valid signature"""
+    def verify_input(self, input_index, reasons=None):
+        """Returns whether the input has a valid signature. Why it doesn't
+        gets printed, or appended to reasons if a list is passed in."""
         # get the relevant input
         tx_in = self.tx_ins[input_index]
         # combine the scripts
         combined_script = tx_in.script_sig + tx_in.script_pubkey(self.network)
         # evaluate the combined script
-        return combined_script.evaluate(self, input_index)
+        return combined_script.evaluate(self, input_index, reasons)
 
-    def verify(self):
+    def input_failures(self, parallel=None):
+        """Returns a dict of input index to the reason that input doesn't
+        verify, which is empty when all of them do. Pass the number of
+        processes to spread the inputs over as parallel."""
+        if parallel is not None and parallel > 1:
+            return verify_txs([self], workers=parallel)[0]
+        return _input_failures(self, range(len(self.tx_ins)))
+
+    def verify(self, parallel=None):
         """Verify this transaction"""
         if self.fee() < self.vbytes():
             print(
                 f"This transaction won't relay without having a fee of at least {self.vbytes()}"
             )
             return False
+        if parallel is not None and parallel > 1:
+            return not self.input_failures(parallel=parallel)
         for i in range(len(self.tx_ins)):
             if not self.verify_input(i):
                 return False
@@ -702,7 +952,7 @@ tx_outs:\n{tx_outs}
 
     def get_sig_legacy(self, input_index, private_key, redeem_script=None):
         # get the sig hash (z)
-        z = self.sig_hash_legacy(input_index, redeem_script=redeem_script)
+        z = self.sighash_context().sig_hash_legacy(input_index, redeem_script)
         # get der signature of z from private key
         der = private_key.sign(z).der()
         # append the SIGHASH_ALL with int_to_byte(SIGHASH_ALL)
@@ -712,7 +962,9 @@ tx_outs:\n{tx_outs}
         self, input_index, private_key, redeem_script=None, witness_script=None
     ):
         # get the sig_hash (z)
-        z = self.sig_hash_bip143(input_index, redeem_script, witness_script)
+        z = self.sighash_context().sig_hash_bip143(
+            input_index, redeem_script, witness_script
+        )
         # get der signature of z from private key
         der = private_key.sign(z).der()
         # append the SIGHASH_ALL with int_to_byte(SIGHASH_ALL)
@@ -727,7 +979,9 @@ tx_outs:\n{tx_outs}
         aux=b"\x00" * 32,
     ):
         # get the sig_hash (z)
-        msg = self.sig_hash_bip341(input_index, ext_flag=ext_flag, hash_type=hash_type)
+        msg = self.sighash_context().sig_hash_bip341(
+            input_index, ext_flag=ext_flag, hash_type=hash_type
+        )
         # get schnorr signature of z from private key
         schnorr = private_key.sign_schnorr(msg, aux).serialize()
         # append the sighash only if it's not SIGHASH_DEFAULT (0)
@@ -738,7 +992,7 @@ tx_outs:\n{tx_outs}
 
     def check_sig_legacy(self, input_index, point, signature, redeem_script=None):
         # get the sig_hash (z)
-        z = self.sig_hash_legacy(input_index, redeem_script)
+        z = self.sighash_context().sig_hash_legacy(input_index, redeem_script)
         # return whether the signature verifies
         return point.verify(z, signature)
 
@@ -746,7 +1000,9 @@ tx_outs:\n{tx_outs}
         self, input_index, point, signature, redeem_script=None, witness_script=None
     ):
         # get the sig_hash (z)
-        z = self.sig_hash_bip143(input_index, redeem_script, witness_script)
+        z = self.sighash_context().sig_hash_bip143(
+            input_index, redeem_script, witness_script
+        )
         # return whether the signature verifies
         return point.verify(z, signature)
 
@@ -799,30 +1055,371 @@ tx_outs:\n{tx_outs}
     def get_input_tx_lookup(self):
         """Returns the tx lookup dictionary of hashes to the Tx objects
         for all the input transactions."""
+        tx_ids = [tx_in.prev_tx.hex() for tx_in in self.tx_ins]
         tx_lookup = {}
-        for tx_in in self.tx_ins:
-            tx_obj = TxFetcher.fetch(tx_in.prev_tx.hex(), network=self.network)
+        for tx_obj in TxFetcher.fetch_many(tx_ids, network=self.network):
             tx_lookup[tx_obj.hash()] = tx_obj
         return tx_lookup
 
+    def prefetch_inputs(self):
+        """Looks up the amount and ScriptPubKey of every input in one
+        batch, fetching the previous transactions concurrently"""
+        if self.is_coinbase():
+            return
+        tx_ins = [
+            tx_in
+            for tx_in in self.tx_ins
+            if tx_in._value is None or tx_in._script_pubkey is None
+        ]
+        if not tx_ins:
+            return
+        prev_txs = TxFetcher.fetch_many(
+            [tx_in.prev_tx.hex() for tx_in in tx_ins], network=self.network
+        )
+        for tx_in, prev_tx in zip(tx_ins, prev_txs):
+            tx_out = prev_tx.tx_outs[tx_in.prev_index]
+            tx_in._value = tx_out.amount
+            tx_in._script_pubkey = tx_out.script_pubkey
+
+
+class SighashContext:
+    """The parts of a transaction's signature hashes that are shared by
+    its inputs: the BIP143 and BIP341 midstates, the pieces of the legacy
+    serialization, which scripts each input uses and the digests computed
+    so far. Get one with Tx.sighash_context(); the transaction drops it
+    when its outpoints, sequences or outputs change."""
+
+    def __init__(self, tx_obj):
+        self.tx_obj = tx_obj
+        self._legacy_outpoints = None
+        self._legacy_inputs = [None, None]
+        self._legacy_outputs = None
+        self._hash_prevouts = None
+        self._hash_sequence = None
+        self._hash_outputs = None
+        self._sha_prevouts = None
+        self._sha_amounts = None
+        self._sha_script_pubkeys = None
+        self._sha_sequences = None
+        self._sha_outputs = None
+        self.forget_inputs()
+
+    def forget_inputs(self):
+        """Clears what depends on the ScriptSigs and Witnesses"""
+        self.input_scripts = {}
+        self.digests = {}
+
+    def legacy_outpoints(self):
+        """The serialized outpoint of each input for the legacy sighash"""
+        if self._legacy_outpoints is None:
+            self._legacy_outpoints = [
+                tx_in.prev_tx[::-1] + int_to_little_endian(tx_in.prev_index, 4)
+                for tx_in in self.tx_obj.tx_ins
+            ]
+        return self._legacy_outpoints
+
+    def legacy_outputs(self):
+        """All the outputs serialized, count first, for SIGHASH_ALL"""
+        if self._legacy_outputs is None:
+            self._legacy_outputs = self.tx_obj.serialize_tx_outs()
+        return self._legacy_outputs
+
+    def legacy_inputs(self, zero_sequences=False):
+        """All the inputs serialized with empty ScriptSigs, which is how
+        every input but the one being signed goes into the legacy sighash"""
+        if self._legacy_inputs[zero_sequences] is None:
+            tx_ins = self.tx_obj.tx_ins
+            if zero_sequences:
+                sequences = [b"\x00\x00\x00\x00"] * len(tx_ins)
+            else:
+                sequences = [tx_in.sequence.serialize() for tx_in in tx_ins]
+            self._legacy_inputs[zero_sequences] = b"".join(
+                outpoint + b"\x00" + sequence
+                for outpoint, sequence in zip(self.legacy_outpoints(), sequences)
+            )
+        return self._legacy_inputs[zero_sequences]
+
+    def hash_prevouts(self):
+        if self._hash_prevouts is None:
+            all_prevouts = b""
+            all_sequence = b""
+            for tx_in in self.tx_obj.tx_ins:
+                all_prevouts += tx_in.prev_tx[::-1] + int_to_little_endian(
+                    tx_in.prev_index, 4
+                )
+                all_sequence += tx_in.sequence.serialize()
+            self._hash_prevouts = hash256(all_prevouts)
+            self._hash_sequence = hash256(all_sequence)
+        return self._hash_prevouts
+
+    def hash_sequence(self):
+        if self._hash_sequence is None:
+            self.hash_prevouts()  # this should calculate self._hash_prevouts
+        return self._hash_sequence
+
+    def hash_outputs(self):
+        if self._hash_outputs is None:
+            all_outputs = b""
+            for tx_out in self.tx_obj.tx_outs:
+                all_outputs += tx_out.serialize()
+            self._hash_outputs = hash256(all_outputs)
+        return self._hash_outputs
+
+    def sha_prevouts(self):
+        if self._sha_prevouts is None:
+            self.tx_obj.prefetch_inputs()
+            network = self.tx_obj.network
+            all_prevouts = b""
+            all_amounts = b""
+            all_script_pubkeys = b""
+            all_sequence = b""
+            for tx_in in self.tx_obj.tx_ins:
+                all_prevouts += tx_in.prev_tx[::-1] + int_to_little_endian(
+                    tx_in.prev_index, 4
+                )
+                all_amounts += int_to_little_endian(tx_in.value(network), 8)
+                all_script_pubkeys += tx_in.script_pubkey(network).serialize()
+                all_sequence += tx_in.sequence.serialize()
+            self._sha_prevouts = sha256(all_prevouts)
+            self._sha_amounts = sha256(all_amounts)
+            self._sha_script_pubkeys = sha256(all_script_pubkeys)
+            self._sha_sequences = sha256(all_sequence)
+        return self._sha_prevouts
+
+    def sha_amounts(self):
+        if self._sha_amounts is None:
+            self.sha_prevouts()  # this should calculate self._sha_amounts
+        return self._sha_amounts
+
+    def sha_script_pubkeys(self):
+        if self._sha_script_pubkeys is None:
+            self.sha_prevouts()  # this should calculate self._sha_script_pubkeys
+        return self._sha_script_pubkeys
+
+    def sha_sequences(self):
+        if self._sha_sequences is None:
+            self.sha_prevouts()  # this should calculate self._sha_sequences
+        return self._sha_sequences
+
+    def sha_outputs(self):
+        if self._sha_outputs is None:
+            all_outputs = b""
+            for tx_out in self.tx_obj.tx_outs:
+                all_outputs += tx_out.serialize()
+            self._sha_outputs = sha256(all_outputs)
+        return self._sha_outputs
+
+    def classify(self, input_index):
+        """Returns which sighash the input uses, "legacy", "bip143" or
+        "bip341", along with its RedeemScript, WitnessScript and ext_flag"""
+        if input_index in self.input_scripts:
+            return self.input_scripts[input_index]
+        # get the relevant input
+        tx_in = self.tx_obj.tx_ins[input_index]
+        # get the script_pubkey of the input
+        script_pubkey = tx_in.script_pubkey(network=self.tx_obj.network)
+        # grab the RedeemScript if we have a p2sh
+        if script_pubkey.is_p2sh():
+            # the last command of the ScriptSig is the raw RedeemScript
+            raw_redeem_script = tx_in.script_sig.commands[-1]
+            # convert to RedeemScript
+            redeem_script = RedeemScript.convert(raw_redeem_script)
+        else:
+            redeem_script = None
+        # grab the WitnessScript if we have a p2wsh
+        if script_pubkey.is_p2wsh() or (redeem_script and redeem_script.is_p2wsh()):
+            # the last item of the Witness is the raw WitnessScript
+            raw_witness_script = tx_in.witness.items[-1]
+            # convert to WitnessScript
+            witness_script = WitnessScript.convert(raw_witness_script)
+        else:
+            witness_script = None
+        ext_flag = 0
+        # check to see if the ScriptPubKey or the RedeemScript is p2wpkh or p2wsh
+        if (
+            script_pubkey.is_p2wpkh()
+            or (redeem_script and redeem_script.is_p2wpkh())
+            or script_pubkey.is_p2wsh()
+            or (redeem_script and redeem_script.is_p2wsh())
+        ):
+            kind = "bip143"
+        elif script_pubkey.is_p2tr():
+            kind = "bip341"
+            # a script path spend has more than the signature, annex aside
+            if len(tx_in.witness) - bool(tx_in.witness.has_annex()) > 1:
+                ext_flag = 1
+        else:
+            kind = "legacy"
+        result = (kind, redeem_script, witness_script, ext_flag)
+        self.input_scripts[input_index] = result
+        return result
+
+    def sig_hash(self, input_index, hash_type):
+        """Returns the signature hash of the input using the scripts
+        in its ScriptSig and Witness"""
+        kind, redeem_script, witness_script, ext_flag = self.classify(input_index)
+        if kind == "bip341":
+            return self.sig_hash_bip341(input_index, ext_flag, hash_type)
+        # the scripts follow from the input, so the index stands in for them
+        key = (kind, input_index, hash_type)
+        if key not in self.digests:
+            if kind == "bip143":
+                digest = self.tx_obj.sig_hash_bip143(
+                    input_index,
+                    redeem_script=redeem_script,
+                    witness_script=witness_script,
+                    hash_type=hash_type,
+                )
+            else:
+                digest = self.tx_obj.sig_hash_legacy(
+                    input_index, redeem_script, hash_type=hash_type
+                )
+            self.digests[key] = digest
+        return self.digests[key]
+
+    def sig_hash_legacy(self, input_index, redeem_script=None, hash_type=SIGHASH_ALL):
+        """Tx.sig_hash_legacy, remembering the result"""
+        raw_redeem_script = redeem_script and redeem_script.raw_serialize()
+        key = ("legacy", input_index, hash_type, raw_redeem_script)
+        if key not in self.digests:
+            self.digests[key] = self.tx_obj.sig_hash_legacy(
+                input_index, redeem_script, hash_type=hash_type
+            )
+        return self.digests[key]
+
+    def sig_hash_bip143(
+        self,
+        input_index,
+        redeem_script=None,
+        witness_script=None,
+        hash_type=SIGHASH_ALL,
+    ):
+        """Tx.sig_hash_bip143, remembering the result"""
+        key = (
+            "bip143",
+            input_index,
+            hash_type,
+            redeem_script and redeem_script.raw_serialize(),
+            witness_script and witness_script.raw_serialize(),
+        )
+        if key not in self.digests:
+            self.digests[key] = self.tx_obj.sig_hash_bip143(
+                input_index, redeem_script, witness_script, hash_type=hash_type
+            )
+        return self.digests[key]
+
+    def sig_hash_bip341(self, input_index, ext_flag=0, hash_type=SIGHASH_DEFAULT):
+        """Tx.sig_hash_bip341, remembering the result"""
+        key = ("bip341", input_index, hash_type, ext_flag)
+        if key not in self.digests:
+            self.digests[key] = self.tx_obj.sig_hash_bip341(
+                input_index, ext_flag=ext_flag, hash_type=hash_type
+            )
+        return self.digests[key]
+
 
 class TxIn:
+    # the transactions this input belongs to
+    _txs = ()
+
     def __init__(self, prev_tx, prev_index, script_sig=None, sequence=None):
-        self.prev_tx = prev_tx
-        self.prev_index = prev_index
+        self._prev_tx = prev_tx
+        self._prev_index = prev_index
         if script_sig is None:
-            self.script_sig = Script()
+            self._script_sig = Script()
         else:
-            self.script_sig = script_sig
+            self._script_sig = script_sig
         if sequence is None:
-            self.sequence = Sequence()
+            self._sequence = Sequence()
         else:
-            self.sequence = Sequence(sequence)
+            self._sequence = Sequence(sequence)
         self._value = None
         self._script_pubkey = None
-        self.witness = Witness()
+        self._witness = self._adopt_witness(Witness())
         self.tap_script = None
 
+    @property
+    def prev_tx(self):
+        return self._prev_tx
+
+    @prev_tx.setter
+    def prev_tx(self, prev_tx):
+        self._prev_tx = prev_tx
+        # this is a different output being spent
+        self._value = None
+        self._script_pubkey = None
+        self._changed()
+
+    @property
+    def prev_index(self):
+        return self._prev_index
+
+    @prev_index.setter
+    def prev_index(self, prev_index):
+        self._prev_index = prev_index
+        # this is a different output being spent
+        self._value = None
+        self._script_pubkey = None
+        self._changed()
+
+    @property
+    def script_sig(self):
+        return self._script_sig
+
+    @script_sig.setter
+    def script_sig(self, script_sig):
+        self._script_sig = script_sig
+        self._changed(sighash=False)
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, sequence):
+        self._sequence = sequence
+        self._changed()
+
+    @property
+    def witness(self):
+        return self._witness
+
+    @witness.setter
+    def witness(self, witness):
+        self._witness = self._adopt_witness(witness)
+        self._changed(sighash=False)
+
+    def _adopt_witness(self, witness):
+        """Observes the items of the Witness, so that changing them clears
+        the caches of the transactions"""
+        if witness is not None:
+            witness.items.observe(self)
+        return witness
+
+    def _list_changed(self, added):
+        self._changed(sighash=False)
+
+    def _changed(self, sighash=True):
+        for tx_obj in list(self._txs):
+            tx_obj.invalidate(sighash=sighash)
+
+    def set_prevout(self, value, script_pubkey):
+        """Sets the amount and ScriptPubKey of the output being spent, so
+        that they don't have to be looked up"""
+        self._value = value
+        self._script_pubkey = script_pubkey
+        self._changed()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # WeakSets don't pickle, the transactions adopt this input again
+        state.pop("_txs", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._adopt_witness(self._witness)
+
     def __repr__(self):
         return f"{self.prev_tx.hex()}:{self.prev_index}"
 
@@ -844,17 +1441,44 @@ class TxIn:
         # return an instance of the class (cls(...))
         return cls(prev_tx, prev_index, script_sig, sequence)
 
+    @classmethod
+    def parse_at(cls, b, offset):
+        """Parses the tx_input at offset in a bytes-like object
+        return the TxIn object and the offset right after it
+        """
+        # prev_tx is 32 bytes, little endian
+        prev_tx = bytes(b[offset : offset + 32])[::-1]
+        # prev_index is 4 bytes, little endian, interpret as int
+        prev_index = int.from_bytes(b[offset + 32 : offset + 36], "little")
+        # script_sig is a variable field (length followed by the data)
+        offset += 36
+        length = b[offset]
+        if length < 0xFD:
+            offset += 1
+        else:
+            length, offset = read_varint_at(b, offset)
+        script_sig = Script.parse(raw=b[offset : offset + length])
+        offset += length
+        # sequence is 4 bytes, little-endian, interpret as int
+        sequence = int.from_bytes(b[offset : offset + 4], "little")
+        return cls(prev_tx, prev_index, script_sig, sequence), offset + 4
+
     def serialize(self):
         """Returns the byte serialization of the transaction input"""
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
         # serialize prev_tx, little endian
-        result = self.prev_tx[::-1]
+        buf += self.prev_tx[::-1]
         # serialize prev_index, 4 bytes, little endian
-        result += int_to_little_endian(self.prev_index, 4)
+        buf += int_to_little_endian(self.prev_index, 4)
         # serialize the script_sig
-        result += self.script_sig.serialize()
+        self.script_sig.serialize_into(buf)
         # serialize sequence, 4 bytes, little endian
-        result += self.sequence.serialize()
-        return result
+        buf += self.sequence.serialize()
 
     def fetch_tx(self, network="mainnet"):
         return TxFetcher.fetch(self.prev_tx.hex(), network=network)
@@ -926,21 +1550,245 @@ class TxIn:
         self.witness = Witness([sig])
 
 
+class LazyTx(Tx):
+    """A transaction over its raw bytes. Parsing only records where each
+    input, output and witness starts; they're parsed the first time
+    tx_ins or tx_outs is used. Until then, serializing and hashing copy
+    the byte ranges straight from the raw transaction."""
+
+    _raw = None
+
+    @property
+    def tx_ins(self):
+        if self._tx_ins is None:
+            witness_offsets = self._witness_offsets or [None] * len(self._in_offsets)
+            self._tx_ins = self._adopt(
+                [
+                    LazyTxIn(self._raw, offset, witness_offset)
+                    for offset, witness_offset in zip(self._in_offsets, witness_offsets)
+                ]
+            )
+        return self._tx_ins
+
+    @tx_ins.setter
+    def tx_ins(self, tx_ins):
+        Tx.tx_ins.fset(self, tx_ins)
+
+    @property
+    def tx_outs(self):
+        if self._tx_outs is None:
+            self._tx_outs = self._adopt(
+                [TxOut.parse_at(self._raw, offset)[0] for offset in self._out_offsets]
+            )
+        return self._tx_outs
+
+    @tx_outs.setter
+    def tx_outs(self, tx_outs):
+        Tx.tx_outs.fset(self, tx_outs)
+
+    @classmethod
+    def parse_at(cls, b, offset=0, network="mainnet"):
+        """Skims the transaction starting at offset in a bytes-like object,
+        recording where everything is. Returns the LazyTx and the offset
+        right after it."""
+        if not isinstance(b, bytes):
+            b = memoryview(b).cast("B")
+        start = offset
+        # version has 4 bytes, little-endian, interpret as int
+        version = int.from_bytes(b[offset : offset + 4], "little")
+        offset += 4
+        # segwit transactions have the marker 0x00 and flag 0x01 next
+        segwit = b[offset : offset + 1] == b"\x00"
+        if segwit:
+            marker = bytes(b[offset : offset + 2])
+            if marker != b"\x00\x01":
+                raise RuntimeError(f"Not a segwit transaction {marker}")
+            offset += 2
+        ins_start = offset
+        num_inputs, offset = read_varint_at(b, offset)
+        in_offsets = []
+        for _ in range(num_inputs):
+            in_offsets.append(offset)
+            # skip prev_tx, prev_index, the script_sig and sequence
+            length, offset = read_varint_at(b, offset + 36)
+            offset += length + 4
+        outs_start = offset
+        num_outputs, offset = read_varint_at(b, offset)
+        out_offsets = []
+        for _ in range(num_outputs):
+            out_offsets.append(offset)
+            # skip the amount and the script_pubkey
+            length, offset = read_varint_at(b, offset + 8)
+            offset += length
+        witness_start = offset
+        witness_offsets = None
+        if segwit:
+            witness_offsets = []
+            for _ in range(num_inputs):
+                witness_offsets.append(offset)
+                num_items, offset = read_varint_at(b, offset)
+                for _ in range(num_items):
+                    length, offset = read_varint_at(b, offset)
+                    offset += length
+        # locktime is 4 bytes, little-endian
+        locktime = int.from_bytes(b[offset : offset + 4], "little")
+        if offset + 4 > len(b):
+            raise IOError(f"transaction at offset {start} is truncated")
+        tx_obj = cls(version, None, None, locktime, network=network, segwit=segwit)
+        # keep a copy of just this transaction, so that it pickles and
+        # doesn't hold on to the rest of the block, and count from its start
+        tx_obj._raw = bytes(b[start : offset + 4])
+        tx_obj._in_offsets = [o - start for o in in_offsets]
+        tx_obj._out_offsets = [o - start for o in out_offsets]
+        if witness_offsets is not None:
+            witness_offsets = [o - start for o in witness_offsets]
+        tx_obj._witness_offsets = witness_offsets
+        tx_obj._spans = tuple(
+            o - start for o in (ins_start, outs_start, witness_start, offset)
+        )
+        return tx_obj, offset + 4
+
+    def serialize_tx_ins_into(self, buf):
+        if self._tx_ins is None:
+            ins_start, outs_start, _, _ = self._spans
+            buf += self._raw[ins_start:outs_start]
+        else:
+            super().serialize_tx_ins_into(buf)
+
+    def serialize_tx_outs_into(self, buf):
+        if self._tx_outs is None:
+            _, outs_start, witness_start, _ = self._spans
+            buf += self._raw[outs_start:witness_start]
+        else:
+            super().serialize_tx_outs_into(buf)
+
+    def serialize_witness_into(self, buf):
+        if self._tx_ins is None:
+            _, _, witness_start, locktime_start = self._spans
+            buf += self._raw[witness_start:locktime_start]
+        else:
+            super().serialize_witness_into(buf)
+
+    def write(self, s, chunk_size=65536):
+        if self._tx_ins is None and self._tx_outs is None:
+            # copy the raw byte ranges rather than parse every input and output
+            buf = bytearray()
+            self.serialize_into(buf)
+            s.write(buf)
+        else:
+            super().write(s, chunk_size)
+
+
+class LazyTxIn(TxIn):
+    """An input of a LazyTx. The ScriptSig and Witness are parsed from the
+    raw transaction the first time they're used."""
+
+    def __init__(self, raw, offset, witness_offset=None):
+        # prev_tx is 32 bytes, little endian
+        self._prev_tx = bytes(raw[offset : offset + 32])[::-1]
+        # prev_index is 4 bytes, little endian, interpret as int
+        self._prev_index = int.from_bytes(raw[offset + 32 : offset + 36], "little")
+        # the script_sig stays raw, varint length prefix included
+        length, script_start = read_varint_at(raw, offset + 36)
+        script_end = script_start + length
+        self._sequence = Sequence(
+            int.from_bytes(raw[script_end : script_end + 4], "little")
+        )
+        self._raw = raw
+        self._script_sig_span = (offset + 36, script_start, script_end)
+        self._witness_offset = witness_offset
+        self._script_sig = None
+        self._witness = None
+        self._value = None
+        self._script_pubkey = None
+        self.tap_script = None
+
+    @property
+    def script_sig(self):
+        if self._script_sig is None:
+            _, script_start, script_end = self._script_sig_span
+            self._script_sig = Script.parse(raw=self._raw[script_start:script_end])
+        return self._script_sig
+
+    @script_sig.setter
+    def script_sig(self, script_sig):
+        TxIn.script_sig.fset(self, script_sig)
+
+    @property
+    def witness(self):
+        if self._witness is None:
+            if self._witness_offset is None:
+                witness = Witness()
+            else:
+                witness = Witness.parse_at(self._raw, self._witness_offset)[0]
+            self._witness = self._adopt_witness(witness)
+        return self._witness
+
+    @witness.setter
+    def witness(self, witness):
+        TxIn.witness.fset(self, witness)
+
+    def serialize_into(self, buf):
+        if self._script_sig is not None:
+            return super().serialize_into(buf)
+        varint_start, _, script_end = self._script_sig_span
+        buf += self.prev_tx[::-1]
+        buf += int_to_little_endian(self.prev_index, 4)
+        # the script_sig straight from the raw transaction
+        buf += self._raw[varint_start:script_end]
+        buf += self.sequence.serialize()
+
+
 class TxOut:
+    # the transactions this output belongs to
+    _txs = ()
+
     def __init__(self, amount, script_pubkey):
-        self.amount = amount
-        self.script_pubkey = script_pubkey
+        self._amount = amount
+        self._script_pubkey = script_pubkey
+
+    @property
+    def amount(self):
+        return self._amount
+
+    @amount.setter
+    def amount(self, amount):
+        self._amount = amount
+        self._changed()
+
+    @property
+    def script_pubkey(self):
+        return self._script_pubkey
+
+    @script_pubkey.setter
+    def script_pubkey(self, script_pubkey):
+        self._script_pubkey = script_pubkey
+        self._changed()
+
+    def _changed(self):
+        for tx_obj in list(self._txs):
+            tx_obj.invalidate()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_txs", None)
+        return state
 
     def __repr__(self):
         return f"{self.amount}:{self.script_pubkey}"
 
     def serialize(self):
         """Returns the byte serialization of the transaction output"""
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
         # serialize amount, 8 bytes, little endian
-        result = int_to_little_endian(self.amount, 8)
+        buf += int_to_little_endian(self.amount, 8)
         # serialize the script_pubkey
-        result += self.script_pubkey.serialize()
-        return result
+        self.script_pubkey.serialize_into(buf)
 
     @classmethod
     def parse(cls, s):
@@ -956,6 +1804,23 @@ class TxOut:
         # return an instance of the class (cls(...))
         return cls(amount, script_pubkey)
 
+    @classmethod
+    def parse_at(cls, b, offset):
+        """Parses the tx_output at offset in a bytes-like object
+        return the TxOut object and the offset right after it
+        """
+        # amount is 8 bytes, little endian, interpret as int
+        amount = int.from_bytes(b[offset : offset + 8], "little")
+        # script_pubkey is a variable field (length followed by the data)
+        offset += 8
+        length = b[offset]
+        if length < 0xFD:
+            offset += 1
+        else:
+            length, offset = read_varint_at(b, offset)
+        script_pubkey = ScriptPubKey.parse(raw=b[offset : offset + length])
+        return cls(amount, script_pubkey), offset + length
+
     @classmethod
     def to_address(cls, address, amount):
         """Takes an address and an amount and makes a TxOut object"""
@@ -990,3 +1855,110 @@ class TxOut:
         else:
             raise ValueError(f"{address} is an unknown or invalid type of address")
         return cls(amount=amount, script_pubkey=script_pubkey)
+
+
+def _input_failures(tx_obj, input_indices):
+    """Evaluates the inputs, returning a dict of index to failure reason"""
+    failures = {}
+    for input_index in input_indices:
+        reasons = []
+        try:
+            valid = tx_obj.verify_input(input_index, reasons)
+        except Exception as e:
+            valid = False
+            reasons.append(f"{e.__class__.__name__}: {e}")
+        if not valid:
+            failures[input_index] = reasons[-1] if reasons else "invalid input"
+    return failures
+
+
+def _verify_chunk(chunk):
+    """Worker side of verify_txs. Each item of the chunk has a transaction's
+    index, serialization and network, the amount and ScriptPubKey each of
+    its inputs spends and which of the inputs to evaluate."""
+    failures = []
+    for tx_index, raw, network, prevouts, input_indices in chunk:
+        tx_obj = Tx.parse_bytes(raw, network=network)
+        for tx_in, prevout in zip(tx_obj.tx_ins, prevouts):
+            if prevout is not None:
+                tx_in._value = prevout[0]
+                tx_in._script_pubkey = ScriptPubKey.parse(BytesIO(prevout[1]))
+        for input_index, reason in _input_failures(tx_obj, input_indices).items():
+            failures.append((tx_index, input_index, reason))
+    return failures
+
+
+def verify_txs(txs, prevout_view=None, workers=None, chunk_size=None):
+    """Evaluates the inputs of many transactions, like the ones in a block,
+    across a pool of worker processes. prevout_view maps the
+    (prev_tx, prev_index) of each input to the TxOut it spends; without it
+    the outputs are looked up with TxFetcher. With it, nothing is fetched:
+    inputs missing from it fail, and so do the taproot inputs of the same
+    transaction, whose signatures cover every input. Coinbase transactions
+    are skipped. Returns a list with a dict for each transaction like the one
+    Tx.input_failures returns.
+
+    Big transactions get split and small ones grouped so each task sent
+    to a worker has about chunk_size inputs."""
+    results = [{} for _ in txs]
+    items = []
+    for tx_index, tx_obj in enumerate(txs):
+        if tx_obj.is_coinbase():
+            continue
+        if prevout_view is None:
+            tx_obj.prefetch_inputs()
+        prevouts, input_indices, taproot_indices = [], [], []
+        for input_index, tx_in in enumerate(tx_obj.tx_ins):
+            if prevout_view is None:
+                amount = tx_in.value(tx_obj.network)
+                script_pubkey = tx_in.script_pubkey(tx_obj.network)
+            else:
+                tx_out = prevout_view.get((tx_in.prev_tx, tx_in.prev_index))
+                if tx_out is None:
+                    prevouts.append(None)
+                    results[tx_index][input_index] = "missing prevout"
+                    continue
+                amount, script_pubkey = tx_out.amount, tx_out.script_pubkey
+            prevouts.append((amount, script_pubkey.serialize()))
+            input_indices.append(input_index)
+            if script_pubkey.is_p2tr():
+                taproot_indices.append(input_index)
+        if taproot_indices and None in prevouts:
+            # BIP341 signs every amount and ScriptPubKey the transaction
+            # spends, which the workers would otherwise go and fetch
+            for input_index in taproot_indices:
+                results[tx_index][input_index] = "missing prevout of another input"
+                input_indices.remove(input_index)
+        if input_indices:
+            items.append(
+                (tx_index, tx_obj.serialize(), tx_obj.network, prevouts, input_indices)
+            )
+    num_inputs = sum(len(item[-1]) for item in items)
+    if workers == 1 or num_inputs <= 1:
+        chunks = [items]
+    else:
+        if chunk_size is None:
+            # a few tasks per worker keeps them busy without resending
+            # the same transaction over and over
+            pool_size = workers or cpu_count() or 1
+            chunk_size = max(1, -(-num_inputs // (4 * pool_size)))
+        chunks, chunk, count = [], [], 0
+        for tx_index, raw, network, prevouts, input_indices in items:
+            for start in range(0, len(input_indices), chunk_size):
+                indices = input_indices[start : start + chunk_size]
+                chunk.append((tx_index, raw, network, prevouts, indices))
+                count += len(indices)
+                if count >= chunk_size:
+                    chunks.append(chunk)
+                    chunk, count = [], 0
+        if chunk:
+            chunks.append(chunk)
+    if len(chunks) <= 1:
+        failures = [_verify_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            failures = list(executor.map(_verify_chunk, chunks))
+    for chunk_failures in failures:
+        for tx_index, input_index, reason in chunk_failures:
+            results[tx_index][input_index] = reason
+    return results
@@ -0,0 +1,242 @@
+"""
+Caches that can stand in for the dict in TxFetcher.cache.
+
+TxFetcher.cache is a plain dict by default, which keeps every transaction
+it ever fetched in memory. A TxCache keeps only the most recently used
+ones, bounded by count and/or serialized size, and writes through to an
+optional store on disk:
+
+    TxFetcher.cache = TxCache(max_items=1000, store=SqliteTxStore("txs.db"))
+
+Stores map tx ids to raw transactions. Nothing gets parsed when a store is
+opened; a transaction is read and parsed the first time it's asked for.
+migrate_json_cache moves a file written by TxFetcher.dump_cache into a
+store.
+"""
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+
+import json
+import sqlite3
+
+from buidl.helper import int_to_little_endian, little_endian_to_int
+from buidl.tx import Tx
+
+
+class TxCache(MutableMapping):
+    def __init__(self, max_items=None, max_bytes=None, store=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.store = store
+        # tx id: (Tx, size of its serialization), least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def __getitem__(self, tx_id):
+        entry = self.entries.get(tx_id)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(tx_id)
+            return entry[0]
+        self.misses += 1
+        if self.store is None or tx_id not in self.store:
+            raise KeyError(tx_id)
+        raw = self.store[tx_id]
+        self.loads += 1
+        tx_obj = Tx.parse_bytes(raw)
+        self.remember(tx_id, tx_obj, len(raw))
+        return tx_obj
+
+    def __setitem__(self, tx_id, tx_obj):
+        raw = tx_obj.serialize()
+        if self.store is not None:
+            self.store[tx_id] = raw
+        self.remember(tx_id, tx_obj, len(raw))
+
+    def __delitem__(self, tx_id):
+        entry = self.entries.pop(tx_id, None)
+        if entry is not None:
+            self.size -= entry[1]
+        if self.store is not None and tx_id in self.store:
+            del self.store[tx_id]
+        elif entry is None:
+            raise KeyError(tx_id)
+
+    def __contains__(self, tx_id):
+        if tx_id in self.entries:
+            return True
+        return self.store is not None and tx_id in self.store
+
+    def __iter__(self):
+        if self.store is not None:
+            return iter(self.store)
+        return iter(list(self.entries))
+
+    def __len__(self):
+        if self.store is not None:
+            return len(self.store)
+        return len(self.entries)
+
+    def remember(self, tx_id, tx_obj, size):
+        """Puts the transaction at the front of the memory cache, evicting
+        the least recently used ones that no longer fit"""
+        old = self.entries.pop(tx_id, None)
+        if old is not None:
+            self.size -= old[1]
+        self.entries[tx_id] = (tx_obj, size)
+        self.size += size
+        while self.entries and (
+            (self.max_items is not None and len(self.entries) > self.max_items)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def stats(self):
+        """Returns how well the memory cache is doing"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "items": len(self.entries),
+            "bytes": self.size,
+        }
+
+
+class BinaryTxStore(MutableMapping):
+    """An append-only file of transactions. Each record is the 32 byte tx
+    hash, the 4 byte little-endian length of the transaction and the raw
+    transaction. A record with a length of 0 deletes the transaction. Only
+    the headers are read when the file is opened, to index where each
+    transaction is."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, "a+b")
+        self.index = {}
+        end = self.file.seek(0, 2)
+        offset = 0
+        while offset + 36 <= end:
+            self.file.seek(offset)
+            header = self.file.read(36)
+            length = little_endian_to_int(header[32:])
+            if offset + 36 + length > end:
+                break
+            tx_id = header[:32][::-1].hex()
+            if length:
+                self.index[tx_id] = (offset + 36, length)
+            else:
+                self.index.pop(tx_id, None)
+            offset += 36 + length
+        # drop a record that was cut off in the middle of being written
+        self.file.truncate(offset)
+
+    def __getitem__(self, tx_id):
+        offset, length = self.index[tx_id]
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def __setitem__(self, tx_id, raw):
+        self.append(tx_id, raw)
+        self.file.flush()
+
+    def __delitem__(self, tx_id):
+        del self.index[tx_id]
+        self.file.write(bytes.fromhex(tx_id)[::-1] + int_to_little_endian(0, 4))
+        self.file.flush()
+
+    def __contains__(self, tx_id):
+        return tx_id in self.index
+
+    def __iter__(self):
+        return iter(list(self.index))
+
+    def __len__(self):
+        return len(self.index)
+
+    def append(self, tx_id, raw):
+        offset = self.file.seek(0, 2)
+        self.file.write(bytes.fromhex(tx_id)[::-1] + int_to_little_endian(len(raw), 4))
+        self.file.write(raw)
+        self.index[tx_id] = (offset + 36, len(raw))
+
+    def update(self, items=()):
+        if isinstance(items, Mapping):
+            items = items.items()
+        for tx_id, raw in items:
+            self.append(tx_id, raw)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteTxStore(MutableMapping):
+    """Transactions in a sqlite3 database, keyed by tx id"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS txs (tx_id TEXT PRIMARY KEY, raw BLOB NOT NULL)"
+        )
+        self.db.commit()
+
+    def __getitem__(self, tx_id):
+        row = self.db.execute(
+            "SELECT raw FROM txs WHERE tx_id = ?", (tx_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(tx_id)
+        return row[0]
+
+    def __setitem__(self, tx_id, raw):
+        self.db.execute(
+            "INSERT OR REPLACE INTO txs (tx_id, raw) VALUES (?, ?)", (tx_id, raw)
+        )
+        self.db.commit()
+
+    def __delitem__(self, tx_id):
+        if self.db.execute("DELETE FROM txs WHERE tx_id = ?", (tx_id,)).rowcount == 0:
+            raise KeyError(tx_id)
+        self.db.commit()
+
+    def __contains__(self, tx_id):
+        return (
+            self.db.execute("SELECT 1 FROM txs WHERE tx_id = ?", (tx_id,)).fetchone()
+            is not None
+        )
+
+    def __iter__(self):
+        return iter([row[0] for row in self.db.execute("SELECT tx_id FROM txs")])
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM txs").fetchone()[0]
+
+    def update(self, items=()):
+        if isinstance(items, Mapping):
+            items = items.items()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO txs (tx_id, raw) VALUES (?, ?)", items
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def migrate_json_cache(filename, store):
+    """Copies the transactions in a JSON cache written by
+    TxFetcher.dump_cache into a store, returning how many there were"""
+    with open(filename) as f:
+        disk_cache = json.load(f)
+    store.update(
+        (tx_id, bytes.fromhex(raw_hex)) for tx_id, raw_hex in disk_cache.items()
+    )
+    return len(disk_cache)
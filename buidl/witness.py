@@ -3,7 +3,9 @@ from io import BytesIO
 from buidl.helper import (
     encode_varint,
     encode_varstr,
+    ObservedList,
     read_varint,
+    read_varint_at,
     read_varstr,
 )
 from buidl.script import Script
@@ -12,7 +14,16 @@ from buidl.taproot import ControlBlock, TapLeaf
 
 class Witness:
     def __init__(self, items=None):
-        self.items = items or []
+        self._items = ObservedList(items or [])
+
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        # replaced in place, so whoever observes the list hears about it
+        self._items[:] = items
 
     def __repr__(self):
         result = ""
@@ -33,10 +44,16 @@ class Witness:
         return self.__class__(self.items[:])
 
     def serialize(self):
-        result = encode_varint(len(self))
+        result = bytearray()
+        self.serialize_into(result)
+        return bytes(result)
+
+    def serialize_into(self, buf):
+        """Appends the serialization to a bytearray"""
+        buf += encode_varint(len(self))
         for item in self.items:
-            result += encode_varstr(item)
-        return result
+            buf += encode_varint(len(item))
+            buf += item
 
     def has_annex(self):
         return len(self.items) and self.items[-1][0] == 0x50
@@ -65,3 +82,19 @@ class Witness:
         for _ in range(num_items):
             items.append(read_varstr(s))
         return cls(items)
+
+    @classmethod
+    def parse_at(cls, b, offset):
+        """returns the Witness at offset in a bytes-like object
+        and the offset right after it"""
+        num_items, offset = read_varint_at(b, offset)
+        items = []
+        for _ in range(num_items):
+            length = b[offset]
+            if length < 0xFD:
+                offset += 1
+            else:
+                length, offset = read_varint_at(b, offset)
+            items.append(bytes(b[offset : offset + length]))
+            offset += length
+        return cls(items), offset
@@ -722,13 +722,13 @@ class MultiWallet(Cmd):
         if not is_libsec_enabled():
             to_print += "\n(this is ~100x faster if you install libsec)"
         print_yellow(to_print + ":")
-        for cnt in range(limit):
-            offset_to_use = offset + cnt
-            address = p2wsh_sortedmulti_obj.get_address(
-                is_change=is_change,
-                offset=offset_to_use,
-            )
-            print_green(f"#{offset_to_use}: {address}")
+        addresses = p2wsh_sortedmulti_obj.get_addresses(
+            offset=offset,
+            limit=limit,
+            is_change=is_change,
+        )
+        for cnt, address in enumerate(addresses):
+            print_green(f"#{offset + cnt}: {address}")
 
     def do_sign_transaction(self, arg):
         """